@@ -0,0 +1,247 @@
+# async_broker.py
+"""
+Asyncio broker client: quotes for a watchlist plus holdings, funds and the order
+book fetched concurrently, so an account + watchlist snapshot costs about one
+round-trip instead of the sum of them.
+
+Two backends share the same interface:
+- HttpBroker: the mock backends (mock_api.py / mock_smartapi.py) or any server
+  with the same /quote, /holding, /funds, /orderbook routes. Uses aiohttp when
+  installed, otherwise runs requests calls on worker threads.
+- SmartApiBroker: wraps a configured SmartConnect (smartapi_session_manager.get_client())
+  and runs its blocking SDK calls on worker threads.
+
+Concurrency is bounded by a semaphore (max_concurrency) and every endpoint has its
+own token-bucket rate limit (RATE_LIMITS, requests per second).
+
+    import asyncio
+    from async_broker import HttpBroker
+    async def main():
+        async with HttpBroker("http://127.0.0.1:5001") as broker:
+            snap = await broker.snapshot(["NIFTY", "BANKNIFTY"], count=100)
+    asyncio.run(main())
+
+Run against a mock:  python async_broker.py NIFTY BANKNIFTY FINNIFTY --base http://127.0.0.1:5001
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import time
+from typing import Iterable, Optional
+
+# optional aiohttp; without it HttpBroker runs requests on worker threads
+try:
+    import aiohttp
+except Exception:
+    aiohttp = None
+
+API_BASE = "http://127.0.0.1:5001"
+
+# per-endpoint requests/second (SmartAPI's published limits are per endpoint)
+RATE_LIMITS = {
+    "quote": 10.0,
+    "holding": 1.0,
+    "funds": 2.0,
+    "orderbook": 1.0,
+}
+TIMEOUTS = {"quote": 8.0, "holding": 5.0, "funds": 5.0, "orderbook": 5.0}
+
+log = logging.getLogger("async_broker")
+
+
+class RateLimiter:
+    """Token bucket: `rate` acquisitions per second with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+class AsyncBroker:
+    """Shared plumbing: semaphore, per-endpoint limiters, gather helpers."""
+
+    def __init__(self, max_concurrency: int = 8, rate_limits: Optional[dict] = None):
+        self.max_concurrency = max_concurrency
+        self.rate_limits = dict(RATE_LIMITS, **(rate_limits or {}))
+        self._sem = None
+        self._limiters = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self) -> None:
+        pass
+
+    async def _limited(self, endpoint: str, call):
+        # created lazily so they bind to the running event loop
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        limiter = self._limiters.get(endpoint)
+        if limiter is None:
+            limiter = self._limiters[endpoint] = RateLimiter(self.rate_limits.get(endpoint, 5.0))
+        await limiter.acquire()
+        async with self._sem:
+            return await call()
+
+    async def quotes(self, symbols: Iterable, count: int = 100) -> dict:
+        """{symbol: quote payload or None} for every symbol, fetched concurrently; failures are logged per symbol."""
+        symbols = list(symbols)
+        results = await asyncio.gather(*(self.quote(s, count) for s in symbols), return_exceptions=True)
+        out = {}
+        for s, r in zip(symbols, results):
+            if isinstance(r, BaseException):
+                log.warning("quote fetch failed for %s: %r", _symbol_key(s), r)
+                r = None
+            out[_symbol_key(s)] = r
+        return out
+
+    async def snapshot(self, symbols: Iterable = (), count: int = 100) -> dict:
+        """Watchlist quotes + holdings + funds + order book in one concurrent batch."""
+        names = ["quotes", "holdings", "funds", "order_book"]
+        results = await asyncio.gather(self.quotes(symbols, count), self.holdings(), self.funds(),
+                                       self.order_book(), return_exceptions=True)
+        snap = {}
+        for name, res in zip(names, results):
+            if isinstance(res, BaseException):
+                log.warning("%s fetch failed: %r", name, res)
+                res = None
+            snap[name] = res
+        return snap
+
+
+def _symbol_key(symbol):
+    # SmartApiBroker takes (exchange, tradingsymbol, token) tuples
+    return symbol[1] if isinstance(symbol, tuple) else symbol
+
+
+class HttpBroker(AsyncBroker):
+    """Async client for the mock HTTP backends."""
+
+    def __init__(self, base: str = API_BASE, max_concurrency: int = 8, rate_limits: Optional[dict] = None,
+                 use_aiohttp: Optional[bool] = None):
+        super().__init__(max_concurrency, rate_limits)
+        self.base = base.rstrip("/")
+        self.use_aiohttp = (aiohttp is not None) if use_aiohttp is None else (use_aiohttp and aiohttp is not None)
+        self._session = None
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _get(self, endpoint: str, path: str, params: Optional[dict] = None):
+        timeout = TIMEOUTS.get(endpoint, 5.0)
+        url = f"{self.base}{path}"
+        if self.use_aiohttp:
+            if self._session is None:
+                self._session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self.max_concurrency))
+
+            async def call():
+                async with self._session.get(url, params=params,
+                                             timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+                    r.raise_for_status()
+                    return await r.json()
+        else:
+            import requests
+
+            def fetch():
+                r = requests.get(url, params=params, timeout=timeout)
+                r.raise_for_status()
+                return r.json()
+
+            async def call():
+                return await asyncio.to_thread(fetch)
+        return await self._limited(endpoint, call)
+
+    async def quote(self, symbol: str, count: int = 100):
+        return await self._get("quote", "/quote", {"symbol": symbol, "count": count})
+
+    async def holdings(self):
+        return await self._get("holding", "/holding")
+
+    async def funds(self):
+        return await self._get("funds", "/funds")
+
+    async def order_book(self):
+        return await self._get("orderbook", "/orderbook")
+
+
+class SmartApiBroker(AsyncBroker):
+    """Runs a SmartConnect's blocking calls on worker threads, concurrently."""
+
+    def __init__(self, api=None, max_concurrency: int = 8, rate_limits: Optional[dict] = None):
+        super().__init__(max_concurrency, rate_limits)
+        if api is None:
+            from smartapi_session_manager import get_client
+            api, _ = get_client()
+        self.api = api
+
+    async def _sdk(self, endpoint: str, fn, *args):
+        async def call():
+            return await asyncio.to_thread(fn, *args)
+        return await self._limited(endpoint, call)
+
+    async def quote(self, symbol: tuple, count: int = 100):
+        """symbol is (exchange, tradingsymbol, symboltoken); count is ignored (LTP only)."""
+        exchange, tradingsymbol, token = symbol
+        return await self._sdk("quote", self.api.ltpData, exchange, tradingsymbol, token)
+
+    async def holdings(self):
+        return await self._sdk("holding", self.api.holding)
+
+    async def funds(self):
+        return await self._sdk("funds", self.api.rmsLimit)
+
+    async def order_book(self):
+        return await self._sdk("orderbook", self.api.orderBook)
+
+
+async def _timed_snapshot(args):
+    async with HttpBroker(args.base, max_concurrency=args.concurrency) as broker:
+        t0 = time.perf_counter()
+        await broker.snapshot(args.symbols, args.count)
+        concurrent_t = time.perf_counter() - t0
+
+    # fresh client so the sequential pass starts with full rate-limit buckets too
+    async with HttpBroker(args.base, max_concurrency=args.concurrency) as broker:
+        t0 = time.perf_counter()
+        for s in args.symbols:
+            await broker.quote(s, args.count)
+        for fetch in (broker.holdings, broker.funds, broker.order_book):
+            await fetch()
+        sequential_t = time.perf_counter() - t0
+    print(f"backend: {'aiohttp' if broker.use_aiohttp else 'requests on threads'}")
+    print(f"snapshot of {len(args.symbols)} quotes + holdings/funds/orderbook: "
+          f"concurrent {concurrent_t * 1e3:.1f} ms, sequential {sequential_t * 1e3:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent account + watchlist snapshot against a mock backend")
+    parser.add_argument("symbols", nargs="*", default=["NIFTY", "BANKNIFTY", "FINNIFTY"])
+    parser.add_argument("--base", default=API_BASE)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(_timed_snapshot(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
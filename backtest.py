@@ -3,20 +3,37 @@
 backtest.py â€” revised: EMA crossover primary, VWAP/RSI supportive (not blocking)
 
 Usage:
-    python backtest.py <csv_path>
+    python backtest.py <csv_path> [--session-vwap]
+    python backtest.py sweep <csv_path> --tp 0.003:0.008:0.001 --sl 0.002,0.0025 --vol-window 10,20 --ema-fast 5,9 --ema-slow 21
+    python backtest.py universe <dir_or_glob> [--workers N] [--session-vwap]
+    (--session-vwap resets VWAP on each IST trading date instead of one cumulative VWAP)
 
 Outputs:
  - data/backtest_results.csv  (all closed trades)
- - data/trades_journal.csv    (appended per-trade rows with entry_reason & exit_reason)
+ - data/trades_journal.csv    (per-trade rows with entry_reason & exit_reason, tagged with a run_id per backtest)
+ - data/sweep_results.csv     (sweep: one ranked row of params + summary per combination)
+ - data/universe_*.csv        (universe: per-symbol summary, all trades, portfolio equity curve)
+ - data/cache/<name>.feather  (columnar copy of the cleaned input, reused until the CSV changes)
 """
 from __future__ import annotations
 import os
 import sys
 import csv
+import warnings
+import argparse
+import glob
+import itertools
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime
+from multiprocessing import shared_memory
 from typing import Optional, List, Tuple
 import pandas as pd
 import numpy as np
+from data_store import load_ohlcv
+import indicators as ind
+
+IST = "Asia/Kolkata"
 
 # -------------------------
 # Helpers
@@ -25,11 +42,8 @@ def ensure_dir(path: str) -> None:
     if path:
         os.makedirs(path, exist_ok=True)
 
-def read_csv_robust(path: str) -> pd.DataFrame:
+def _read_csv_fallback(path: str) -> pd.DataFrame:
     """Try to read CSV in multiple ways (plain, index-as-datetime, multi-header)."""
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"File not found: {path}")
-
     # 1) plain read
     try:
         df = pd.read_csv(path)
@@ -79,7 +93,9 @@ def read_csv_robust(path: str) -> pd.DataFrame:
         # try first column heuristic
         first = df.columns[0]
         try:
-            parsed = pd.to_datetime(df[first], errors="coerce")
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", message="Could not infer format", category=UserWarning)
+                parsed = pd.to_datetime(df[first], errors="coerce")
             if parsed.notna().sum() >= max(1, len(parsed)//10):
                 dt_col = first
         except Exception:
@@ -91,7 +107,10 @@ def read_csv_robust(path: str) -> pd.DataFrame:
     # rename to 'datetime' and parse
     if dt_col != "datetime":
         df = df.rename(columns={dt_col: "datetime"})
-    df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
+    with warnings.catch_warnings():
+        # mixed or unusual formats are parsed value by value here on purpose
+        warnings.filterwarnings("ignore", message="Could not infer format", category=UserWarning)
+        df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
 
     # lowercase columns and canonicalize names
     df.columns = [c.lower() for c in df.columns]
@@ -111,6 +130,113 @@ def read_csv_robust(path: str) -> pd.DataFrame:
     for col in ("open","high","low","close","volume"):
         df[col] = pd.to_numeric(df[col], errors="coerce")
 
+    return df
+
+_DT_NAMES = ("datetime", "date", "timestamp", "time")
+_OHLCV_ALT = {"adj close": "close", "last": "close", "vol": "volume", "price": "close"}
+_SNIFF_LINES = 8
+
+def _looks_like_datetime(value: str) -> bool:
+    value = (value or "").strip()
+    if not value or not any(ch.isdigit() for ch in value):
+        return False
+    try:
+        return not pd.isna(pd.to_datetime(value))
+    except (ValueError, TypeError, OverflowError):
+        return False
+
+def sniff_csv_layout(path: str, n_lines: int = _SNIFF_LINES) -> Optional[dict]:
+    """
+    Work out the CSV layout from its first few lines only:
+      plain           - header row, then data (datetime column found by name or position)
+      yfinance        - header row followed by 'Ticker,...' / 'Datetime,,,' rows before the data
+      datetime_index  - unnamed first column holding timestamps (DataFrame.to_csv with an index)
+    Returns the read settings (layout, skiprows, usecols, column names) or None if
+    the layout is not recognised, in which case the caller falls back to trial reads.
+    """
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        rows = [r for r in itertools.islice(csv.reader(f), n_lines)]
+    if len(rows) < 2:
+        return None
+    header = [c.strip() for c in rows[0]]
+    lower = [c.lower() for c in header]
+
+    # first row whose leading cell is a timestamp is where data starts
+    data_start = next((i for i, r in enumerate(rows[1:], start=1) if r and _looks_like_datetime(r[0])), None)
+
+    dt_idx = next((i for i, c in enumerate(lower) if c in _DT_NAMES), None)
+    if data_start is not None and data_start > 1:
+        layout, dt_idx = "yfinance", 0
+    elif dt_idx is not None:
+        layout = "plain"
+    elif data_start == 1 and header[0] == "":
+        layout, dt_idx = "datetime_index", 0
+    elif data_start == 1:
+        layout, dt_idx = "plain", 0
+    else:
+        return None
+    if data_start is None:
+        data_start = 1
+
+    cols = {"datetime": dt_idx}
+    for want in ("open", "high", "low", "close", "volume"):
+        idx = next((i for i, c in enumerate(lower) if c == want and i != dt_idx), None)
+        if idx is None:
+            idx = next((i for i, c in enumerate(lower) if _OHLCV_ALT.get(c) == want and i != dt_idx), None)
+        if idx is not None:
+            cols[want] = idx
+    if not all(k in cols for k in ("open", "high", "low", "close")):
+        return None
+    # every other column passes through under its lower-cased name, as the fallback keeps it
+    used = set(cols.values())
+    for i, c in enumerate(lower):
+        name = c or f"unnamed: {i}"
+        if i not in used and name not in cols:
+            cols[name] = i
+
+    ordered = sorted(cols.items(), key=lambda kv: kv[1])
+    return {
+        "layout": layout,
+        "skiprows": data_start,
+        "usecols": [i for _, i in ordered],
+        "names": [name for name, _ in ordered],
+    }
+
+def _read_sniffed(path: str) -> Optional[pd.DataFrame]:
+    """One pd.read_csv configured from sniff_csv_layout; None when the fast path does not apply."""
+    layout = sniff_csv_layout(path)
+    if layout is None:
+        return None
+    names = layout["names"]
+    try:
+        df = pd.read_csv(path, header=None, skiprows=layout["skiprows"], usecols=layout["usecols"],
+                         dtype={i: "float64" for i, n in zip(layout["usecols"], names) if n in _OHLCV},
+                         encoding="utf-8-sig")
+    except (ValueError, TypeError):
+        # non-numeric junk in a price column: let the coercing fallback handle it
+        return None
+    df.columns = [names[layout["usecols"].index(c)] for c in df.columns]
+    try:
+        df["datetime"] = pd.to_datetime(df["datetime"])
+    except (ValueError, TypeError):
+        df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
+    if "volume" not in df.columns:
+        df["volume"] = 0.0
+    return df[["datetime"] + [c for c in df.columns if c != "datetime"]]
+
+def read_csv_robust(path: str) -> pd.DataFrame:
+    """
+    Read an OHLCV CSV into columns datetime/open/high/low/close/volume.
+    The layout is sniffed from the first lines and read once with explicit dtypes;
+    files the sniffer does not recognise go through the trial-read fallback.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+
+    df = _read_sniffed(path)
+    if df is None:
+        df = _read_csv_fallback(path)
+
     # drop rows with missing core values
     before = len(df)
     df = df.dropna(subset=["datetime","open","high","low","close"]).sort_values("datetime").reset_index(drop=True)
@@ -128,30 +254,24 @@ def read_csv_robust(path: str) -> pd.DataFrame:
 # -------------------------
 # Indicators
 # -------------------------
-def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
+def add_indicators(df: pd.DataFrame, session_vwap: bool = False) -> pd.DataFrame:
+    """
+    session_vwap=False: one cumulative VWAP over the whole frame.
+    session_vwap=True: VWAP resets on each IST trading date (multi-day files).
+    """
     d = df.copy()
-    d["ema9"]  = d["close"].ewm(span=9, adjust=False).mean()
-    d["ema21"] = d["close"].ewm(span=21, adjust=False).mean()
+    close = d["close"].to_numpy(dtype=float)
+    d["ema9"]  = ind.ema(close, 9)
+    d["ema21"] = ind.ema(close, 21)
 
     # RSI14 (Wilder-like)
-    delta = d["close"].diff()
-    up = delta.clip(lower=0)
-    down = -delta.clip(upper=0)
-    roll_up = up.ewm(alpha=1/14, adjust=False).mean()
-    roll_down = down.ewm(alpha=1/14, adjust=False).mean()
-    rs = roll_up / roll_down.replace(0, np.nan)
-    d["rsi14"] = 100 - (100 / (1 + rs))
-    d["rsi14"] = d["rsi14"].fillna(50)
+    d["rsi14"] = ind.wilder_rsi(close, 14)
 
     # VWAP
-    typical = (d["high"] + d["low"] + d["close"]) / 3.0
-    cum_typ_vol = (typical * d["volume"]).cumsum()
-    cum_vol = d["volume"].cumsum()
-    with np.errstate(divide="ignore", invalid="ignore"):
-        vwap = cum_typ_vol / cum_vol
-    d["vwap"] = vwap.fillna(method="ffill").fillna(d["close"])
-
-    d["vol_avg_20"] = d["volume"].rolling(window=20, min_periods=1).mean()
+    session = ind.trading_dates(d["datetime"], IST) if session_vwap else None
+    d["vwap"] = ind.vwap(d["high"], d["low"], close, d["volume"], session=session)
+
+    d["vol_avg_20"] = ind.rolling_mean(d["volume"], 20)
     return d
 
 # -------------------------
@@ -190,7 +310,84 @@ class Trade:
             "exit_reason": self.exit_reason
         }
 
+class JournalSink:
+    """
+    Buffered trade journal writer.
+    Rows are kept in memory and written with one open() per flush (every
+    flush_every rows, and on flush()/close()), instead of one open per trade.
+
+    per_run=False: rows go to `path` with a leading run_id column, so repeated
+                   backtests can be told apart (and de-duplicated) in one file.
+    per_run=True:  rows go to '<path stem>_<run_id>.csv', truncated on first write.
+    """
+    def __init__(self, path: str, run_id: Optional[str] = None, per_run: bool = False, flush_every: int = 1000):
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.per_run = per_run
+        self.flush_every = max(1, int(flush_every))
+        if per_run:
+            stem, ext = os.path.splitext(path)
+            self.path = f"{stem}_{self.run_id}{ext or '.csv'}"
+        else:
+            self.path = path
+        self._rows: List[dict] = []
+        self._fieldnames: Optional[List[str]] = None
+        self._started = False
+
+    def write(self, row: dict) -> None:
+        if not self.per_run:
+            row = {"run_id": self.run_id, **row}
+        self._rows.append(row)
+        if len(self._rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        if self._fieldnames is None:
+            self._fieldnames = list(self._rows[0].keys())
+        ensure_dir(os.path.dirname(self.path) or ".")
+        if not self._started:
+            self._started = True
+            if self.per_run or not os.path.exists(self.path):
+                mode, header = "w", True
+            else:
+                self._upgrade_header()
+                mode, header = "a", False
+        else:
+            mode, header = "a", False
+        with open(self.path, mode, newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self._fieldnames, extrasaction="ignore")
+            if header:
+                writer.writeheader()
+            writer.writerows(self._rows)
+        self._rows.clear()
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "JournalSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _upgrade_header(self) -> None:
+        """One-off rewrite of a journal written before run_id existed (old rows get an empty run_id)."""
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            existing = reader.fieldnames or []
+            if existing == self._fieldnames:
+                return
+            old_rows = list(reader)
+        fieldnames = self._fieldnames + [c for c in existing if c not in self._fieldnames]
+        with open(self.path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(old_rows)
+        self._fieldnames = fieldnames
+
 def append_journal(row: dict, path: str):
+    """Single-row append (one open per call). Backtests use JournalSink instead."""
     ensure_dir(os.path.dirname(path) or ".")
     exists = os.path.exists(path)
     with open(path, "a", newline="", encoding="utf-8") as f:
@@ -206,10 +403,39 @@ def run_backtest(df: pd.DataFrame,
                  tp: float = 0.005,
                  sl: float = 0.0025,
                  vol_window: int = 20,
-                 out_dir: str = "data") -> Tuple[pd.DataFrame, dict, str]:
-    d = add_indicators(df.copy())
-    d["vol_avg"] = d["volume"].rolling(window=vol_window, min_periods=1).mean()
-
+                 out_dir: Optional[str] = "data",
+                 engine: str = "loop",
+                 ema_fast: int = 9,
+                 ema_slow: int = 21,
+                 journal: Optional[JournalSink] = None,
+                 session_vwap: bool = False) -> Tuple[pd.DataFrame, dict, str]:
+    """
+    Run the EMA-cross strategy over df.
+    engine="loop" walks the frame bar by bar; engine="vectorized" computes the
+    signal masks as arrays and only steps through entry/exit pairs. Both
+    produce the same trades.
+    Closed trades go to journal (default: a JournalSink on out_dir/trades_journal.csv
+    with a fresh run_id); it is flushed before returning.
+    out_dir=None skips the default journal and the results CSV (used by the sweep runner).
+    session_vwap=True resets VWAP (and so the VWAP_BREAK exit) on each IST trading date.
+    """
+    d = add_indicators(df.copy(), session_vwap=session_vwap)
+    d["vol_avg"] = ind.rolling_mean(d["volume"], vol_window)
+    d["ema_fast"] = ind.ema(d["close"], ema_fast)
+    d["ema_slow"] = ind.ema(d["close"], ema_slow)
+
+    if engine not in ("loop", "vectorized"):
+        raise ValueError(f"Unknown engine '{engine}' (expected 'loop' or 'vectorized')")
+    if journal is None and out_dir is not None:
+        journal = JournalSink(os.path.join(out_dir, "trades_journal.csv"))
+
+    simulate = _simulate_vectorized if engine == "vectorized" else _simulate_loop
+    trades = simulate(d, tp=tp, sl=sl, journal=journal)
+    if journal is not None:
+        journal.flush()
+    return _summarize(trades, out_dir)
+
+def _simulate_loop(d: pd.DataFrame, tp: float, sl: float, journal: Optional[JournalSink]) -> List[Trade]:
     trades: List[Trade] = []
     position: Optional[Trade] = None
 
@@ -217,9 +443,9 @@ def run_backtest(df: pd.DataFrame,
         prev = d.iloc[i-1]
         row  = d.iloc[i]
 
-        # primary entry trigger: EMA9 crossing above EMA21
-        ema_cross_up = (prev["ema9"] <= prev["ema21"]) and (row["ema9"] > row["ema21"])
-        ema_cross_down = (prev["ema9"] >= prev["ema21"]) and (row["ema9"] < row["ema21"])
+        # primary entry trigger: fast EMA (EMA9 by default) crossing above slow EMA (EMA21)
+        ema_cross_up = (prev["ema_fast"] <= prev["ema_slow"]) and (row["ema_fast"] > row["ema_slow"])
+        ema_cross_down = (prev["ema_fast"] >= prev["ema_slow"]) and (row["ema_fast"] < row["ema_slow"])
 
         # supportive signals
         price_above_vwap = float(row["close"]) > float(row["vwap"])
@@ -262,58 +488,505 @@ def run_backtest(df: pd.DataFrame,
 
             if exit_reason:
                 position.close(time=row["datetime"], price=cur, reason=exit_reason)
-                append_journal(position.to_dict(), os.path.join(out_dir, "trades_journal.csv"))
+                if journal is not None:
+                    journal.write(position.to_dict())
                 position = None
 
     # EOD close any open position
     if position is not None and position.exit_time is None:
         last = d.iloc[-1]
         position.close(time=last["datetime"], price=float(last["close"]), reason="EOD_CLOSE")
-        append_journal(position.to_dict(), os.path.join(out_dir, "trades_journal.csv"))
+        if journal is not None:
+            journal.write(position.to_dict())
         position = None
 
-    closed = [t.to_dict() for t in trades if t.exit_time is not None]
-    results = pd.DataFrame(closed)
+    return trades
+
+# -------------------------
+# Vectorized engine
+# -------------------------
+def compute_signals(d: pd.DataFrame) -> dict:
+    """
+    Entry/exit masks for the EMA-cross strategy as NumPy bool arrays.
+    Expects the columns produced by add_indicators plus 'vol_avg', 'ema_fast' and 'ema_slow'.
+    Bar 0 never carries a cross (there is no previous bar), as in the loop engine.
+    """
+    close = d["close"].to_numpy(dtype=float)
+    vwap = d["vwap"].to_numpy(dtype=float)
+    rsi = d["rsi14"].to_numpy(dtype=float)
+    volume = d["volume"].to_numpy(dtype=float)
+    half_avg = 0.5 * d["vol_avg"].to_numpy(dtype=float)
+
+    cross_up, cross_down = ind.crossover(d["ema_fast"], d["ema_slow"])
+
+    return {
+        "close": close,
+        "cross_up": cross_up,
+        "cross_down": cross_down,
+        "vwap_ok": close > vwap,
+        "vwap_break": close < vwap,
+        "rsi_ok": rsi < 70,
+        # same as max(1.0, 0.5 * vol_avg), including the NaN case
+        "vol_ok": volume >= np.where(half_avg > 1.0, half_avg, 1.0),
+    }
+
+def _entry_reason(sig: dict, i: int) -> str:
+    reasons = [name for name, key in (("VWAP_OK", "vwap_ok"), ("RSI_OK", "rsi_ok"), ("VOL_OK", "vol_ok")) if sig[key][i]]
+    return "EMA_CROSS_UP" + ("+" + "+".join(reasons) if reasons else "")
+
+def _exit_reason(sig: dict, j: int, tp_level: float, sl_level: float) -> str:
+    cur = sig["close"][j]
+    if cur >= tp_level:
+        return "TP"
+    if cur <= sl_level:
+        return "SL"
+    if sig["vwap_break"][j]:
+        return "VWAP_BREAK"
+    return "EMA_CROSS_DOWN"
+
+def _simulate_vectorized(d: pd.DataFrame, tp: float, sl: float, journal: Optional[JournalSink]) -> List[Trade]:
+    """
+    Same state machine as _simulate_loop, but it only visits entry bars.
+    For an open position the price-independent exits (VWAP break, EMA cross down)
+    are looked up with searchsorted, and TP/SL is a single array scan over the bars
+    up to that exit, so the total work stays linear in the number of bars.
+    """
+    sig = compute_signals(d)
+    close = sig["close"]
+    times = d["datetime"]
+    n = len(close)
+    entries = np.flatnonzero(sig["cross_up"])
+    static_exits = np.flatnonzero(sig["vwap_break"] | sig["cross_down"])
+
+    trades: List[Trade] = []
+    k = 0
+    while k < len(entries):
+        i = int(entries[k])
+        entry_price = float(close[i])
+        tp_level = entry_price * (1 + tp)
+        sl_level = entry_price * (1 - sl)
+
+        s = int(np.searchsorted(static_exits, i))
+        has_static = s < len(static_exits)
+        stop = int(static_exits[s]) if has_static else n - 1
+        seg = close[i:stop + 1]
+        hit = (seg >= tp_level) | (seg <= sl_level)
+
+        position = Trade(entry_time=times.iloc[i], entry_price=entry_price, direction="LONG")
+        position.entry_reason = _entry_reason(sig, i)
+        trades.append(position)
+
+        if hit.any():
+            j = i + int(np.argmax(hit))
+            reason = _exit_reason(sig, j, tp_level, sl_level)
+        elif has_static:
+            j = stop
+            reason = _exit_reason(sig, j, tp_level, sl_level)
+        else:
+            j = n - 1
+            reason = "EOD_CLOSE"
+
+        position.close(time=times.iloc[j], price=float(close[j]), reason=reason)
+        if journal is not None:
+            journal.write(position.to_dict())
+        # next entry can only happen on a bar after the exit bar
+        k = int(np.searchsorted(entries, j, side="right"))
+
+    return trades
 
+def summarize_results(results: pd.DataFrame) -> dict:
     if results.empty:
-        summary = {"total_trades": 0, "total_pnl": 0.0, "avg_pnl": 0.0, "win_rate": 0.0}
-    else:
+        return {"total_trades": 0, "total_pnl": 0.0, "avg_pnl": 0.0, "win_rate": 0.0}
+    return {
+        "total_trades": int(len(results)),
+        "total_pnl": float(results["pnl"].sum()),
+        "avg_pnl": float(results["pnl"].mean()),
+        "win_rate": float((results["pnl"] > 0).mean())
+    }
+
+def _summarize(trades: List[Trade], out_dir: Optional[str]) -> Tuple[pd.DataFrame, dict, Optional[str]]:
+    closed = [t.to_dict() for t in trades if t.exit_time is not None]
+    results = pd.DataFrame(closed)
+    if not results.empty:
         results["pnl_percent"] = results["pnl"] / results["entry_price"]
-        summary = {
-            "total_trades": int(len(results)),
-            "total_pnl": float(results["pnl"].sum()),
-            "avg_pnl": float(results["pnl"].mean()),
-            "win_rate": float((results["pnl"] > 0).mean())
-        }
+    summary = summarize_results(results)
 
+    if out_dir is None:
+        return results, summary, None
     ensure_dir(out_dir)
     out_path = os.path.join(out_dir, "backtest_results.csv")
     results.to_csv(out_path, index=False)
     return results, summary, out_path
 
+# -------------------------
+# Streaming strategy (live loop / feed consumers)
+# -------------------------
+class EmaCrossStrategy:
+    """
+    The _simulate_loop rules applied one closed candle at a time, with indicators
+    from indicators.IndicatorState, for live use. Feeding every bar of a frame and
+    then close_open() at the last bar gives the same trades as run_backtest(engine="loop").
+
+    on_bar() returns the actions taken on that bar: ("ENTRY", trade) / ("EXIT", trade).
+    """
+    def __init__(self, tp: float = 0.005, sl: float = 0.0025, vol_window: int = 20,
+                 ema_fast: int = 9, ema_slow: int = 21, session_vwap: bool = False,
+                 journal: Optional[JournalSink] = None):
+        self.tp, self.sl = tp, sl
+        self.ema_fast, self.ema_slow, self.vol_window = ema_fast, ema_slow, vol_window
+        self.journal = journal
+        self.state = ind.IndicatorState(ema_spans=sorted({9, 21, ema_fast, ema_slow}), vol_window=vol_window,
+                                        session_vwap=session_vwap, tz=IST)
+        self.prev: Optional[dict] = None
+        self.position: Optional[Trade] = None
+        self.trades: List[Trade] = []
+        self.last_bar: Optional[dict] = None
+
+    def _fold(self, bar) -> dict:
+        vals = self.state.update(bar)
+        return {"ema_fast": vals[f"ema{self.ema_fast}"], "ema_slow": vals[f"ema{self.ema_slow}"],
+                "rsi14": vals["rsi14"], "vwap": vals["vwap"], "vol_avg": vals[f"vol_avg_{self.vol_window}"]}
+
+    def warm_up(self, df: pd.DataFrame) -> None:
+        """Run historical candles through the indicators only (no trades)."""
+        for bar in df.to_dict("records"):
+            self.prev = self._fold(bar)
+            self.last_bar = bar
+
+    def on_bar(self, bar) -> List[Tuple[str, Trade]]:
+        cur_vals = self._fold(bar)
+        prev, self.prev = self.prev, cur_vals
+        self.last_bar = bar
+        if prev is None:
+            return []
+        actions: List[Tuple[str, Trade]] = []
+        close = float(bar["close"])
+        ema_cross_up = (prev["ema_fast"] <= prev["ema_slow"]) and (cur_vals["ema_fast"] > cur_vals["ema_slow"])
+        ema_cross_down = (prev["ema_fast"] >= prev["ema_slow"]) and (cur_vals["ema_fast"] < cur_vals["ema_slow"])
+
+        if self.position is None and ema_cross_up:
+            reasons = [name for name, ok in (("VWAP_OK", close > cur_vals["vwap"]),
+                                             ("RSI_OK", cur_vals["rsi14"] < 70),
+                                             ("VOL_OK", float(bar.get("volume", 0.0) or 0.0) >= max(1.0, 0.5 * cur_vals["vol_avg"])))
+                       if ok]
+            self.position = Trade(entry_time=bar["datetime"], entry_price=close, direction="LONG")
+            self.position.entry_reason = "EMA_CROSS_UP" + ("+" + "+".join(reasons) if reasons else "")
+            self.trades.append(self.position)
+            actions.append(("ENTRY", self.position))
+
+        if self.position is not None:
+            exit_reason = None
+            if close >= self.position.entry_price * (1 + self.tp):
+                exit_reason = "TP"
+            elif close <= self.position.entry_price * (1 - self.sl):
+                exit_reason = "SL"
+            elif close < cur_vals["vwap"]:
+                exit_reason = "VWAP_BREAK"
+            elif ema_cross_down:
+                exit_reason = "EMA_CROSS_DOWN"
+            if exit_reason:
+                actions.append(("EXIT", self._close(bar["datetime"], close, exit_reason)))
+        return actions
+
+    def close_open(self, reason: str = "EOD_CLOSE") -> Optional[Trade]:
+        """Close any open position at the last bar seen."""
+        if self.position is None or self.last_bar is None:
+            return None
+        return self._close(self.last_bar["datetime"], float(self.last_bar["close"]), reason)
+
+    def _close(self, time, price: float, reason: str) -> Trade:
+        trade, self.position = self.position, None
+        trade.close(time=time, price=price, reason=reason)
+        if self.journal is not None:
+            self.journal.write(trade.to_dict())
+        return trade
+
+# -------------------------
+# Parameter sweep (process pool + shared memory)
+# -------------------------
+SWEEP_PARAMS = ("tp", "sl", "vol_window", "ema_fast", "ema_slow")
+SWEEP_DEFAULTS = {"tp": "0.005", "sl": "0.0025", "vol_window": "20", "ema_fast": "9", "ema_slow": "21"}
+_OHLCV = ("open", "high", "low", "close", "volume")
+
+# per-worker frame, rebuilt once from shared memory by _sweep_worker_init, and the
+# run_backtest options shared by every combo of the sweep
+_SWEEP_DF: Optional[pd.DataFrame] = None
+_SWEEP_OPTIONS: dict = {}
+
+def parse_grid(spec: str, cast=float) -> list:
+    """
+    Parse a sweep range: '0.003,0.005,0.008' (explicit values) or
+    'start:stop:step' (inclusive of stop), e.g. '0.002:0.006:0.001'.
+    """
+    spec = str(spec).strip()
+    if ":" not in spec:
+        return [cast(v) for v in spec.split(",") if v.strip()]
+    start, stop, step = (float(p) for p in spec.split(":"))
+    if step <= 0:
+        raise ValueError(f"Range step must be positive: '{spec}'")
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return [cast(round(start + k * step, 10)) for k in range(max(count, 0))]
+
+def build_grid(specs: dict) -> List[dict]:
+    """Cartesian product of the parsed ranges; drops combos where ema_fast >= ema_slow."""
+    casts = {"tp": float, "sl": float, "vol_window": int, "ema_fast": int, "ema_slow": int}
+    values = [parse_grid(specs.get(k, SWEEP_DEFAULTS[k]), casts[k]) for k in SWEEP_PARAMS]
+    grid = [dict(zip(SWEEP_PARAMS, combo)) for combo in itertools.product(*values)]
+    return [g for g in grid if g["ema_fast"] < g["ema_slow"]]
+
+def _share_ohlcv(df: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, dict]:
+    """
+    Copy datetime + OHLCV into one shared memory block:
+    n int64 nanosecond timestamps followed by a (5, n) float64 block.
+    """
+    n = len(df)
+    dt = df["datetime"]
+    tz = str(dt.dt.tz) if getattr(dt.dt, "tz", None) is not None else None
+    shm = shared_memory.SharedMemory(create=True, size=max(1, n * 8 * (1 + len(_OHLCV))))
+    ts = block = None
+    try:
+        ts = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+        block = np.ndarray((len(_OHLCV), n), dtype=np.float64, buffer=shm.buf, offset=n * 8)
+        ts[:] = dt.dt.tz_convert("UTC").dt.tz_localize(None).astype("datetime64[ns]").astype(np.int64) if tz else dt.astype("datetime64[ns]").astype(np.int64)
+        for k, col in enumerate(_OHLCV):
+            block[k] = df[col].to_numpy(dtype=float)
+    except BaseException:
+        # a frame that can't be copied in (missing column, bad dtype) must not leak the block
+        ts = block = None  # drop the views so the buffer can be closed
+        shm.close()
+        shm.unlink()
+        raise
+    return shm, {"name": shm.name, "rows": n, "tz": tz}
+
+def _attach_ohlcv(meta: dict) -> pd.DataFrame:
+    shm = shared_memory.SharedMemory(name=meta["name"])
+    try:
+        n = meta["rows"]
+        ts = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+        block = np.ndarray((len(_OHLCV), n), dtype=np.float64, buffer=shm.buf, offset=n * 8)
+        dt = pd.to_datetime(ts.copy(), unit="ns")
+        if meta["tz"]:
+            dt = dt.tz_localize("UTC").tz_convert(meta["tz"])
+        df = pd.DataFrame({"datetime": dt})
+        for k, col in enumerate(_OHLCV):
+            df[col] = block[k].copy()
+    finally:
+        shm.close()
+    return df
+
+def _sweep_worker_init(meta: dict, options: Optional[dict] = None) -> None:
+    global _SWEEP_DF, _SWEEP_OPTIONS
+    _SWEEP_DF = _attach_ohlcv(meta)
+    _SWEEP_OPTIONS = dict(options or {})
+
+def _sweep_run(params: dict) -> dict:
+    _, summary, _ = run_backtest(_SWEEP_DF, out_dir=None, engine="vectorized", **_SWEEP_OPTIONS, **params)
+    return {**params, **summary}
+
+def run_sweep(df: pd.DataFrame,
+              grid: List[dict],
+              workers: Optional[int] = None,
+              rank_by: str = "total_pnl",
+              session_vwap: bool = False) -> pd.DataFrame:
+    """
+    Run every parameter combo in grid on a process pool and return one table
+    of params + summary, best first. The OHLCV is placed in shared memory once;
+    workers attach to it at startup instead of receiving a pickled DataFrame per task.
+    session_vwap applies to every combo (see run_backtest).
+    """
+    if not grid:
+        return pd.DataFrame(columns=list(SWEEP_PARAMS) + ["total_trades", "total_pnl", "avg_pnl", "win_rate"])
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(grid) // (workers * 4))
+    shm, meta = _share_ohlcv(df)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_sweep_worker_init,
+                                 initargs=(meta, {"session_vwap": session_vwap})) as pool:
+            rows = list(pool.map(_sweep_run, grid, chunksize=chunksize))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    table = pd.DataFrame(rows)
+    tie_break = "win_rate" if rank_by != "win_rate" else "total_pnl"
+    table = table.sort_values([rank_by, tie_break], ascending=False, kind="mergesort").reset_index(drop=True)
+    table.insert(0, "rank", np.arange(1, len(table) + 1))
+    return table
+
+def sweep_main(argv) -> None:
+    parser = argparse.ArgumentParser(
+        prog="backtest.py sweep",
+        description="Grid-search tp/sl/vol_window/EMA spans. Ranges are 'a,b,c' or 'start:stop:step'.")
+    parser.add_argument("csv_path")
+    parser.add_argument("--tp", default=SWEEP_DEFAULTS["tp"])
+    parser.add_argument("--sl", default=SWEEP_DEFAULTS["sl"])
+    parser.add_argument("--vol-window", dest="vol_window", default=SWEEP_DEFAULTS["vol_window"])
+    parser.add_argument("--ema-fast", dest="ema_fast", default=SWEEP_DEFAULTS["ema_fast"])
+    parser.add_argument("--ema-slow", dest="ema_slow", default=SWEEP_DEFAULTS["ema_slow"])
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--rank-by", dest="rank_by", default="total_pnl",
+                        choices=["total_pnl", "avg_pnl", "win_rate", "total_trades"])
+    parser.add_argument("--session-vwap", dest="session_vwap", action="store_true",
+                        help="reset VWAP on each IST trading date")
+    parser.add_argument("--out", default=os.path.join("data", "sweep_results.csv"))
+    args = parser.parse_args(argv)
+
+    df = load_ohlcv(args.csv_path)
+    grid = build_grid({k: getattr(args, k) for k in SWEEP_PARAMS})
+    print(f"Running {len(grid)} combinations on {args.workers or os.cpu_count()} workers...")
+    table = run_sweep(df, grid, workers=args.workers, rank_by=args.rank_by, session_vwap=args.session_vwap)
+
+    ensure_dir(os.path.dirname(args.out))
+    table.to_csv(args.out, index=False)
+    print("\nTop combinations:")
+    print(table.head(10).to_string(index=False))
+    print(f"Saved sweep results to: {args.out}")
+
+# -------------------------
+# Multi-symbol universe (one process per symbol)
+# -------------------------
+def resolve_universe(spec: str) -> List[str]:
+    """A directory (all *.csv inside) or a glob pattern -> sorted list of CSV paths."""
+    if os.path.isdir(spec):
+        paths = glob.glob(os.path.join(spec, "*.csv"))
+    else:
+        paths = glob.glob(spec)
+    return sorted(p for p in paths if os.path.isfile(p))
+
+def symbol_from_path(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+def _universe_run(path: str, params: dict) -> Tuple[str, Optional[pd.DataFrame], dict, Optional[str]]:
+    """Worker: load (through the columnar cache) and backtest one symbol."""
+    symbol = symbol_from_path(path)
+    try:
+        df = load_ohlcv(path)
+        results, summary, _ = run_backtest(df, out_dir=None, engine="vectorized", **params)
+        return symbol, results, summary, None
+    except Exception as exc:
+        return symbol, None, {}, str(exc)
+
+def _to_ist(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """Put time columns on one clock so symbols can be merged: naive times are taken as IST."""
+    for col in columns:
+        ts = pd.to_datetime(df[col])
+        df[col] = ts.dt.tz_localize(IST) if ts.dt.tz is None else ts.dt.tz_convert(IST)
+    return df
+
+def equity_curve(trades: pd.DataFrame) -> pd.DataFrame:
+    """Portfolio equity (cumulative pnl) stepped at each trade exit across all symbols."""
+    if trades.empty:
+        return pd.DataFrame(columns=["exit_time", "symbol", "pnl", "equity", "drawdown"])
+    curve = trades[["exit_time", "symbol", "pnl"]].sort_values(["exit_time", "symbol"], kind="mergesort").reset_index(drop=True)
+    curve["equity"] = curve["pnl"].cumsum()
+    curve["drawdown"] = curve["equity"] - curve["equity"].cummax().clip(lower=0)
+    return curve
+
+def run_universe(paths: List[str],
+                 workers: Optional[int] = None,
+                 **params) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, dict]:
+    """
+    Backtest every CSV in paths on a process pool; each worker loads its own file,
+    so the files are read concurrently and no DataFrame crosses a process boundary
+    on the way in. Returns (per-symbol table, all trades, equity curve, portfolio summary).
+    """
+    workers = workers or os.cpu_count() or 1
+    rows, frames = [], []
+    with ProcessPoolExecutor(max_workers=min(workers, max(1, len(paths)))) as pool:
+        futures = [pool.submit(_universe_run, p, params) for p in paths]
+        for fut in futures:
+            symbol, results, summary, error = fut.result()
+            rows.append({"symbol": symbol, **summary, "error": error})
+            if results is not None and not results.empty:
+                frames.append(_to_ist(results.assign(symbol=symbol), ("entry_time", "exit_time")))
+
+    per_symbol = pd.DataFrame(rows, columns=["symbol", *summarize_results(pd.DataFrame()).keys(), "error"])
+    trades = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["symbol", "exit_time", "pnl"])
+    curve = equity_curve(trades)
+    portfolio = summarize_results(trades)
+    portfolio.update({
+        "symbols": int(len(paths)),
+        "failed": int(per_symbol["error"].notna().sum()) if not per_symbol.empty else 0,
+        "max_drawdown": float(curve["drawdown"].min()) if not curve.empty else 0.0,
+    })
+    return per_symbol, trades, curve, portfolio
+
+def universe_main(argv) -> None:
+    parser = argparse.ArgumentParser(
+        prog="backtest.py universe",
+        description="Backtest every CSV in a directory or glob (one symbol per file) in parallel.")
+    parser.add_argument("source", help="directory of CSVs or a glob such as 'data/options/*.csv'")
+    parser.add_argument("--tp", type=float, default=0.005)
+    parser.add_argument("--sl", type=float, default=0.0025)
+    parser.add_argument("--vol-window", dest="vol_window", type=int, default=20)
+    parser.add_argument("--ema-fast", dest="ema_fast", type=int, default=9)
+    parser.add_argument("--ema-slow", dest="ema_slow", type=int, default=21)
+    parser.add_argument("--session-vwap", dest="session_vwap", action="store_true",
+                        help="reset VWAP on each IST trading date")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--out-dir", dest="out_dir", default="data")
+    args = parser.parse_args(argv)
+
+    paths = resolve_universe(args.source)
+    if not paths:
+        raise ValueError(f"No CSV files found for '{args.source}'")
+    params = {k: getattr(args, k) for k in SWEEP_PARAMS}
+    params["session_vwap"] = args.session_vwap
+    print(f"Backtesting {len(paths)} symbols on {args.workers or os.cpu_count()} workers...")
+    per_symbol, trades, curve, portfolio = run_universe(paths, workers=args.workers, **params)
+
+    ensure_dir(args.out_dir)
+    per_symbol.to_csv(os.path.join(args.out_dir, "universe_summary.csv"), index=False)
+    trades.to_csv(os.path.join(args.out_dir, "universe_trades.csv"), index=False)
+    curve.to_csv(os.path.join(args.out_dir, "universe_equity.csv"), index=False)
+
+    print("\nPer-symbol summary:")
+    print(per_symbol.to_string(index=False))
+    print("\nPortfolio summary:")
+    for k, v in portfolio.items():
+        print(f"  {k}: {v}")
+    print(f"Saved universe_summary.csv, universe_trades.csv and universe_equity.csv to: {args.out_dir}")
+
 # -------------------------
 # Main CLI
 # -------------------------
+def run_main(argv) -> None:
+    parser = argparse.ArgumentParser(prog="backtest.py", description="Backtest the EMA-cross strategy on one CSV.")
+    parser.add_argument("csv_path")
+    parser.add_argument("--session-vwap", dest="session_vwap", action="store_true",
+                        help="reset VWAP on each IST trading date")
+    args = parser.parse_args(argv)
+
+    df = load_ohlcv(args.csv_path)
+    results, summary, outp = run_backtest(df, tp=0.005, sl=0.0025, vol_window=20, out_dir="data",
+                                          engine="vectorized", session_vwap=args.session_vwap)
+    print("\nBacktest Summary:")
+    for k,v in summary.items():
+        print(f"  {k}: {v}")
+    print(f"Saved trade results to: {outp}")
+    if not results.empty:
+        print("\nSample trades:")
+        print(results.head(10).to_string(index=False))
+
 def main(argv=None):
     if argv is None:
         argv = sys.argv[1:]
     if not argv:
-        print("Usage: python backtest.py <data.csv>")
+        print("Usage: python backtest.py <data.csv> [--session-vwap]")
+        print("       python backtest.py sweep <data.csv> [--tp 0.003:0.008:0.001 --sl ... --vol-window ... --ema-fast ... --ema-slow ... --session-vwap]")
+        print("       python backtest.py universe <dir-or-glob> [--workers N --tp ... --sl ...]")
         sys.exit(1)
+    if argv[0] in ("sweep", "universe"):
+        command = argv[0]
+        try:
+            (sweep_main if command == "sweep" else universe_main)(argv[1:])
+        except Exception as exc:
+            print(f"Error during {command}:", str(exc))
+            sys.exit(1)
+        return
 
-    csv_path = argv[0]
     try:
-        df = read_csv_robust(csv_path)
-        results, summary, outp = run_backtest(df, tp=0.005, sl=0.0025, vol_window=20, out_dir="data")
-        print("
-Backtest Summary:")
-        for k,v in summary.items():
-            print(f"  {k}: {v}")
-        print(f"Saved trade results to: {outp}")
-        if not results.empty:
-            print("
-Sample trades:")
-            print(results.head(10).to_string(index=False))
+        run_main(argv)
     except Exception as exc:
         print("Error during backtest:", str(exc))
         sys.exit(1)
@@ -0,0 +1,98 @@
+# bench_indicators.py
+"""
+Micro-benchmark: indicators.py kernels vs the pandas ewm/rolling/groupby paths
+they replace, on synthetic 1-minute bars.
+
+Run:
+    python bench_indicators.py                     # 1e4 .. 1e6 bars
+    python bench_indicators.py --sizes 1e4,1e5,1e6,1e7 --repeat 3
+    INDICATORS_NO_NUMBA=1 python bench_indicators.py   # time the non-JIT fallback
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import indicators as ind
+from synth_market import SyntheticMarket
+
+def make_bars(n: int, seed: int = 0) -> pd.DataFrame:
+    """n 1-minute session bars from synth_market (session = trading-day ordinal)."""
+    a = SyntheticMarket(seed=seed).arrays(n, start="2024-01-01")
+    df = pd.DataFrame({
+        "high": a["high"],
+        "low": a["low"],
+        "close": a["close"],
+        "volume": a["volume"].astype(float),
+        "session": a["session"] - a["session"][0],
+    })
+    df["fast"] = df["close"].ewm(span=9, adjust=False).mean()
+    df["slow"] = df["close"].ewm(span=21, adjust=False).mean()
+    return df
+
+
+def pandas_rsi(close: pd.Series) -> pd.Series:
+    delta = close.diff()
+    roll_up = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    roll_down = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean()
+    rs = roll_up / roll_down.replace(0, np.nan)
+    return (100 - (100 / (1 + rs))).fillna(50)
+
+
+def pandas_vwap(df: pd.DataFrame, by=None) -> pd.Series:
+    tv = (df["high"] + df["low"] + df["close"]) / 3.0 * df["volume"]
+    if by is None:
+        return (tv.cumsum() / df["volume"].cumsum()).ffill().fillna(df["close"])
+    return (tv.groupby(by).cumsum() / df["volume"].groupby(by).cumsum()).groupby(by).ffill().fillna(df["close"])
+
+
+CASES = {
+    "ema(9)": (lambda df: df["close"].ewm(span=9, adjust=False).mean(),
+               lambda df: ind.ema(df["close"].to_numpy(), 9)),
+    "sma(20)": (lambda df: df["close"].rolling(window=20, min_periods=1).mean(),
+                lambda df: ind.sma(df["close"].to_numpy(), 20)),
+    "rsi(14)": (lambda df: pandas_rsi(df["close"]),
+                lambda df: ind.wilder_rsi(df["close"].to_numpy(), 14)),
+    "vwap": (lambda df: pandas_vwap(df),
+             lambda df: ind.vwap(df["high"], df["low"], df["close"], df["volume"])),
+    "session vwap": (lambda df: pandas_vwap(df, df["session"]),
+                     lambda df: ind.vwap(df["high"], df["low"], df["close"], df["volume"], session=df["session"].to_numpy())),
+    "crossover": (lambda df: (df["fast"].shift(1) <= df["slow"].shift(1)) & (df["fast"] > df["slow"]),
+                  lambda df: ind.crossover(df["fast"].to_numpy(), df["slow"].to_numpy())[0]),
+}
+
+
+def best_of(fn, df, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1e4,1e5,1e6", help="comma-separated bar counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(float(s)) for s in args.sizes.split(",")]
+
+    print(f"numba JIT: {'on' if ind.USE_NUMBA else 'off'}")
+    ind.ema(make_bars(100)["close"].to_numpy(), 9)  # warm up / compile
+    ind.sma(make_bars(100)["close"].to_numpy(), 20)
+    ind.vwap(*[make_bars(100)[c] for c in ("high", "low", "close", "volume")], session=np.zeros(100))
+
+    print(f"{'indicator':<14}{'bars':>10}{'pandas ms':>12}{'kernel ms':>12}{'speedup':>9}  same")
+    for n in sizes:
+        df = make_bars(n)
+        for name, (ref_fn, kernel_fn) in CASES.items():
+            ref_t = best_of(ref_fn, df, args.repeat)
+            ker_t = best_of(kernel_fn, df, args.repeat)
+            same = "yes" if np.array_equal(np.asarray(ref_fn(df), dtype=float), np.asarray(kernel_fn(df), dtype=float), equal_nan=True) else "NO"
+            print(f"{name:<14}{n:>10}{ref_t * 1e3:>12.2f}{ker_t * 1e3:>12.2f}{ref_t / ker_t:>8.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
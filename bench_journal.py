@@ -0,0 +1,221 @@
+# bench_journal.py
+"""
+Benchmark: journal_enrich.enrich_trades (bulk column operations) and the
+journal_analytics rollups (one cumsum / groupby) vs the row-wise .apply(),
+iterrows and per-day filter loops trading_journal_backup.py used, on synthetic
+trade tables. The row-wise references are kept here so the outputs can be compared.
+
+Run:
+    python bench_journal.py                             # 1e5 and 1e6 trades (row-wise timed up to 1e5)
+    python bench_journal.py --sizes 1e4,1e5 --rowwise-max 1e5 --repeat 3
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from journal_analytics import cumulative_balance, daily_summary
+from journal_enrich import KOLKATA, enrich_trades
+
+
+# ---- row-wise reference (as in trading_journal_backup.py before journal_enrich) ----
+def parse_datetime(val):
+    if pd.isna(val) or (isinstance(val, str) and val.strip() == ""):
+        return pd.NaT
+    try:
+        ts = pd.to_datetime(val, errors="coerce")
+        if pd.isna(ts):
+            return pd.NaT
+        # localize naive -> Kolkata, else convert
+        if getattr(ts, "tzinfo", None) is None and getattr(ts, "tz", None) is None:
+            try:
+                return ts.tz_localize(KOLKATA)
+            except Exception:
+                try:
+                    return KOLKATA.localize(ts.to_pydatetime())
+                except Exception:
+                    return pd.NaT
+        else:
+            try:
+                return ts.tz_convert(KOLKATA)
+            except Exception:
+                return ts
+    except Exception:
+        return pd.NaT
+
+
+def compute_pnl_units(row, default_lot_size):
+    try:
+        lots = float(row.get("quantity", 0.0))
+        lot_size = float(row.get("lot_size", default_lot_size)) if not pd.isna(row.get("lot_size", np.nan)) else float(default_lot_size)
+        units = lots * lot_size
+        ep = float(row.get("entry_price", np.nan))
+        xp = float(row.get("exit_price", np.nan))
+        fees = float(row.get("fees", 0.0)) if not pd.isna(row.get("fees", np.nan)) else 0.0
+        if np.isnan(ep) or np.isnan(xp) or units == 0:
+            return np.nan
+        return (xp - ep) * units - fees
+    except Exception:
+        return np.nan
+
+
+def fmt_dt_display(ts):
+    if pd.isna(ts):
+        return ""
+    try:
+        return ts.tz_convert(KOLKATA).strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        return str(ts)
+
+
+def pct_trade_calc(r, default_lot_size):
+    try:
+        lots = float(r.get("quantity", 0.0))
+        lot_size = float(r.get("lot_size", default_lot_size)) if not pd.isna(r.get("lot_size", np.nan)) else float(default_lot_size)
+        units = lots * lot_size
+        ep = float(r.get("entry_price", np.nan))
+        pnl = float(r.get("pnl", np.nan)) if not pd.isna(r.get("pnl")) else np.nan
+        if np.isnan(ep) or units == 0 or np.isnan(pnl):
+            return np.nan
+        entry_value = ep * units
+        if entry_value == 0:
+            return np.nan
+        return pnl / entry_value * 100.0
+    except Exception:
+        return np.nan
+
+
+def enrich_rowwise(df_raw: pd.DataFrame, lot_size: float = 75, default_fees: float = 0.0) -> pd.DataFrame:
+    df = df_raw.copy()
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    for c in ["trade_id", "symbol", "quantity", "lot_size", "entry_price", "exit_price",
+              "entry_time", "exit_time", "fees", "notes"]:
+        if c not in df.columns:
+            df[c] = np.nan
+    df["quantity"] = pd.to_numeric(df.get("quantity", np.nan), errors="coerce").fillna(0)
+    df["lot_size"] = pd.to_numeric(df.get("lot_size", np.nan), errors="coerce").fillna(lot_size)
+    df["entry_price"] = pd.to_numeric(df.get("entry_price", np.nan), errors="coerce")
+    df["exit_price"] = pd.to_numeric(df.get("exit_price", np.nan), errors="coerce")
+    df["fees"] = pd.to_numeric(df.get("fees", np.nan), errors="coerce").fillna(default_fees)
+    df["notes"] = df.get("notes", "").astype(str)
+    df["entry_time_parsed"] = df["entry_time"].apply(parse_datetime)
+    df["exit_time_parsed"] = df["exit_time"].apply(parse_datetime)
+    df["entry_time_display"] = df["entry_time_parsed"].apply(fmt_dt_display)
+    df["exit_time_display"] = df["exit_time_parsed"].apply(fmt_dt_display)
+    df["pnl"] = df.apply(lambda r: compute_pnl_units(r, lot_size), axis=1)
+    df["pct_trade"] = df.apply(lambda r: pct_trade_calc(r, lot_size), axis=1)
+    return df
+
+
+def rollups_rowwise(df: pd.DataFrame, initial_balance: float):
+    """iterrows cumulative balance + per-day re-filtering daily summary (df sorted by exit time)."""
+    df = df.copy()
+    running = float(initial_balance)
+    cumulatives = []
+    for _, row in df.iterrows():
+        if pd.notna(row.get("exit_price")) and pd.notna(row.get("exit_time_parsed")):
+            pnl = 0.0 if pd.isna(row.get("pnl")) else float(row.get("pnl"))
+            running += pnl
+            cumulatives.append(running)
+        else:
+            cumulatives.append(running)
+    df["cumulative_balance"] = cumulatives
+    df["date"] = df["exit_time_parsed"].dt.tz_convert(KOLKATA).dt.date
+    closed = df[df["exit_time_parsed"].notna()].copy()
+    daily_rows = []
+    prev_bal = float(initial_balance)
+    for day in sorted(closed["date"].dropna().unique()):
+        day_trades = closed[closed["date"] == day]
+        day_pnl = day_trades["pnl"].sum(min_count=1)
+        start_bal = prev_bal
+        end_bal = float(day_trades["cumulative_balance"].dropna().iloc[-1]) if not day_trades["cumulative_balance"].dropna().empty else start_bal
+        daily_pct = np.nan if start_bal == 0 else (end_bal - start_bal) / start_bal * 100.0
+        daily_rows.append({
+            "date": pd.to_datetime(day).date(),
+            "start_balance": round(start_bal,2),
+            "end_balance": round(end_bal,2),
+            "daily_pnl": round(day_pnl,2),
+            "daily_pct": round(daily_pct,4)
+        })
+        prev_bal = end_bal
+    return df["cumulative_balance"], pd.DataFrame(daily_rows)
+
+
+def rollups_vectorized(df: pd.DataFrame, initial_balance: float):
+    df = df.copy()
+    df["cumulative_balance"] = cumulative_balance(df, initial_balance)
+    return df["cumulative_balance"], daily_summary(df, initial_balance)
+
+
+def journal_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """Enriched and exit-time sorted, as the journal holds it before the rollups."""
+    df = enrich_trades(raw)
+    return df.sort_values(by=["exit_time_parsed"], ascending=True, na_position="last").reset_index(drop=True)
+
+
+# ---- synthetic journal ----
+def make_trades(n: int, seed: int = 0) -> pd.DataFrame:
+    """n intraday option trades over a few years; ~5% still open, some blanks/missing values."""
+    rng = np.random.default_rng(seed)
+    day = pd.Timestamp("2022-01-03") + pd.to_timedelta(rng.integers(0, 3 * 365, n), unit="D")
+    entry = day + pd.to_timedelta(9 * 60 + 15 + rng.integers(0, 360, n), unit="min")
+    exit_ = entry + pd.to_timedelta(rng.integers(1, 15, n), unit="min")
+    entry_price = np.round(rng.uniform(5, 300, n), 2)
+    exit_price = np.round(entry_price * rng.normal(1.0, 0.15, n), 2)
+    open_ = rng.random(n) < 0.05
+    df = pd.DataFrame({
+        "Trade_ID": np.arange(1, n + 1),
+        "Symbol": rng.choice(["NIFTY24SEP24700CE", "NIFTY24SEP24800PE", "BANKNIFTY24SEPXYZ"], n),
+        "Quantity": rng.integers(1, 5, n),
+        "Lot_Size": np.where(rng.random(n) < 0.1, np.nan, 75.0),
+        "Entry_Price": entry_price,
+        "Exit_Price": np.where(open_, np.nan, exit_price),
+        "Entry_Time": entry.strftime("%Y-%m-%d %H:%M:%S"),
+        "Exit_Time": np.where(open_, "", exit_.strftime("%Y-%m-%d %H:%M:%S")),
+        "Fees": np.where(rng.random(n) < 0.1, np.nan, np.round(rng.uniform(5, 25, n), 2)),
+        "Notes": np.where(rng.random(n) < 0.5, "", "setup"),
+    })
+    return df
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1e5,1e6", help="comma-separated trade counts")
+    parser.add_argument("--rowwise-max", default="1e5", help="largest size the row-wise pipeline is timed at")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+    sizes = [int(float(s)) for s in args.sizes.split(",")]
+    rowwise_max = int(float(args.rowwise_max))
+
+    print(f"{'step':<10}{'trades':>10}{'row-wise s':>12}{'vectorized s':>14}{'speedup':>9}  same")
+    for n in sizes:
+        raw = make_trades(n)
+        df = journal_frame(raw)
+        steps = {
+            "enrich": (lambda: enrich_rowwise(raw), lambda: enrich_trades(raw),
+                       lambda a, b: a.equals(b)),
+            "rollups": (lambda: rollups_rowwise(df, 100000.0), lambda: rollups_vectorized(df, 100000.0),
+                        lambda a, b: a[0].equals(b[0]) and a[1].equals(b[1])),
+        }
+        for step, (rowwise, vectorized, same_fn) in steps.items():
+            vec_t = best_of(vectorized, args.repeat)
+            if n > rowwise_max:
+                print(f"{step:<10}{n:>10}{'-':>12}{vec_t:>14.3f}{'':>9}  (row-wise skipped)")
+                continue
+            row_t = best_of(rowwise, 1)
+            same = same_fn(rowwise(), vectorized())
+            print(f"{step:<10}{n:>10}{row_t:>12.3f}{vec_t:>14.3f}{row_t / vec_t:>8.1f}x  {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# bench_journal_db.py
+"""
+Benchmark: cost of recording one trade as the journal grows, for the CSV rewrite
+trading_dashboard_backup.py used (read_csv + concat + to_csv of the whole file)
+vs journal_db (one INSERT, then one UPDATE for the exit).
+
+Run:
+    python bench_journal_db.py                        # history of 1e3, 1e4, 1e5 trades
+    python bench_journal_db.py --sizes 1e4,1e6 --writes 50
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from bench_journal import make_trades
+from journal_db import JournalDB
+
+
+def new_trade(i: int) -> dict:
+    return {"entry_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "exit_time": "", "symbol": "NIFTY",
+            "qty": 75, "side": "BUY", "entry_price": 100.0 + i, "exit_price": None, "pnl": 0.0, "notes": ""}
+
+
+def csv_rewrite(path: str, trade: dict) -> None:
+    dfj = pd.read_csv(path, low_memory=False)
+    dfj = pd.concat([dfj, pd.DataFrame([trade])], ignore_index=True)
+    dfj.to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1e3,1e4,1e5", help="comma-separated journal sizes (existing trades)")
+    parser.add_argument("--writes", type=int, default=20, help="trades recorded per size")
+    args = parser.parse_args()
+    sizes = [int(float(s)) for s in args.sizes.split(",")]
+
+    print(f"{'history':>10}{'csv rewrite ms':>16}{'db insert ms':>14}{'db exit ms':>12}")
+    for n in sizes:
+        raw = make_trades(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "journal.csv")
+            raw.to_csv(csv_path, index=False)
+            db = JournalDB(os.path.join(tmp, "journal.db"))
+            db.import_frame(raw, source="bench")
+
+            t0 = time.perf_counter()
+            for i in range(args.writes):
+                csv_rewrite(csv_path, new_trade(i))
+            csv_ms = (time.perf_counter() - t0) / args.writes * 1e3
+
+            t0 = time.perf_counter()
+            ids = [db.insert(new_trade(i)) for i in range(args.writes)]
+            insert_ms = (time.perf_counter() - t0) / args.writes * 1e3
+
+            t0 = time.perf_counter()
+            for tid in ids:
+                db.close_trade(tid, exit_price=101.0)
+            exit_ms = (time.perf_counter() - t0) / args.writes * 1e3
+            db.close()
+        print(f"{n:>10}{csv_ms:>16.2f}{insert_ms:>14.3f}{exit_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# bench_synth_market.py
+"""
+Benchmark: synth_market bar generation (numpy arrays, one pass) vs the per-bar
+Python loop trading_journal.make_mock_ohlc used (kept here as the reference), on
+1-minute session bars.
+
+Run:
+    python bench_synth_market.py                          # 1e5, 1e6, 1e7 bars (loop timed up to 1e5)
+    python bench_synth_market.py --sizes 1e6,3e7 --loop-max 1e4 --repeat 3
+"""
+import argparse
+import math
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from synth_market import SyntheticMarket, generate_bars
+
+
+def make_mock_ohlc_loop(start_dt: datetime, periods: int, freq_minutes: int = 1, start_price: float = 25000.0) -> pd.DataFrame:
+    """trading_journal.make_mock_ohlc before synth_market."""
+    rng = [start_dt + timedelta(minutes=freq_minutes * i) for i in range(periods)]
+    prices = []
+    p = float(start_price)
+    for i in range(periods):
+        move = np.random.normal(loc=0.0, scale=0.3) * (1 + math.sin(i / 3))
+        p = max(1, p + move)
+        o = p + np.random.normal(0, 0.5)
+        c = p + np.random.normal(0, 0.5)
+        hi = max(o, c) + abs(np.random.normal(0, 0.5))
+        lo = min(o, c) - abs(np.random.normal(0, 0.5))
+        vol = max(1, int(abs(np.random.normal(200, 50))))
+        prices.append((rng[i], round(o, 2), round(hi, 2), round(lo, 2), round(c, 2), vol))
+    df = pd.DataFrame(prices, columns=["time", "open", "high", "low", "close", "volume"])
+    df["time"] = pd.to_datetime(df["time"])
+    return df
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1e5,1e6,1e7", help="comma-separated bar counts")
+    parser.add_argument("--loop-max", default="1e5", help="largest size the loop is timed at")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+    sizes = [int(float(s)) for s in args.sizes.split(",")]
+    loop_max = int(float(args.loop_max))
+    start = datetime(2024, 1, 1, 9, 15)
+
+    print(f"{'bars':>10}{'loop s':>10}{'arrays s':>10}{'frame s':>10}{'Mbars/s':>9}{'speedup':>9}")
+    for n in sizes:
+        arr_t = best_of(lambda: SyntheticMarket(seed=1).arrays(n, start=start), args.repeat)
+        frame_t = best_of(lambda: generate_bars(n, start=start, seed=1), args.repeat)
+        if n > loop_max:
+            print(f"{n:>10}{'-':>10}{arr_t:>10.3f}{frame_t:>10.3f}{n / frame_t / 1e6:>9.1f}{'':>9}")
+            continue
+        loop_t = best_of(lambda: make_mock_ohlc_loop(start, n), 1)
+        print(f"{n:>10}{loop_t:>10.3f}{arr_t:>10.3f}{frame_t:>10.3f}{n / frame_t / 1e6:>9.1f}{loop_t / frame_t:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
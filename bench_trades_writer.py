@@ -0,0 +1,84 @@
+# bench_trades_writer.py
+"""
+Benchmark: time added to order handling per recorded fill, for the old
+append_trade_to_csv (one-row pd.DataFrame + to_csv + os.path.exists, one open per
+trade; kept here as the reference) vs trades_writer.TradeRecorder.record (queue put;
+the writer thread does the csv writes and fsyncs).
+
+Run:
+    python bench_trades_writer.py                  # 2000 fills
+    python bench_trades_writer.py --fills 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from trades_writer import KOLKATA, TradeRecorder
+
+
+def append_trade_pandas(order_resp: dict, order_payload: dict, trades_csv_path: str) -> None:
+    """append_trade_to_csv before the recorder (without its print)."""
+    trade_row = {
+        "trade_id": order_resp.get("order_id"),
+        "symbol": order_payload.get("symbol", ""),
+        "quantity": order_payload.get("quantity", 0),
+        "lot_size": order_payload.get("lot_size", None) if order_payload.get("lot_size", None) is not None else 1,
+        "entry_price": order_payload.get("price", None),
+        "exit_price": None,
+        "entry_time": datetime.now(tz=KOLKATA).strftime("%Y-%m-%d %H:%M:%S"),
+        "exit_time": "",
+        "fees": 0.0,
+        "notes": f"auto-recorded ({order_resp.get('status')})"
+    }
+    file_exists = os.path.exists(trades_csv_path)
+    df_row = pd.DataFrame([trade_row])
+    if not file_exists:
+        df_row.to_csv(trades_csv_path, index=False, mode="w")
+    else:
+        df_row.to_csv(trades_csv_path, index=False, mode="a", header=False)
+
+
+def fills(n: int):
+    return [({"status": "ok", "order_id": f"MOCK-{i}"}, {"symbol": "NIFTY", "quantity": 1, "price": 25000.0 + i})
+            for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fills", type=int, default=2000)
+    args = parser.parse_args()
+    orders = fills(args.fills)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, "old.csv")
+        t0 = time.perf_counter()
+        for resp, payload in orders:
+            append_trade_pandas(resp, payload, old_path)
+        old_us = (time.perf_counter() - t0) / len(orders) * 1e6
+
+        new_path = os.path.join(tmp, "new.csv")
+        rec = TradeRecorder(new_path)
+        worst = 0.0
+        t0 = time.perf_counter()
+        for resp, payload in orders:
+            t1 = time.perf_counter()
+            rec.record(resp, payload)
+            worst = max(worst, time.perf_counter() - t1)
+        new_us = (time.perf_counter() - t0) / len(orders) * 1e6
+        t1 = time.perf_counter()
+        rec.close()
+        drain_ms = (time.perf_counter() - t1) * 1e3
+
+        same = pd.read_csv(old_path).drop(columns="entry_time").equals(pd.read_csv(new_path).drop(columns="entry_time"))
+        print(f"fills: {len(orders)}")
+        print(f"pandas to_csv per fill:   {old_us:10.1f} us")
+        print(f"recorder.record per fill: {new_us:10.1f} us  (worst {worst * 1e6:.1f} us, drain on close {drain_ms:.1f} ms)")
+        print(f"speedup: {old_us / new_us:.0f}x   same rows: {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
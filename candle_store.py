@@ -0,0 +1,296 @@
+# candle_store.py
+"""
+In-memory multi-timeframe candle store for the dashboards.
+
+Keeps the 1-minute OHLCV bars of each symbol in preallocated arrays and derives
+5m / 15m / 1h candles from them. Updates are incremental: new 1m bars (which may revise
+the still-open last bar) are written over the tail, and each derived timeframe
+re-aggregates only from the bucket containing the first changed minute - normally just
+the last, still-open candle. Trimming old history moves an offset, so the cost of an
+update does not grow with the history held.
+Every timeframe is then served from memory, so switching the timeframe selector
+does no fetching or resampling of the whole history.
+
+    from candle_store import get_store
+    store = get_store()
+    store.update("NIFTY", bars_1m)       # DataFrame: datetime (index or column) + OHLCV, or price only
+    df_5m = store.get("NIFTY", "5m", 120)
+
+Buckets are aligned on wall-clock time in the frame's own timezone (naive frames: as
+given), matching DataFrame.resample("5min"/"15min"/"1h") with first/max/min/last/sum.
+"""
+from __future__ import annotations
+import threading
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+TIMEFRAMES = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600}
+OHLCV = ["open", "high", "low", "close", "volume"]
+MAX_MINUTES = 20000  # 1m bars kept per symbol (~50 sessions of 375 minutes)
+
+
+def normalize_bars(bars: pd.DataFrame) -> pd.DataFrame:
+    """1m bars as a sorted, de-duplicated DatetimeIndex frame with float OHLCV columns."""
+    df = bars
+    if "datetime" in df.columns:
+        df = df.set_index("datetime")
+    df = df.copy()
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.index), name="datetime")
+    if "close" not in df.columns and "price" in df.columns:  # mock_api serves a bare price series
+        df["close"] = df["price"]
+    for col in ("open", "high", "low"):
+        if col not in df.columns:
+            df[col] = df["close"]
+    if "volume" not in df.columns:
+        df["volume"] = 0.0
+    df = df[OHLCV].astype(float)
+    df = df[~df.index.duplicated(keep="last")]
+    return df if df.index.is_monotonic_increasing else df.sort_index()
+
+
+def derive_ohlcv(bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    Candles for a price-only series (mock_api's datetime + price), as the dashboards have
+    always drawn them: open = previous close, high/low = open/close -/+ 0.1%, volume
+    from the size of the move. Columns the source already has are kept.
+    """
+    df = bars.copy()
+    if "close" not in df.columns and "price" in df.columns:
+        df["close"] = df["price"]
+    if "close" not in df.columns:
+        return df
+    close = df["close"].astype(float)
+    pad = (close * 0.001).abs()
+    if "open" not in df.columns:
+        df["open"] = close.shift(1).fillna(close)
+    if "high" not in df.columns:
+        df["high"] = np.maximum(df["open"], close) + pad
+    if "low" not in df.columns:
+        df["low"] = np.minimum(df["open"], close) - pad
+    if "volume" not in df.columns:
+        df["volume"] = (close.pct_change().fillna(0).abs() * 1000 + 200).round().astype(int)
+    return df
+
+
+def _wall_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    return (index.tz_localize(None) if index.tz is not None else index).asi8
+
+
+def bucket_start(ts: pd.Timestamp, seconds: int) -> pd.Timestamp:
+    """Start of the `seconds`-long wall-clock bucket containing ts."""
+    return ts.floor(f"{seconds}s")
+
+
+def _aggregate(keys: np.ndarray, values: np.ndarray):
+    """(first row of each run of equal keys, (5, runs) OHLCV aggregated with ufunc.reduceat)."""
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    o, h, l, c, v = values
+    return starts, np.vstack([
+        o[starts],
+        np.maximum.reduceat(h, starts),
+        np.minimum.reduceat(l, starts),
+        c[ends],
+        np.add.reduceat(v, starts),
+    ])
+
+
+def resample_ohlcv(df: pd.DataFrame, seconds: int) -> pd.DataFrame:
+    """Aggregate sorted 1m bars into `seconds` candles (one pass of ufunc.reduceat)."""
+    if df.empty:
+        return df.iloc[:0]
+    step = seconds * 1_000_000_000
+    keys = _wall_ns(df.index) // step
+    starts, values = _aggregate(keys, df[OHLCV].to_numpy(dtype=np.float64).T)
+    index = pd.DatetimeIndex(keys[starts] * step, name="datetime")
+    if df.index.tz is not None:
+        index = index.tz_localize(df.index.tz)
+    return pd.DataFrame(values.T, index=index, columns=OHLCV)
+
+
+class _Columns:
+    """
+    Preallocated arrays for one series: index values `t` (int64 ns, UTC for tz-aware
+    frames), wall-clock ns `w` (what buckets are aligned on) and the (5, n) OHLCV block.
+    Rows are appended at the tail and dropped from the head by moving offsets; the live
+    rows are copied back to the front only when the tail reaches the end of the buffer,
+    so appending costs amortised O(rows appended), whatever the history held.
+    """
+
+    def __init__(self, tz, capacity: int = 1024):
+        self.tz = tz
+        self.t = np.empty(capacity, dtype=np.int64)
+        self.w = np.empty(capacity, dtype=np.int64)
+        self.v = np.empty((len(OHLCV), capacity), dtype=np.float64)
+        self.lo = self.hi = 0
+
+    def __len__(self) -> int:
+        return self.hi - self.lo
+
+    def times(self) -> np.ndarray:
+        return self.t[self.lo:self.hi]
+
+    def wall(self) -> np.ndarray:
+        return self.w[self.lo:self.hi]
+
+    def values(self, start: int = 0) -> np.ndarray:
+        return self.v[:, self.lo + start:self.hi]
+
+    def truncate(self, n: int) -> None:
+        """Keep the first n rows."""
+        self.hi = self.lo + n
+
+    def drop_front(self, n: int) -> None:
+        self.lo += min(n, len(self))
+
+    def extend(self, t: np.ndarray, w: np.ndarray, v: np.ndarray) -> None:
+        k, n = len(t), len(self)
+        if self.hi + k > len(self.t):
+            if 2 * (n + k) > len(self.t):  # grow; otherwise compacting to the front is enough
+                capacity = 2 * (n + k)
+                self.t, old_t = np.empty(capacity, dtype=np.int64), self.t
+                self.w, old_w = np.empty(capacity, dtype=np.int64), self.w
+                self.v, old_v = np.empty((len(OHLCV), capacity), dtype=np.float64), self.v
+            else:
+                old_t, old_w, old_v = self.t, self.w, self.v
+            # slices of the same buffer may overlap, so copy the live rows out first
+            self.t[:n] = old_t[self.lo:self.hi].copy()
+            self.w[:n] = old_w[self.lo:self.hi].copy()
+            self.v[:, :n] = old_v[:, self.lo:self.hi].copy()
+            self.lo, self.hi = 0, n
+        self.t[self.hi:self.hi + k] = t
+        self.w[self.hi:self.hi + k] = w
+        self.v[:, self.hi:self.hi + k] = v
+        self.hi += k
+
+    def index(self, start: int = 0) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(self.t[self.lo + start:self.hi].view("M8[ns]"), name="datetime")
+        return index.tz_localize("UTC").tz_convert(self.tz) if self.tz is not None else index
+
+    def frame(self, start: int = 0) -> pd.DataFrame:
+        """Rows start.. as a DataFrame (a copy, so callers can't modify the store)."""
+        return pd.DataFrame(self.values(start).T.copy(), index=self.index(start), columns=OHLCV)
+
+
+class CandleStore:
+    """1m bars per symbol plus incrementally maintained higher-timeframe candles (thread-safe)."""
+
+    def __init__(self, timeframes: Iterable[str] = ("5m", "15m", "1h"), max_minutes: int = MAX_MINUTES):
+        unknown = [tf for tf in timeframes if tf not in TIMEFRAMES]
+        if unknown:
+            raise ValueError(f"Unknown timeframe(s) {unknown} (expected {', '.join(TIMEFRAMES)})")
+        self.timeframes = [tf for tf in timeframes if tf != "1m"]
+        self.max_minutes = int(max_minutes)
+        self._bars: Dict[str, _Columns] = {}
+        self._derived: Dict[tuple, _Columns] = {}
+        self._lock = threading.RLock()
+
+    def symbols(self):
+        return list(self._bars)
+
+    def last_time(self, symbol: str) -> Optional[pd.Timestamp]:
+        bars = self._bars.get(symbol)
+        return None if bars is None or not len(bars) else bars.index(len(bars) - 1)[0]
+
+    def rows(self, symbol: str, timeframe: str = "1m") -> int:
+        """Number of candles held for symbol on timeframe."""
+        with self._lock:
+            series = self._series(symbol, timeframe)
+            return 0 if series is None else len(series)
+
+    def update(self, symbol: str, bars: pd.DataFrame) -> int:
+        """
+        Merge 1m bars for symbol. Bars older than the newest one held are ignored (closed
+        candles don't change); the newest held bar is replaced if it comes again (it may
+        still have been forming). Returns how many 1m rows were added or revised.
+        Only those rows are written, so an update costs the same whatever the history held.
+        """
+        if bars is None or len(bars) == 0:
+            return 0
+        new = normalize_bars(bars)
+        t, w, v = new.index.asi8, _wall_ns(new.index), new.to_numpy(dtype=np.float64).T
+        with self._lock:
+            held = self._bars.get(symbol)
+            if held is None or not len(held) or str(held.tz) != str(new.index.tz):
+                held = self._bars[symbol] = _Columns(new.index.tz, capacity=max(1024, 2 * len(t)))
+                self._derived = {k: d for k, d in self._derived.items() if k[0] != symbol}
+            else:
+                i = int(np.searchsorted(t, held.t[held.hi - 1]))
+                if i == len(t):
+                    return 0
+                t, w, v = t[i:], w[i:], v[:, i:]
+                held.truncate(int(np.searchsorted(held.times(), t[0])))
+            held.extend(t, w, v)
+            if len(held) > self.max_minutes:
+                held.drop_front(len(held) - self.max_minutes)
+            first = max(0, len(held) - len(t))
+            for tf in self.timeframes:
+                self._roll(symbol, tf, first)
+            return len(t)
+
+    def _roll(self, symbol: str, tf: str, first: int) -> None:
+        """Re-aggregate tf candles from the bucket containing 1m row `first` onwards."""
+        bars = self._bars[symbol]
+        step = TIMEFRAMES[tf] * 1_000_000_000
+        wall = bars.wall()
+        held = self._derived.get((symbol, tf))
+        if held is None or not len(held):
+            held = self._derived[(symbol, tf)] = _Columns(bars.tz, capacity=max(64, 2 * len(bars) * 60 // TIMEFRAMES[tf]))
+            pos = 0
+        else:
+            start = wall[first] // step * step
+            pos = int(np.searchsorted(wall, start))
+            held.truncate(int(np.searchsorted(held.wall(), start)))
+        keys = wall[pos:] // step
+        starts, values = _aggregate(keys, bars.values(pos))
+        candle_wall = keys[starts] * step
+        # candle time = its first bar's time moved back to the bucket start (same UTC offset)
+        candle_t = bars.times()[pos + starts] - (wall[pos + starts] - candle_wall)
+        held.extend(candle_t, candle_wall, values)
+        # the oldest candle may be partial once 1m history is trimmed; drop candles before it
+        oldest = wall[0] // step * step
+        held.drop_front(int(np.searchsorted(held.wall(), oldest)))
+
+    def _series(self, symbol: str, timeframe: str) -> Optional[_Columns]:
+        if timeframe == "1m":
+            return self._bars.get(symbol)
+        if timeframe in self.timeframes:
+            return self._derived.get((symbol, timeframe))
+        raise ValueError(f"Timeframe '{timeframe}' not maintained (have 1m, {', '.join(self.timeframes)})")
+
+    def get(self, symbol: str, timeframe: str = "1m", count: Optional[int] = None) -> pd.DataFrame:
+        """Latest `count` candles of timeframe (all held if None); empty frame for unknown symbols."""
+        with self._lock:
+            series = self._series(symbol, timeframe)
+            if series is None:
+                return pd.DataFrame(columns=OHLCV, index=pd.DatetimeIndex([], name="datetime"))
+            return series.frame(0 if count is None else max(0, len(series) - int(count)))
+
+    def minutes_for(self, count: int) -> int:
+        """1m bars needed so every maintained timeframe can show `count` candles."""
+        factor = max([TIMEFRAMES[tf] for tf in self.timeframes] + [60]) // 60
+        return min(self.max_minutes, int(count) * factor)
+
+    def clear(self, symbol: Optional[str] = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._bars.clear()
+                self._derived.clear()
+            else:
+                self._bars.pop(symbol, None)
+                self._derived = {k: v for k, v in self._derived.items() if k[0] != symbol}
+
+
+_store: Optional[CandleStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> CandleStore:
+    """Process-wide store (module state survives Streamlit reruns, like quote_buffer's buffers)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CandleStore()
+        return _store
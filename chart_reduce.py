@@ -0,0 +1,132 @@
+# chart_reduce.py
+"""
+Server-side chart-data reduction for the Plotly candlestick charts.
+
+A chart can only show about one candle per few pixels, so sending 100k one-minute
+candles to the browser just makes the payload and the render slow. chart_data() cuts
+the frame to the visible time range and then reduces it:
+
+- candles: consecutive candles are merged into groups of k (open of the first, max
+  high, min low, close of the last, summed volume), with k chosen so at most
+  width_px / px_per_candle candles remain. Highs and lows are therefore never lost.
+- overlays (EMA lines etc.): Largest-Triangle-Three-Buckets (LTTB) keeps the points
+  that preserve the line's visual shape, about two per candle slot.
+
+Indicators should be computed on the full-resolution frame first. Zooming in (a
+narrower x_range) re-queries at a finer k, down to the raw candles.
+
+    view, lines = chart_data(df, width_px=1200, x_range=(t0, t1), overlays=("ema9", "ema21"), time_col="time")
+"""
+from __future__ import annotations
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+CHART_WIDTH_PX = 1200   # plot area the dashboards render into
+PX_PER_CANDLE = 4       # below this a candle body is not distinguishable
+
+
+def _times(df: pd.DataFrame, time_col: Optional[str]) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(df.index if time_col is None else df[time_col])
+
+
+def visible_slice(df: pd.DataFrame, x_range: Optional[Tuple] = None, time_col: Optional[str] = None) -> pd.DataFrame:
+    """Rows of a time-sorted frame with t0 <= time <= t1 (the whole frame if x_range is None)."""
+    if x_range is None or df.empty:
+        return df
+    times = _times(df, time_col)
+    t0, t1 = (pd.Timestamp(t) for t in x_range)
+    if times.tz is not None:
+        t0 = t0.tz_localize(times.tz) if t0.tzinfo is None else t0.tz_convert(times.tz)
+        t1 = t1.tz_localize(times.tz) if t1.tzinfo is None else t1.tz_convert(times.tz)
+    lo, hi = times.searchsorted(t0, side="left"), times.searchsorted(t1, side="right")
+    return df.iloc[lo:hi]
+
+
+def group_size(n: int, max_candles: int) -> int:
+    """Smallest k so that n candles merged k at a time fit in max_candles."""
+    return max(1, math.ceil(n / max(1, int(max_candles))))
+
+
+def reduce_ohlc(df: pd.DataFrame, max_candles: int, time_col: Optional[str] = None) -> pd.DataFrame:
+    """Merge runs of consecutive candles so at most max_candles remain (OHLC-exact per group)."""
+    n = len(df)
+    k = group_size(n, max_candles)
+    if k == 1:
+        return df
+    starts = np.arange(0, n, k)
+    ends = np.r_[starts[1:], n] - 1
+    out = {}
+    if time_col is not None:
+        out[time_col] = df[time_col].to_numpy()[starts]
+    out["open"] = df["open"].to_numpy()[starts]
+    out["high"] = np.maximum.reduceat(df["high"].to_numpy(dtype=float), starts)
+    out["low"] = np.minimum.reduceat(df["low"].to_numpy(dtype=float), starts)
+    out["close"] = df["close"].to_numpy()[ends]
+    if "volume" in df.columns:
+        out["volume"] = np.add.reduceat(df["volume"].to_numpy(dtype=float), starts)
+    index = df.index[starts] if time_col is None else None
+    return pd.DataFrame(out, index=index)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the n_out points Largest-Triangle-Three-Buckets keeps (first and last
+    always included). x must be increasing; y must be finite.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # bucket i (of n_out - 2) covers [edges[i], edges[i+1]) of the interior points
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # next-bucket averages from prefix sums (the last bucket's "next" is the final point)
+    cx, cy = np.r_[0.0, np.cumsum(x)], np.r_[0.0, np.cumsum(y)]
+    nxt_lo = edges[1:]
+    nxt_hi = np.r_[edges[2:], n]
+    cnt = nxt_hi - nxt_lo
+    avg_x = (cx[nxt_hi] - cx[nxt_lo]) / cnt
+    avg_y = (cy[nxt_hi] - cy[nxt_lo]) / cnt
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        xs, ys = x[lo:hi], y[lo:hi]
+        # twice the triangle area (a, candidate, next-bucket average); the constant factor doesn't matter
+        area = np.abs((x[a] - avg_x[i]) * (ys - y[a]) - (x[a] - xs) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def reduce_line(series: pd.Series, n_out: int) -> pd.Series:
+    """LTTB-downsample a time-indexed line to about n_out points (NaNs dropped first)."""
+    s = series.dropna()
+    if len(s) <= n_out:
+        return s
+    x = pd.DatetimeIndex(s.index).asi8.astype(float)
+    return s.iloc[lttb_indices(x, s.to_numpy(dtype=float), n_out)]
+
+
+def chart_data(df: pd.DataFrame, width_px: int = CHART_WIDTH_PX, x_range: Optional[Tuple] = None,
+               overlays: Iterable[str] = (), time_col: Optional[str] = None,
+               px_per_candle: int = PX_PER_CANDLE) -> Tuple[pd.DataFrame, Dict[str, pd.Series]]:
+    """
+    Candles and overlay lines for a chart width_px wide showing x_range.
+    Returns (reduced candles, {overlay column: time-indexed Series}).
+    """
+    visible = visible_slice(df, x_range, time_col)
+    max_candles = max(1, int(width_px) // max(1, int(px_per_candle)))
+    candles = reduce_ohlc(visible, max_candles, time_col)
+    times = _times(visible, time_col)
+    lines = {}
+    for col in overlays:
+        if col in visible.columns:
+            lines[col] = reduce_line(pd.Series(visible[col].to_numpy(), index=times), 2 * max_candles)
+    return candles, lines
@@ -2,6 +2,7 @@
 import os, sys
 import pandas as pd
 import numpy as np
+from data_store import store_ohlcv
 
 IN = "data/nifty_1min.csv"
 OUT = "data/nifty_1min.cleaned.csv"
@@ -140,9 +141,12 @@ def main():
         os.makedirs(outdir, exist_ok=True)
     df.to_csv(OUT, index=False)
     print("Saved cleaned CSV to:", OUT)
+    # columnar copy keyed on the cleaned CSV, so backtests memory-map it instead of re-parsing
+    cache_path = store_ohlcv(df, OUT)
+    if cache_path:
+        print("Saved columnar cache to:", cache_path)
     print("Clean columns:", list(df.columns))
-    print("First 5 rows:
-", df.head().to_string(index=False))
+    print("First 5 rows:\n", df.head().to_string(index=False))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,123 @@
+# dashboard_cache.py
+"""
+Streamlit caching layer shared by the dashboards, so a widget click re-renders from
+memory instead of refetching, re-reading CSVs or recomputing indicators.
+
+- candle_bucket(tf): index of the current candle. Pass it as an argument to an
+  st.cache_data function (with ttl=ttl_for(tf)) and the cached value is reused
+  until the candle closes, then recomputed once.
+- read_csv(path): pd.read_csv cached on (path, mtime, size), so it is re-read only
+  when the file changes on disk (e.g. after a trade is appended to journal.csv).
+- indicator_cache(key): a cache_resource IndicatorCache per symbol/timeframe. It
+  folds only bars it has not seen into an indicators.IndicatorState.
+
+    import dashboard_cache as dc
+    dfj = dc.read_csv(journal_path)
+    ind = dc.indicator_cache(f"{symbol}:{timeframe}").frame(df)   # ema9/ema21/rsi14/vwap/... aligned to df
+"""
+from __future__ import annotations
+import copy
+import os
+import threading
+import time
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from candle_store import TIMEFRAMES
+from indicators import IndicatorState
+
+CANDLE_SECONDS = {**TIMEFRAMES, "1d": 86400}
+
+
+def candle_seconds(timeframe) -> int:
+    """Seconds per candle for "1m"/"5m"/"15m"/"1h"/"1d" (or a number of seconds)."""
+    return int(CANDLE_SECONDS[timeframe]) if isinstance(timeframe, str) else int(timeframe)
+
+
+def candle_bucket(timeframe, now: Optional[float] = None) -> int:
+    """Number of the candle in progress (epoch-aligned); changes when that candle closes."""
+    return int((time.time() if now is None else now) // candle_seconds(timeframe))
+
+
+def ttl_for(timeframe) -> int:
+    """Cache TTL for data that only changes once per candle."""
+    return candle_seconds(timeframe)
+
+
+def file_version(path) -> Optional[tuple]:
+    """(mtime_ns, size) of path, or None if it does not exist; part of the read_csv cache key."""
+    try:
+        st_ = os.stat(path)
+    except OSError:
+        return None
+    return st_.st_mtime_ns, st_.st_size
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _read_csv(path: str, version: tuple, parse_dates: Optional[tuple]) -> pd.DataFrame:
+    return pd.read_csv(path, parse_dates=list(parse_dates) if parse_dates else None)
+
+
+def read_csv(path, parse_dates=None) -> pd.DataFrame:
+    """pd.read_csv, cached until the file's mtime/size changes (each caller gets its own copy)."""
+    version = file_version(path)
+    if version is None:
+        raise FileNotFoundError(path)
+    return _read_csv(str(path), version, tuple(parse_dates) if parse_dates else None)
+
+
+class IndicatorCache:
+    """
+    Streaming indicators for one chart. frame(df) folds the closed bars newer than
+    the last one seen into the IndicatorState. It evaluates the last (possibly still
+    forming) bar on a copy of that state, and returns the indicator columns indexed
+    like df.
+    """
+
+    def __init__(self, maxlen: int = 20000, **params):
+        self.params = params
+        self.maxlen = int(maxlen)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.state = IndicatorState(**self.params)
+        self.rows = {}            # bar time -> indicator values (closed bars only)
+        self.last_ts = None
+        self.last_close = None
+
+    def _continues(self, df: pd.DataFrame) -> bool:
+        """df covers no bars before the first one held and agrees on the last one folded."""
+        pos = df.index.searchsorted(self.last_ts)
+        return (pos < len(df) and df.index[pos] == self.last_ts and df["close"].iat[pos] == self.last_close
+                and df.index[0] >= next(iter(self.rows)))
+
+    def frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df is None or df.empty:
+            return pd.DataFrame(index=getattr(df, "index", None))
+        with self._lock:  # cache_resource objects are shared by every session's script thread
+            if self.last_ts is not None and not self._continues(df):
+                self.reset()      # gap, longer history or a different series: start over from this frame
+            closed = df.iloc[:-1]
+            if self.last_ts is not None:
+                closed = closed.iloc[closed.index.searchsorted(self.last_ts, side="right"):]
+            for ts, bar in zip(closed.index, closed.to_dict("records")):
+                bar["datetime"] = ts
+                self.rows[ts] = self.state.update(bar)
+                self.last_ts, self.last_close = ts, bar["close"]
+            if len(self.rows) > self.maxlen:
+                for ts in list(self.rows)[: len(self.rows) - self.maxlen]:
+                    del self.rows[ts]
+            forming = df.iloc[-1].to_dict()
+            forming["datetime"] = df.index[-1]
+            values = [self.rows.get(ts) or {} for ts in df.index[:-1]]
+            values.append(copy.deepcopy(self.state).update(forming))
+        return pd.DataFrame(values, index=df.index)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def indicator_cache(key: str, ema_spans: tuple = (9, 21)) -> IndicatorCache:
+    """One IndicatorCache per chart key (e.g. "NIFTY:5m"), kept across reruns and sessions."""
+    return IndicatorCache(ema_spans=ema_spans)
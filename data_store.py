@@ -0,0 +1,166 @@
+# data_store.py
+"""
+Columnar cache for cleaned OHLCV.
+
+The first load of a CSV parses it with backtest.read_csv_robust and writes the
+cleaned frame to data/cache/<key>.feather (uncompressed Arrow IPC) plus a small
+<key>.meta.json describing the source file. Later loads read the Feather file
+instead of re-parsing the CSV: the Arrow read is memory-mapped, and to_pandas()
+then copies the columns into ordinary (writable) pandas blocks.
+
+The key is the file name plus a short hash of its absolute path, so same-named
+files in different folders get separate entries. Files are written to unique
+temp files in the cache dir and renamed into place, so concurrent workers
+never interleave writes.
+
+The cache is invalidated when the source file changes: mtime/size are checked
+first, and only if they differ is the file hashed (so a touched-but-identical
+file keeps its cache).
+
+    from data_store import load_ohlcv
+    df = load_ohlcv("data/nifty_1min.cleaned.csv")                 # key from file name
+    df = load_ohlcv("data/nifty_1min.csv", symbol="NIFTY", interval="1m")
+"""
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Optional
+
+import pandas as pd
+
+# optional pyarrow (Feather + memory mapping); without it we just parse the CSV
+try:
+    import pyarrow.feather as feather
+except Exception:
+    feather = None
+
+CACHE_DIR = os.path.join("data", "cache")
+log = logging.getLogger("data_store")
+
+
+def cache_key(path: str, symbol: Optional[str] = None, interval: Optional[str] = None) -> str:
+    """'<symbol>_<interval>' when given, else '<file name without extension>-<sha1(abs path)[:10]>'."""
+    if symbol:
+        return f"{symbol}_{interval}" if interval else str(symbol)
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:10]
+    return f"{os.path.splitext(os.path.basename(path))[0]}-{digest}"
+
+
+def file_sha1(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _paths(key: str, cache_dir: str):
+    base = os.path.join(cache_dir, key)
+    return base + ".feather", base + ".meta.json"
+
+
+def _source_info(path: str, with_hash: bool = True) -> dict:
+    st = os.stat(path)
+    info = {"source": os.path.abspath(path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    if with_hash:
+        info["sha1"] = file_sha1(path)
+    return info
+
+
+def _read_meta(meta_path: str) -> Optional[dict]:
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _replace_with(final_path: str, write) -> None:
+    """Call write(tmp_path) on a unique temp file next to final_path, then rename it into place."""
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(final_path) + ".", suffix=".tmp",
+                               dir=os.path.dirname(final_path) or ".")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, final_path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _write_meta(meta_path: str, meta: dict) -> None:
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+    _replace_with(meta_path, write)
+
+
+def is_fresh(path: str, key: str, cache_dir: str = CACHE_DIR) -> bool:
+    """True when the cached Feather file was built from the current contents of path."""
+    data_path, meta_path = _paths(key, cache_dir)
+    meta = _read_meta(meta_path)
+    if meta is None or not os.path.exists(data_path):
+        return False
+    cur = _source_info(path, with_hash=False)
+    if meta.get("source") != cur["source"]:
+        return False
+    if meta.get("mtime_ns") == cur["mtime_ns"] and meta.get("size") == cur["size"]:
+        return True
+    if meta.get("size") != cur["size"]:
+        return False
+    # same size, new mtime: only the hash can tell
+    if meta.get("sha1") != file_sha1(path):
+        return False
+    meta.update(cur)
+    _write_meta(meta_path, meta)
+    return True
+
+
+def store_ohlcv(df: pd.DataFrame, path: str, symbol: Optional[str] = None, interval: Optional[str] = None,
+                cache_dir: str = CACHE_DIR) -> Optional[str]:
+    """Write an already-cleaned frame to the cache as the parsed form of source file path."""
+    if feather is None:
+        log.warning("pyarrow not installed; OHLCV cache disabled.")
+        return None
+    key = cache_key(path, symbol, interval)
+    data_path, meta_path = _paths(key, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    # uncompressed so the file can be memory-mapped without decoding
+    frame = df.reset_index(drop=True)
+    _replace_with(data_path, lambda tmp: feather.write_feather(frame, tmp, compression="uncompressed"))
+    meta = _source_info(path)
+    meta.update({"key": key, "rows": int(len(df)), "columns": [str(c) for c in df.columns]})
+    _write_meta(meta_path, meta)
+    return data_path
+
+
+def load_ohlcv(path: str, symbol: Optional[str] = None, interval: Optional[str] = None,
+               cache_dir: str = CACHE_DIR, refresh: bool = False) -> pd.DataFrame:
+    """
+    Cleaned OHLCV for path (same frame as backtest.read_csv_robust), served from
+    the Feather cache when it is fresh and rebuilt from the CSV otherwise.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    key = cache_key(path, symbol, interval)
+    data_path, _ = _paths(key, cache_dir)
+
+    if feather is not None and not refresh and is_fresh(path, key, cache_dir):
+        table = feather.read_table(data_path, memory_map=True)
+        df = table.to_pandas()
+        log.debug("Loaded %d rows from cache %s", len(df), data_path)
+        return df
+
+    from backtest import read_csv_robust
+    df = read_csv_robust(path)
+    try:
+        store_ohlcv(df, path, symbol, interval, cache_dir)
+    except Exception as e:
+        log.warning("Could not write OHLCV cache for %s: %s", path, e)
+    return df
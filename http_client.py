@@ -0,0 +1,92 @@
+# http_client.py
+"""
+One pooled, keep-alive requests.Session shared by everything in the process that
+talks to the REST backend (trading_bot_patched, the dashboards).
+
+The module-level requests.get/post open a fresh TCP connection per call; this
+session keeps connections to API_BASE open, so a quote or an order after the
+first call skips the handshake. Idempotent requests (GET) are retried with
+exponential backoff on connection errors and 502/503/504; POSTs (orders) only
+retry when the connection could not be established, so an order is never sent twice.
+
+    import http_client
+    r = http_client.get(f"{API_BASE}/quote", endpoint="quote", params={"symbol": "NIFTY"})
+
+Pool size, retries and backoff come from HTTP_POOL_SIZE / HTTP_RETRIES /
+HTTP_BACKOFF (env) or the make_session() arguments.
+"""
+from __future__ import annotations
+import os
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "10"))
+RETRIES = int(os.environ.get("HTTP_RETRIES", "3"))
+BACKOFF = float(os.environ.get("HTTP_BACKOFF", "0.2"))
+
+# (connect, read) seconds per endpoint
+TIMEOUTS = {
+    "login": (3.05, 5),
+    "quote": (3.05, 8),
+    "place_order": (3.05, 5),
+    "health": (1.0, 2),
+}
+DEFAULT_TIMEOUT = (3.05, 5)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def make_session(pool_size: int = POOL_SIZE, retries: int = RETRIES, backoff: float = BACKOFF) -> requests.Session:
+    """A new Session with a keep-alive connection pool and retry/backoff policy."""
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),  # read/status retries only for idempotent calls
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """The process-wide pooled session (created on first use)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = make_session()
+    return _session
+
+
+def close_session() -> None:
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def request(method: str, url: str, endpoint: Optional[str] = None, **kwargs) -> requests.Response:
+    """session.request with the endpoint's timeout unless one is given."""
+    kwargs.setdefault("timeout", TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT))
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, endpoint: Optional[str] = None, **kwargs) -> requests.Response:
+    return request("GET", url, endpoint, **kwargs)
+
+
+def post(url: str, endpoint: Optional[str] = None, **kwargs) -> requests.Response:
+    return request("POST", url, endpoint, **kwargs)
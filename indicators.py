@@ -0,0 +1,452 @@
+# indicators.py
+"""
+Shared indicator code for the backtest, bot, journal and inspection scripts.
+
+Array kernels (NumPy array in, NumPy array out):
+    ema, ewm_mean, sma / rolling_mean, wilder_rsi, vwap (cumulative or
+    session-anchored), crossover
+They reproduce the pandas paths used across the repo (ewm adjust=False,
+rolling min_periods=1) bit for bit. When numba is installed the recursive
+kernels are JIT-compiled loops; otherwise they run on pandas' compiled
+ewm/rolling/groupby code.
+
+Streaming state for live polling:
+IndicatorState keeps the running EMA / Wilder RSI / cumulative VWAP / rolling
+volume state, so each new candle costs O(1) instead of recomputing
+backtest.add_indicators over the whole history.
+
+    state = IndicatorState.from_frame(history_df)   # warm up once
+    row = state.update({"high": h, "low": l, "close": c, "volume": v})
+    row["ema9"], row["rsi14"], row["vwap"], row["vol_avg_20"]
+"""
+from __future__ import annotations
+import math
+import os
+from collections import deque
+from typing import Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# optional numba JIT; kernels fall back to pandas/NumPy without it
+try:
+    from numba import njit
+except Exception:
+    njit = None
+
+USE_NUMBA = njit is not None and not os.environ.get("INDICATORS_NO_NUMBA")
+
+
+def _jit(fn, **options):
+    return njit(cache=True, nogil=True, **options)(fn) if USE_NUMBA else None
+
+
+# -------------------------
+# JIT kernels (same arithmetic as pandas' window aggregations)
+# -------------------------
+def _ewm_loop(x, alpha):
+    # pandas ewm(adjust=False, ignore_na=False, min_periods=0)
+    n = x.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+    old_wt_factor = 1.0 - alpha
+    weighted = x[0]
+    nobs = 1 if weighted == weighted else 0
+    out[0] = weighted if nobs >= 1 else np.nan
+    old_wt = 1.0
+    for i in range(1, n):
+        cur = x[i]
+        is_obs = cur == cur
+        if is_obs:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_obs:
+                if weighted != cur:
+                    weighted = old_wt * weighted + alpha * cur
+                    weighted /= old_wt + alpha
+                old_wt = 1.0
+        elif is_obs:
+            weighted = cur
+        out[i] = weighted if nobs >= 1 else np.nan
+    return out
+
+
+def _rolling_mean_loop(x, window, min_periods):
+    # pandas roll_mean for a fixed window: Kahan add/remove + constant-run shortcut
+    n = x.shape[0]
+    out = np.empty(n)
+    sum_x = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    nobs = 0
+    neg_ct = 0
+    same_run = 0
+    prev = np.nan
+    for i in range(n):
+        if i >= window:
+            old = x[i - window]
+            if old == old:
+                nobs -= 1
+                y = -old - comp_remove
+                t = sum_x + y
+                comp_remove = t - sum_x - y
+                sum_x = t
+                if math.copysign(1.0, old) < 0:
+                    neg_ct -= 1
+        val = x[i]
+        if val == val:
+            nobs += 1
+            y = val - comp_add
+            t = sum_x + y
+            comp_add = t - sum_x - y
+            sum_x = t
+            if math.copysign(1.0, val) < 0:
+                neg_ct += 1
+            if val == prev:
+                same_run += 1
+            else:
+                same_run = 1
+            prev = val
+        if nobs >= min_periods and nobs > 0:
+            result = sum_x / nobs
+            if same_run >= nobs:
+                result = prev
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            out[i] = result
+        else:
+            out[i] = np.nan
+    return out
+
+
+def _vwap_loop(high, low, close, volume, starts, kahan):
+    # fused cumsum / divide / ffill / fill-with-close; kahan=True mirrors groupby().cumsum()
+    n = close.shape[0]
+    out = np.empty(n)
+    cum_tv = 0.0
+    cum_v = 0.0
+    comp_tv = 0.0
+    comp_v = 0.0
+    last = np.nan
+    for i in range(n):
+        if starts[i]:
+            cum_tv = 0.0
+            cum_v = 0.0
+            comp_tv = 0.0
+            comp_v = 0.0
+            last = np.nan
+        tv = (high[i] + low[i] + close[i]) / 3.0 * volume[i]
+        v = volume[i]
+        val = np.nan
+        if tv == tv:
+            if kahan:
+                y = tv - comp_tv
+                t = cum_tv + y
+                comp_tv = t - cum_tv - y
+                cum_tv = t
+            else:
+                cum_tv += tv
+        if v == v:
+            if kahan:
+                y = v - comp_v
+                t = cum_v + y
+                comp_v = t - cum_v - y
+                cum_v = t
+            else:
+                cum_v += v
+        if tv == tv and v == v:
+            val = cum_tv / cum_v
+        if val == val:
+            last = val
+            out[i] = val
+        elif last == last:
+            out[i] = last
+        else:
+            out[i] = close[i]
+    return out
+
+
+_ewm_nb = _jit(_ewm_loop)
+_rolling_mean_nb = _jit(_rolling_mean_loop)
+_vwap_nb = _jit(_vwap_loop, error_model="numpy")
+
+
+# -------------------------
+# Array kernels
+# -------------------------
+def _as_float(x) -> np.ndarray:
+    return np.ascontiguousarray(np.asarray(x, dtype=np.float64))
+
+
+def ewm_mean(x, alpha: float) -> np.ndarray:
+    """Exponentially weighted mean, same as Series.ewm(alpha=alpha, adjust=False).mean()."""
+    x = _as_float(x)
+    if _ewm_nb is not None:
+        return _ewm_nb(x, float(alpha))
+    return pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def ema(x, span: int) -> np.ndarray:
+    """EMA with alpha = 2 / (span + 1), same as Series.ewm(span=span, adjust=False).mean()."""
+    return ewm_mean(x, 2.0 / (span + 1.0))
+
+
+def rolling_mean(x, window: int, min_periods: int = 1) -> np.ndarray:
+    """Same as Series.rolling(window, min_periods=min_periods).mean()."""
+    x = _as_float(x)
+    if _rolling_mean_nb is not None:
+        return _rolling_mean_nb(x, int(window), int(min_periods))
+    return pd.Series(x).rolling(window=window, min_periods=min_periods).mean().to_numpy()
+
+
+sma = rolling_mean
+
+
+def wilder_rsi(close, period: int = 14) -> np.ndarray:
+    """Wilder RSI as in backtest.add_indicators (undefined values, incl. no down moves, -> 50)."""
+    close = _as_float(close)
+    delta = np.empty_like(close)
+    delta[:1] = np.nan
+    delta[1:] = close[1:] - close[:-1]
+    roll_up = ewm_mean(np.clip(delta, 0, None), 1.0 / period)
+    roll_down = ewm_mean(-np.clip(delta, None, 0), 1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = np.where(roll_down == 0, np.nan, roll_up / roll_down)
+        rsi = 100 - (100 / (1 + rs))
+    return np.where(np.isnan(rsi), 50.0, rsi)
+
+
+def trading_dates(times, tz: str = "Asia/Kolkata") -> np.ndarray:
+    """Local (IST by default) calendar date of each timestamp; naive times are taken as already local."""
+    ts = pd.DatetimeIndex(pd.to_datetime(times))
+    if ts.tz is not None:
+        ts = ts.tz_convert(tz).tz_localize(None)
+    return ts.to_numpy().astype("datetime64[D]")
+
+
+def session_starts(session) -> np.ndarray:
+    """True on the first bar of each session (where the session key changes)."""
+    keys = np.asarray(session)
+    starts = np.ones(len(keys), dtype=bool)
+    if len(keys) > 1:
+        starts[1:] = keys[1:] != keys[:-1]
+    return starts
+
+
+def _cumsum(x: np.ndarray, starts: Optional[np.ndarray]) -> np.ndarray:
+    if starts is None:
+        return pd.Series(x).cumsum().to_numpy()
+    return pd.Series(x).groupby(np.cumsum(starts)).cumsum().to_numpy()
+
+
+def _ffill(x: np.ndarray, starts: Optional[np.ndarray] = None) -> np.ndarray:
+    """Forward-fill NaN, never across a session start when starts is given."""
+    pos = np.arange(len(x))
+    last_valid = np.maximum.accumulate(np.where(np.isnan(x), -1, pos)) if len(x) else pos
+    if starts is not None and len(x):
+        session_first = np.maximum.accumulate(np.where(starts, pos, 0))
+        last_valid = np.where(last_valid >= session_first, last_valid, -1)
+    return np.where(last_valid >= 0, x[np.clip(last_valid, 0, None)], np.nan)
+
+
+def vwap(high, low, close, volume, session=None) -> np.ndarray:
+    """
+    VWAP of the typical price (h+l+c)/3.
+    session=None: one cumulative VWAP over the whole array (backtest.add_indicators).
+    session=keys: resets whenever the key changes (e.g. the trading date).
+    Bars with no volume yet carry the last VWAP forward, else the close.
+    """
+    high, low, close, volume = _as_float(high), _as_float(low), _as_float(close), _as_float(volume)
+    starts = None if session is None else session_starts(session)
+    if _vwap_nb is not None:
+        if starts is None:
+            first = np.zeros(len(close), dtype=bool)
+            first[:1] = True
+            return _vwap_nb(high, low, close, volume, first, False)
+        return _vwap_nb(high, low, close, volume, starts, True)
+    typical = (high + low + close) / 3.0
+    cum_tv = _cumsum(typical * volume, starts)
+    cum_v = _cumsum(volume, starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = cum_tv / cum_v
+    out = _ffill(out, starts)
+    return np.where(np.isnan(out), close, out)
+
+
+def crossover(fast, slow) -> Tuple[np.ndarray, np.ndarray]:
+    """(cross_up, cross_down) bool arrays; bar 0 never crosses."""
+    fast, slow = _as_float(fast), _as_float(slow)
+    up = np.zeros(len(fast), dtype=bool)
+    down = np.zeros(len(fast), dtype=bool)
+    up[1:] = (fast[:-1] <= slow[:-1]) & (fast[1:] > slow[1:])
+    down[1:] = (fast[:-1] >= slow[:-1]) & (fast[1:] < slow[1:])
+    return up, down
+
+
+# -------------------------
+# Streaming state
+# -------------------------
+def _kahan_add(total: float, comp: float, x: float) -> Tuple[float, float]:
+    y = x - comp
+    t = total + y
+    return t, t - total - y
+
+
+class _EWM:
+    """pandas ewm(adjust=False) recursion, using the same arithmetic so results match bit for bit."""
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> float:
+        if self.value is None:
+            self.value = x
+        elif self.value != x:
+            old_wt = 1.0 - self.alpha
+            self.value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+        return self.value
+
+
+class _RollingMean:
+    """
+    rolling(window, min_periods=1).mean() kept incrementally, following pandas'
+    roll_mean (Kahan-compensated add/remove and its constant-run shortcut).
+    """
+    __slots__ = ("window", "values", "total", "comp_add", "comp_remove", "neg_ct", "same_run", "prev")
+
+    def __init__(self, window: int):
+        self.window = int(window)
+        self.values = deque()
+        self.total = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.neg_ct = 0
+        self.same_run = 0
+        self.prev: Optional[float] = None
+
+    def update(self, x: float) -> float:
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            y = -old - self.comp_remove
+            t = self.total + y
+            self.comp_remove = t - self.total - y
+            self.total = t
+            if old < 0:
+                self.neg_ct -= 1
+
+        self.values.append(x)
+        y = x - self.comp_add
+        t = self.total + y
+        self.comp_add = t - self.total - y
+        self.total = t
+        if x < 0:
+            self.neg_ct += 1
+        self.same_run = self.same_run + 1 if x == self.prev else 1
+        self.prev = x
+
+        nobs = len(self.values)
+        if self.same_run >= nobs:
+            return x
+        result = self.total / nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == nobs and result > 0:
+            return 0.0
+        return result
+
+
+class IndicatorState:
+    """
+    Running state for the indicators produced by backtest.add_indicators:
+    ema<span> for each span, rsi14 (Wilder), vwap (cumulative) and vol_avg_<window>.
+    """
+
+    def __init__(self, ema_spans: Iterable[int] = (9, 21), rsi_period: int = 14, vol_window: int = 20,
+                 session_vwap: bool = False, tz: str = "Asia/Kolkata"):
+        self.ema_spans = tuple(int(s) for s in ema_spans)
+        self.session_vwap = session_vwap
+        self.tz = tz
+        self.rsi_period = int(rsi_period)
+        self.vol_window = int(vol_window)
+        self._emas = {span: _EWM(2.0 / (span + 1.0)) for span in self.ema_spans}
+        self._rsi_up = _EWM(1.0 / self.rsi_period)
+        self._rsi_down = _EWM(1.0 / self.rsi_period)
+        self._vol = _RollingMean(self.vol_window)
+        self._prev_close: Optional[float] = None
+        self._cum_typ_vol = 0.0
+        self._cum_vol = 0.0
+        self._comp_typ_vol = 0.0
+        self._comp_vol = 0.0
+        self._last_vwap: Optional[float] = None
+        self._session = None
+        self.bars = 0
+        self.last: dict = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **kwargs) -> "IndicatorState":
+        """Warm up from historical candles (one pass); later candles go through update()."""
+        state = cls(**kwargs)
+        volume = df["volume"] if "volume" in df.columns else pd.Series(0.0, index=df.index)
+        times = df["datetime"].tolist() if "datetime" in df.columns else [None] * len(df)
+        for t, h, l, c, v in zip(times, df["high"].tolist(), df["low"].tolist(), df["close"].tolist(), volume.tolist()):
+            state.update({"datetime": t, "high": h, "low": l, "close": c, "volume": v})
+        return state
+
+    def update(self, bar: Mapping) -> dict:
+        """
+        Fold one closed candle (needs high, low, close; volume optional; datetime
+        when session_vwap is on) and return the indicator values.
+        """
+        close = float(bar["close"])
+        high = float(bar["high"])
+        low = float(bar["low"])
+        volume = float(bar.get("volume", 0.0) or 0.0)
+        out = {}
+
+        for span, ewm in self._emas.items():
+            out[f"ema{span}"] = ewm.update(close)
+
+        # RSI: first bar has no delta (NaN in the batch version) -> 50
+        rsi = 50.0
+        if self._prev_close is not None:
+            delta = close - self._prev_close
+            roll_up = self._rsi_up.update(delta if delta > 0 else 0.0)
+            roll_down = self._rsi_down.update(-delta if delta < 0 else 0.0)
+            if roll_down != 0:
+                rsi = 100 - (100 / (1 + roll_up / roll_down))
+        self._prev_close = close
+        out[f"rsi{self.rsi_period}"] = rsi
+
+        # VWAP (cumulative, or reset on each new IST trading date); undefined -> last VWAP, else close
+        typ_vol = (high + low + close) / 3.0 * volume
+        if self.session_vwap:
+            ts = pd.Timestamp(bar["datetime"])
+            session = (ts.tz_convert(self.tz) if ts.tzinfo is not None else ts).date()
+            if session != self._session:
+                self._session = session
+                self._cum_typ_vol = self._cum_vol = self._comp_typ_vol = self._comp_vol = 0.0
+                self._last_vwap = None
+            # compensated sums, as groupby().cumsum() does
+            self._cum_typ_vol, self._comp_typ_vol = _kahan_add(self._cum_typ_vol, self._comp_typ_vol, typ_vol)
+            self._cum_vol, self._comp_vol = _kahan_add(self._cum_vol, self._comp_vol, volume)
+        else:
+            self._cum_typ_vol += typ_vol
+            self._cum_vol += volume
+        vwap = self._cum_typ_vol / self._cum_vol if self._cum_vol != 0 else math.nan
+        if math.isnan(vwap):
+            vwap = self._last_vwap if self._last_vwap is not None else close
+        else:
+            self._last_vwap = vwap
+        out["vwap"] = vwap
+
+        out[f"vol_avg_{self.vol_window}"] = self._vol.update(volume)
+
+        self.bars += 1
+        self.last = out
+        return out
@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+import indicators
+
 p = Path("data/nifty_1min.csv")
 if not p.exists():
     raise SystemExit("File not found: data/nifty_1min.csv")
@@ -67,26 +69,19 @@ if "datetime" in df.columns:
     df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
 
 print("COLUMNS:", df.columns.tolist())
-print("
-DTYPES:
-", df.dtypes)
-print("
-HEAD (first 6 rows):
-", df.head(6).to_string(index=False))
+print("\nDTYPES:\n", df.dtypes)
+print("\nHEAD (first 6 rows):\n", df.head(6).to_string(index=False))
 
 # Quick stats about NaNs in numeric cols
-print("
-NaN counts in OHLCV:")
+print("\nNaN counts in OHLCV:")
 for c in ["open","high","low","close","volume"]:
     print(f" {c}: {df[c].isna().sum() if c in df.columns else 'MISSING'}")
 
 # Compute EMA crossovers if close exists
 if "close" in df.columns and df["close"].notna().sum() > 10:
-    ema9 = df["close"].ewm(span=9, adjust=False).mean()
-    ema21 = df["close"].ewm(span=21, adjust=False).mean()
-    crosses = ((ema9 > ema21) & (ema9.shift(1) <= ema21.shift(1))).sum()
-    print("
-EMA9>EMA21 crossups count:", crosses)
+    close = df["close"].to_numpy(dtype=float)
+    cross_up, _ = indicators.crossover(indicators.ema(close, 9), indicators.ema(close, 21))
+    crosses = int(cross_up.sum())
+    print("\nEMA9>EMA21 crossups count:", crosses)
 else:
-    print("
-Not enough numeric 'close' data to compute EMA crossovers.")
+    print("\nNot enough numeric 'close' data to compute EMA crossovers.")
@@ -0,0 +1,114 @@
+# journal_analytics.py
+"""
+Journal rollups on an enriched trades frame (journal_enrich.enrich_trades, sorted
+by exit time): realized cumulative balance, daily / weekly / monthly summaries with
+start and end balances, and the quick stats. Each is one cumsum or one groupby
+over the trades, never a per-row or per-day loop.
+
+    from journal_analytics import cumulative_balance, period_summary, quick_stats
+    df["cumulative_balance"] = cumulative_balance(df, initial_balance)
+    daily = period_summary(df, "D", initial_balance)     # date, start_balance, end_balance, daily_pnl, daily_pct
+    monthly = period_summary(df, "M", initial_balance)   # month, ..., monthly_pnl, monthly_pct
+
+Used by trading_journal_backup.py for the tables and the CSV exports.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from journal_enrich import KOLKATA
+
+PERIODS = {"D": ("date", "daily"), "W": ("week", "weekly"), "M": ("month", "monthly")}
+
+
+def realized_mask(df: pd.DataFrame) -> pd.Series:
+    """Trades that count towards the balance: exit price and exit time both known."""
+    return df["exit_price"].notna() & df["exit_time_parsed"].notna()
+
+
+def cumulative_balance(df: pd.DataFrame, initial_balance: float) -> pd.Series:
+    """Running balance after each row (rows in exit-time order); open trades carry it forward."""
+    realized = df["pnl"].where(realized_mask(df), 0.0).fillna(0.0).to_numpy(dtype=float)
+    # start the running sum at the initial balance so every addition happens in the same order as a loop would
+    running = np.cumsum(np.r_[float(initial_balance), realized])[1:]
+    return pd.Series(running, index=df.index, name="cumulative_balance")
+
+
+def _period_key(exit_times: pd.Series, freq: str) -> pd.Series:
+    """Group key per trade: Kolkata midnight of the day / ISO-week Monday, or the month period."""
+    local = exit_times.dt.tz_convert(KOLKATA).dt.tz_localize(None)
+    if freq == "D":
+        return local.dt.normalize()
+    if freq == "W":
+        return local.dt.normalize() - pd.to_timedelta(local.dt.weekday, unit="D")
+    if freq == "M":
+        return local.dt.to_period("M")
+    raise ValueError(f"Unknown period '{freq}' (expected one of {', '.join(PERIODS)})")
+
+
+def _period_labels(index: pd.Index, freq: str) -> list:
+    return index.strftime("%Y-%m").tolist() if freq == "M" else [ts.date() for ts in index]
+
+
+def period_summary(df: pd.DataFrame, freq: str = "D", initial_balance: float = 0.0) -> pd.DataFrame:
+    """
+    Realized summary per Kolkata day / week / month of exit, over closed trades (exit
+    time known). df needs pnl, exit_time_parsed and cumulative_balance. A period's start
+    balance is the previous period's end balance, and the first one starts from
+    initial_balance.
+    """
+    key_name, prefix = PERIODS[freq]
+    cols = [key_name, "start_balance", "end_balance", f"{prefix}_pnl", f"{prefix}_pct", "trades", "wins"]
+    closed = df[df["exit_time_parsed"].notna()]
+    if closed.empty:
+        return pd.DataFrame(columns=cols)
+    key = _period_key(closed["exit_time_parsed"], freq)
+    grouped = closed.groupby(key, sort=True)
+    pnl = grouped["pnl"].sum(min_count=1)
+    end = grouped["cumulative_balance"].last()  # balance after the period's last trade
+    start = end.shift(1).fillna(float(initial_balance))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(start.to_numpy() == 0, np.nan, (end - start).to_numpy() / start.to_numpy() * 100.0)
+    # Python round() on the (few) per-period values, exactly as the journal always rounded them
+    out = pd.DataFrame({
+        key_name: _period_labels(end.index, freq),
+        "start_balance": [round(v, 2) for v in start.tolist()],
+        "end_balance": [round(v, 2) for v in end.tolist()],
+        f"{prefix}_pnl": [round(v, 2) for v in pnl.tolist()],
+        f"{prefix}_pct": [round(v, 4) for v in pct.tolist()],
+        "trades": grouped.size().to_numpy(),
+        "wins": (closed["pnl"] > 0).groupby(key, sort=True).sum().to_numpy(),
+    })
+    return out[cols]
+
+
+def daily_summary(df: pd.DataFrame, initial_balance: float) -> pd.DataFrame:
+    """The journal's daily table: date, start_balance, end_balance, daily_pnl, daily_pct."""
+    return period_summary(df, "D", initial_balance)[["date", "start_balance", "end_balance", "daily_pnl", "daily_pct"]]
+
+
+def balance_range(df: pd.DataFrame, initial_balance: float) -> dict:
+    """Start / end balance over the whole journal plus peak and max drawdown of the realized curve."""
+    bal = df["cumulative_balance"] if "cumulative_balance" in df.columns else cumulative_balance(df, initial_balance)
+    curve = pd.concat([pd.Series([float(initial_balance)]), bal], ignore_index=True)
+    peak = curve.cummax()
+    return {
+        "start_balance": float(initial_balance),
+        "end_balance": float(curve.iloc[-1]),
+        "peak_balance": float(peak.max()),
+        "max_drawdown": float((peak - curve).max()),
+    }
+
+
+def quick_stats(df: pd.DataFrame) -> dict:
+    """Realized P&L, closed-trade count, win rate (%) and average % per trade, as shown in the journal."""
+    closed = df[df["exit_time_parsed"].notna()]
+    num_realized = int(closed.shape[0])
+    win_rate = (closed["pnl"] > 0).sum() / max(1, closed["pnl"].notna().sum()) * 100.0 if num_realized > 0 else np.nan
+    return {
+        "total_realized": df["pnl"].sum(min_count=1),
+        "num_realized": num_realized,
+        "win_rate": win_rate,
+        "avg_pct": df["pct_trade"].dropna().mean() if df["pct_trade"].notna().any() else np.nan,
+    }
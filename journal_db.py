@@ -0,0 +1,370 @@
+# journal_db.py
+"""
+Trade journal on an embedded SQLite database instead of rewritten CSVs.
+
+One `trades` table, with a unique index on trade_id and plain indexes on symbol,
+entry_time and exit_time. Times are stored as Asia/Kolkata wall-clock text
+("YYYY-MM-DD HH:MM:SS", the layout trades_writer already writes), so a date-range
+query is an index range scan. Each write touches only its own row:
+- a new trade is one INSERT;
+- an exit or a notes edit is one UPDATE by trade_id;
+- an import is one executemany upsert.
+None of them rewrite the file, so the cost per write does not grow with history.
+
+    from journal_db import get_db
+    db = get_db("data/journal.db")
+    tid = db.insert({"symbol": "NIFTY", "quantity": 1, "entry_price": 120.5})
+    db.close_trade(tid, exit_price=131.0)
+    db.set_notes(tid, "breakout")
+    df = db.query(start="2025-09-01", end="2025-10-01")    # entry_time in [start, end)
+    db.import_csv("trades.csv")                              # one-shot, re-runnable
+
+CLI (one-shot import of the existing CSV journals):
+    python journal_db.py trades.csv data/journal.csv data/trades.csv data/trades_journal.csv --db data/journal.db
+
+Column layouts of the existing files are mapped onto the schema:
+- qty becomes quantity;
+- direction becomes side;
+- data/trades.csv's date + "HH:MM" times are combined.
+Any other column is kept in `extra` as JSON. Rows without a trade_id get
+"<source>#<row>", so importing the same file again updates rows instead of
+duplicating them.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from journal_enrich import DISPLAY_FMT, KOLKATA, _parse_one, format_times, parse_times
+
+COLUMNS = [
+    "trade_id", "symbol", "side", "quantity", "lot_size",
+    "entry_price", "exit_price", "entry_time", "exit_time",
+    "fees", "pnl", "notes", "source", "extra",
+]
+NUMERIC = ["quantity", "lot_size", "entry_price", "exit_price", "fees", "pnl"]
+TIMES = ["entry_time", "exit_time"]
+ALIASES = {"qty": "quantity", "direction": "side", "id": "trade_id"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id          INTEGER PRIMARY KEY,
+    trade_id    TEXT NOT NULL,
+    symbol      TEXT,
+    side        TEXT,
+    quantity    REAL,
+    lot_size    REAL,
+    entry_price REAL,
+    exit_price  REAL,
+    entry_time  TEXT,
+    exit_time   TEXT,
+    fees        REAL,
+    pnl         REAL,
+    notes       TEXT,
+    source      TEXT,
+    extra       TEXT,
+    updated_at  TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_trades_trade_id ON trades (trade_id);
+CREATE INDEX IF NOT EXISTS ix_trades_symbol ON trades (symbol, entry_time);
+CREATE INDEX IF NOT EXISTS ix_trades_entry_time ON trades (entry_time);
+CREATE INDEX IF NOT EXISTS ix_trades_exit_time ON trades (exit_time);
+"""
+
+_ISO = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+_CLOCK = re.compile(r"^\d{1,2}:\d{2}(:\d{2})?$")
+
+
+def _now_text() -> str:
+    return datetime.now(tz=KOLKATA).strftime(DISPLAY_FMT)
+
+
+def time_text(value) -> Optional[str]:
+    """Kolkata wall-clock text for a datetime / Timestamp / string; None for blanks and unparseable values."""
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NaT:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        if _ISO.match(value):  # already in the stored layout (trades_writer, the dashboards)
+            return value
+    elif isinstance(value, datetime):
+        if value.tzinfo is None:
+            return value.strftime(DISPLAY_FMT)
+        return value.astimezone(KOLKATA).strftime(DISPLAY_FMT)
+    elif isinstance(value, date):
+        return value.strftime(DISPLAY_FMT)
+    ts = _parse_one(value)
+    return None if pd.isna(ts) else ts.strftime(DISPLAY_FMT)
+
+
+def _clean(value):
+    """SQLite-bindable value: NaN / NaT / numpy scalars -> None / Python scalars."""
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def _row(trade: dict) -> dict:
+    """Known columns of a trade dict, aliased and normalized (times to text, numbers to float)."""
+    row = {}
+    extra = {}
+    for key, value in trade.items():
+        col = ALIASES.get(str(key).strip().lower(), str(key).strip().lower())
+        if col in TIMES:
+            row[col] = time_text(value)
+        elif col in NUMERIC:
+            value = _clean(value)
+            try:
+                row[col] = None if value is None or value == "" else float(value)
+            except (TypeError, ValueError):
+                row[col] = None
+        elif col == "extra":
+            extra.update(value if isinstance(value, dict) else json.loads(value or "{}"))
+        elif col in COLUMNS:
+            value = _clean(value)
+            row[col] = None if value is None else str(value)
+        elif _clean(value) is not None:
+            extra[col] = _clean(value)
+    if extra:
+        row["extra"] = json.dumps(extra, default=str)
+    return row
+
+
+class JournalDB:
+    """
+    The journal table behind one sqlite3 connection (WAL mode, shared by threads under a lock).
+    Dashboards, the importer and scripts in other processes can use the same file at once.
+    """
+    def __init__(self, path: str = os.path.join("data", "journal.db"), timeout: float = 30.0):
+        self.path = str(path)
+        parent = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(parent, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # WAL: durable at checkpoints, never corrupt
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+    # ---- writes ----
+    def insert(self, trade: dict) -> str:
+        """Add a trade (trade_id generated when missing); returns its trade_id. Duplicate ids raise sqlite3.IntegrityError."""
+        row = _row(trade)
+        if not row.get("trade_id"):
+            row["trade_id"] = f"T-{uuid.uuid4().hex[:12]}"
+        row["updated_at"] = _now_text()
+        cols = list(row)
+        sql = f"INSERT INTO trades ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+        with self._lock, self._conn:
+            self._conn.execute(sql, [row[c] for c in cols])
+        return row["trade_id"]
+
+    def upsert(self, trade: dict) -> str:
+        """Insert, or update only the given fields of the trade with the same trade_id."""
+        if not trade.get("trade_id") and not trade.get("id"):
+            return self.insert(trade)
+        row = _row(trade)
+        row["updated_at"] = _now_text()
+        with self._lock, self._conn:
+            self._conn.execute(self._upsert_sql(list(row)), list(row.values()))
+        return row["trade_id"]
+
+    def upsert_many(self, trades: Iterable[dict]) -> int:
+        """
+        Upsert many trades in one transaction. Every trade needs a trade_id; a column that only
+        some trades carry is written as NULL for the others (imports pass full rows).
+        """
+        rows = [_row(t) for t in trades]
+        if not rows:
+            return 0
+        now = _now_text()
+        cols = list(dict.fromkeys(c for r in rows for c in r)) + ["updated_at"]
+        if "trade_id" not in cols or any(not r.get("trade_id") for r in rows):
+            raise ValueError("upsert_many: every trade needs a trade_id")
+        with self._lock, self._conn:
+            self._conn.executemany(self._upsert_sql(cols),
+                                   ([r.get(c) for c in cols[:-1]] + [now] for r in rows))
+        return len(rows)
+
+    @staticmethod
+    def _upsert_sql(cols: list) -> str:
+        updates = ", ".join(f"{c} = excluded.{c}" for c in cols if c != "trade_id")
+        return (f"INSERT INTO trades ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+                f"ON CONFLICT(trade_id) DO UPDATE SET {updates}")
+
+    def update(self, trade_id: str, **fields) -> bool:
+        """Set the given fields on one trade; False if the trade_id is unknown."""
+        row = _row(fields)
+        row.pop("trade_id", None)
+        if not row:
+            return self.get(trade_id) is not None
+        row["updated_at"] = _now_text()
+        sql = f"UPDATE trades SET {', '.join(f'{c} = ?' for c in row)} WHERE trade_id = ?"
+        with self._lock, self._conn:
+            cur = self._conn.execute(sql, list(row.values()) + [str(trade_id)])
+        return cur.rowcount > 0
+
+    def close_trade(self, trade_id: str, exit_price: float, exit_time=None, fees: Optional[float] = None) -> bool:
+        """Record the exit (exit_time defaults to now)."""
+        fields = {"exit_price": exit_price, "exit_time": exit_time if exit_time is not None else _now_text()}
+        if fees is not None:
+            fields["fees"] = fees
+        return self.update(trade_id, **fields)
+
+    def set_notes(self, trade_id: str, notes: str) -> bool:
+        return self.update(trade_id, notes=notes)
+
+    def delete(self, trade_id: str) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM trades WHERE trade_id = ?", (str(trade_id),)).rowcount > 0
+
+    # ---- reads ----
+    def get(self, trade_id: str) -> Optional[dict]:
+        with self._lock:
+            cur = self._conn.execute(f"SELECT {', '.join(COLUMNS)} FROM trades WHERE trade_id = ?", (str(trade_id),))
+            found = cur.fetchone()
+        return None if found is None else dict(zip(COLUMNS, found))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+    def query(self, start=None, end=None, symbol: Optional[str] = None, on: str = "entry_time",
+              status: Optional[str] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Trades with `on` (entry_time or exit_time) in [start, end), optionally for one symbol and
+        status "open" (no exit time) / "closed". Rows in insertion order; limit keeps the latest.
+        """
+        if on not in TIMES:
+            raise ValueError(f"on must be one of {TIMES}, got {on!r}")
+        where, args = [], []
+        if start is not None:
+            where.append(f"{on} >= ?")
+            args.append(time_text(start))
+        if end is not None:
+            where.append(f"{on} < ?")
+            args.append(time_text(end))
+        if symbol is not None:
+            where.append("symbol = ?")
+            args.append(symbol)
+        if status == "open":
+            where.append("exit_time IS NULL")
+        elif status == "closed":
+            where.append("exit_time IS NOT NULL")
+        elif status is not None:
+            raise ValueError(f"status must be 'open', 'closed' or None, got {status!r}")
+        sql = f"SELECT {', '.join(COLUMNS)} FROM trades"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if limit is not None:
+            sql += " ORDER BY id DESC LIMIT ?"
+            args.append(int(limit))
+        else:
+            sql += " ORDER BY id"
+        with self._lock:
+            df = pd.read_sql_query(sql, self._conn, params=args)
+        if limit is not None:
+            df = df.iloc[::-1].reset_index(drop=True)
+        return df[COLUMNS]
+
+    def to_frame(self) -> pd.DataFrame:
+        """The whole journal, ready for journal_enrich.enrich_trades."""
+        return self.query()
+
+    def export_csv(self, path: str) -> int:
+        df = self.to_frame()
+        df.to_csv(path, index=False)
+        return len(df)
+
+    # ---- import ----
+    def import_csv(self, path: str, source: Optional[str] = None) -> int:
+        """Upsert every row of an existing journal CSV; returns the number of rows."""
+        raw = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+        return self.import_frame(raw, source=source or os.path.relpath(path))
+
+    def import_frame(self, raw: pd.DataFrame, source: str = "import") -> int:
+        """Bulk upsert of a raw trades table (times parsed column-wise, not per row)."""
+        if raw.empty:
+            return 0
+        df = raw.copy()
+        df.columns = [ALIASES.get(str(c).strip().lower(), str(c).strip().lower()) for c in df.columns]
+        df = df.loc[:, ~df.columns.duplicated()].reset_index(drop=True)
+        df = df.mask(df.apply(lambda c: c.astype(str).str.strip().eq("")))  # blank cells -> NaN
+
+        if "date" in df.columns:
+            # data/trades.csv keeps the day in `date` and only HH:MM in the time columns
+            for col in TIMES:
+                if col in df.columns:
+                    clock = df[col].astype(str).str.strip().str.match(_CLOCK) & df["date"].notna()
+                    df.loc[clock, col] = df.loc[clock, "date"].astype(str) + " " + df.loc[clock, col].astype(str)
+        for col in TIMES:
+            if col in df.columns:
+                text = format_times(parse_times(df[col]))
+                df[col] = text.where(text != "", None)
+        for col in NUMERIC:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+
+        ids = df["trade_id"] if "trade_id" in df.columns else pd.Series(np.nan, index=df.index)
+        fallback = pd.Series([f"{source}#{i + 1}" for i in range(len(df))], index=df.index)
+        df["trade_id"] = ids.astype(object).where(ids.notna(), fallback).astype(str)
+        df["source"] = source
+
+        known = [c for c in COLUMNS if c in df.columns and c != "extra"]
+        others = [c for c in df.columns if c not in COLUMNS]
+        out = df[known].astype(object).where(df[known].notna(), None)
+        if others:
+            out["extra"] = [json.dumps({k: v for k, v in rec.items() if not pd.isna(v)}, default=str) or None
+                            for rec in df[others].to_dict("records")]
+            out.loc[out["extra"] == "{}", "extra"] = None
+        return self.upsert_many(out.to_dict("records"))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_dbs = {}  # abs path -> JournalDB
+_dbs_lock = threading.Lock()
+
+
+def get_db(path: str = os.path.join("data", "journal.db")) -> JournalDB:
+    """Shared JournalDB per database file (one connection per process)."""
+    key = os.path.abspath(str(path))
+    with _dbs_lock:
+        if key not in _dbs:
+            _dbs[key] = JournalDB(key)
+        return _dbs[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import CSV trade journals into the SQLite journal.")
+    parser.add_argument("csv", nargs="+", help="journal CSV files (trades.csv, data/journal.csv, ...)")
+    parser.add_argument("--db", default=os.path.join("data", "journal.db"))
+    args = parser.parse_args()
+    db = get_db(args.db)
+    for path in args.csv:
+        if not os.path.exists(path):
+            print(f"skip {path}: not found")
+            continue
+        print(f"{path}: {db.import_csv(path)} rows")
+    print(f"{args.db}: {db.count()} trades")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# live_loop.py
+"""
+Fixed-cadence live trading loop: wake at each candle close, fetch only the bars
+closed since the last one seen, fold them into the streaming strategy
+(backtest.EmaCrossStrategy) and route the resulting orders.
+
+- CandleClock sleeps to absolute epoch boundaries (1m/5m/15m) plus a small settle
+  delay, so there is no cumulative drift from work time or sleep jitter.
+- A fetch runs on a worker thread with a deadline; if it is late the loop moves on
+  to the next boundary and the `since` cursor picks the missed bars up then, so
+  one slow call never makes the loop fall behind.
+- LatencyHistogram records candle-close -> order-routed time (and fetch time).
+
+trading_bot.py wires this to SmartAPI (or the mock backend); see `python trading_bot.py --help`.
+"""
+from __future__ import annotations
+import bisect
+import logging
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+INTERVALS = {"1m": 60, "5m": 300, "15m": 900}
+log = logging.getLogger("live_loop")
+
+
+def next_boundary(now: float, interval_s: int) -> float:
+    """First candle boundary (epoch seconds) strictly after now. IST's +5:30 is a whole number of 15m steps."""
+    return (math.floor(now / interval_s) + 1) * interval_s
+
+
+class CandleClock:
+    """Sleeps until each candle close + settle seconds, computed from the epoch (drift-free)."""
+
+    def __init__(self, interval_s: int, settle: float = 2.0, clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.interval_s = interval_s
+        self.settle = settle
+        self.clock = clock
+        self.sleep = sleep
+        self.last_boundary: Optional[float] = None
+        self.skipped = 0
+
+    def wait_next(self) -> float:
+        """Block until the next boundary has settled; return that boundary (candle close time)."""
+        now = self.clock()
+        boundary = next_boundary(now - self.settle, self.interval_s)
+        if self.last_boundary is not None and boundary - self.last_boundary > self.interval_s:
+            missed = int(round((boundary - self.last_boundary) / self.interval_s)) - 1
+            self.skipped += missed
+            log.warning("Loop overran: skipped %d candle boundar%s", missed, "y" if missed == 1 else "ies")
+        delay = boundary + self.settle - now
+        if delay > 0:
+            self.sleep(delay)
+        self.last_boundary = boundary
+        return boundary
+
+
+class LatencyHistogram:
+    """Log-spaced latency buckets (ms) plus exact percentiles over the last `keep` samples."""
+
+    EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+    def __init__(self, name: str, keep: int = 10000, edges_ms: Optional[tuple] = None):
+        self.name = name
+        if edges_ms is not None:
+            self.EDGES_MS = tuple(edges_ms)
+        self.counts = [0] * (len(self.EDGES_MS) + 1)
+        self.samples = deque(maxlen=keep)
+
+    def record(self, seconds: float) -> None:
+        ms = seconds * 1e3
+        self.counts[bisect.bisect_left(self.EDGES_MS, ms)] += 1
+        self.samples.append(ms)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(np.fromiter(self.samples, float), q)) if self.samples else math.nan
+
+    def summary(self) -> str:
+        if not self.samples:
+            return f"{self.name}: no samples"
+        return (f"{self.name}: n={self.count} p50={self.percentile(50):.3g}ms p90={self.percentile(90):.3g}ms "
+                f"p99={self.percentile(99):.3g}ms max={max(self.samples):.3g}ms")
+
+    def format(self, width: int = 40) -> str:
+        lines = [self.summary()]
+        peak = max(self.counts) or 1
+        labels = [f"<={e}ms" for e in self.EDGES_MS] + [f">{self.EDGES_MS[-1]}ms"]
+        for label, n in zip(labels, self.counts):
+            if n:
+                lines.append(f"  {label:>9} {'#' * max(1, round(width * n / peak)):<{width}} {n}")
+        return "\n".join(lines)
+
+
+class LiveLoop:
+    """
+    fetch_bars(since) -> DataFrame of candles with datetime (tz-aware candle start),
+        open/high/low/close/volume, newer than `since` (None: whatever is latest).
+    route_order(action, trade, bar) is called for every ("ENTRY"/"EXIT", Trade) the strategy emits.
+    """
+
+    def __init__(self, fetch_bars: Callable[[Optional[pd.Timestamp]], pd.DataFrame], strategy,
+                 route_order: Callable, interval: str = "1m", settle: float = 2.0,
+                 fetch_timeout: Optional[float] = None, clock: Optional[CandleClock] = None):
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown interval '{interval}' (expected one of {', '.join(INTERVALS)})")
+        self.interval = interval
+        self.interval_s = INTERVALS[interval]
+        self.fetch_bars = fetch_bars
+        self.strategy = strategy
+        self.route_order = route_order
+        self.clock = clock or CandleClock(self.interval_s, settle=settle)
+        # leave at least a second of every candle for evaluation/order routing
+        self.fetch_timeout = fetch_timeout or max(1.0, 0.5 * self.interval_s)
+        self.last_ts: Optional[pd.Timestamp] = None
+        self.tick_to_order = LatencyHistogram("candle close -> order")
+        self.fetch_latency = LatencyHistogram("fetch")
+        self.late_fetches = 0
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="live-fetch")
+
+    def closed_bars(self, df: pd.DataFrame, boundary: float) -> pd.DataFrame:
+        """Bars newer than the cursor whose candle has closed by `boundary`."""
+        if df is None or df.empty:
+            return df
+        start = df["datetime"].map(pd.Timestamp.timestamp).to_numpy()
+        keep = start + self.interval_s <= boundary + 1e-6
+        if self.last_ts is not None:
+            keep &= (df["datetime"] > self.last_ts).to_numpy()
+        return df.loc[keep].sort_values("datetime")
+
+    def step(self, boundary: float) -> List[tuple]:
+        """One cycle after the candle closing at `boundary`; returns the actions routed."""
+        t0 = time.time()
+        future = self._pool.submit(self.fetch_bars, self.last_ts)
+        try:
+            df = future.result(timeout=self.fetch_timeout)
+        except FutureTimeout:
+            self.late_fetches += 1
+            log.warning("Fetch exceeded %.1fs; skipping this candle (next fetch catches up).", self.fetch_timeout)
+            return []
+        except Exception as e:
+            log.error("Fetch failed: %s", e)
+            return []
+        self.fetch_latency.record(time.time() - t0)
+
+        routed = []
+        bars = self.closed_bars(df, boundary)
+        if bars is None or bars.empty:
+            return routed
+        for bar in bars.to_dict("records"):
+            for action, trade in self.strategy.on_bar(bar):
+                self.route_order(action, trade, bar)
+                self.tick_to_order.record(time.time() - boundary)
+                routed.append((action, trade))
+            self.last_ts = bar["datetime"]
+        return routed
+
+    def run(self, max_candles: Optional[int] = None) -> None:
+        n = 0
+        try:
+            while max_candles is None or n < max_candles:
+                boundary = self.clock.wait_next()
+                self.step(boundary)
+                n += 1
+                if n % 30 == 0:
+                    log.info("%s | %s", self.tick_to_order.summary(), self.fetch_latency.summary())
+        except KeyboardInterrupt:
+            log.info("Stopping live loop.")
+        finally:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            log.info("Skipped boundaries: %d, late fetches: %d", self.clock.skipped, self.late_fetches)
+            log.info("\n%s\n%s", self.tick_to_order.format(), self.fetch_latency.format())
@@ -0,0 +1,394 @@
+# market_feed.py
+"""
+Streaming market-data ingestion: feed client -> tick-to-candle aggregator -> fan-out
+to strategy / journal consumers, plus a local WebSocket replay server so the whole
+pipeline runs without the broker.
+
+    python market_feed.py serve --csv data/nifty_1min.cleaned.csv --speed 60   # 1 replayed minute per second
+    python market_feed.py run --url ws://127.0.0.1:8765                        # paper-trade the EMA cross on 1m candles
+    python market_feed.py bench                                                # per-tick processing cost
+
+Pieces:
+- CandleAggregator folds ticks into 1m/5m/15m OHLCV candles (epoch-aligned buckets,
+  which are IST-aligned too) and emits each candle when the first tick of the next
+  bucket arrives (or on close_until()/flush()). Plain float arithmetic per tick.
+- FeedHub fans ticks and closed candles out to subscribers. Strategy consumers are
+  called inline; slow I/O (journals) goes through ThreadedConsumer so it never
+  blocks the tick path.
+- serve_replay() streams a 1-minute OHLCV CSV as 4 ticks per bar (open, the two
+  extremes in plausible order, close); consume() reads that stream into a FeedHub.
+- smartapi_feed() connects SmartAPI's SmartWebSocketV2 to the same FeedHub.
+
+Tick messages are JSON: {"s": symbol, "t": epoch seconds, "p": price, "q": traded qty}.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backtest import IST, EmaCrossStrategy, JournalSink
+from data_store import load_ohlcv
+from live_loop import INTERVALS, LatencyHistogram
+
+# optional websockets (replay server + client); the aggregator/hub work without it
+try:
+    import websockets
+except Exception:
+    websockets = None
+
+REPLAY_CSV = os.path.join("data", "nifty_1min.cleaned.csv")
+REPLAY_HOST, REPLAY_PORT = "127.0.0.1", 8765
+TICK_EDGES_MS = (0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10)
+log = logging.getLogger("market_feed")
+
+
+# -------------------------
+# Aggregation
+# -------------------------
+class CandleAggregator:
+    """
+    Folds (symbol, ts, price, qty) ticks into OHLCV candles for each interval.
+    on_candle(candle) receives {"symbol", "interval", "datetime" (IST candle start),
+    "open", "high", "low", "close", "volume"}. Ticks older than the open candle are dropped.
+    """
+
+    def __init__(self, intervals: Iterable[str] = ("1m", "5m", "15m"), on_candle: Optional[Callable] = None):
+        self.specs = [(name, INTERVALS[name]) for name in intervals]
+        self.on_candle = on_candle or (lambda candle: None)
+        self._open: Dict[tuple, list] = {}  # (symbol, interval) -> [start, open, high, low, close, volume]
+        self.late_ticks = 0
+
+    def add(self, symbol: str, ts: float, price: float, qty: float = 0.0) -> None:
+        for name, secs in self.specs:
+            start = ts - ts % secs
+            key = (symbol, name)
+            c = self._open.get(key)
+            if c is not None and start == c[0]:
+                if price > c[2]:
+                    c[2] = price
+                elif price < c[3]:
+                    c[3] = price
+                c[4] = price
+                c[5] += qty
+            elif c is None or start > c[0]:
+                if c is not None:
+                    self._emit(symbol, name, c)
+                self._open[key] = [start, price, price, price, price, qty]
+            else:
+                self.late_ticks += 1
+
+    def close_until(self, now: float) -> None:
+        """Emit candles whose bucket ended by `now` (quiet markets: no next tick to close them)."""
+        secs_by_name = dict(self.specs)
+        for (symbol, name), c in list(self._open.items()):
+            if c[0] + secs_by_name[name] <= now:
+                del self._open[(symbol, name)]
+                self._emit(symbol, name, c)
+
+    def flush(self) -> None:
+        """Emit every open candle (end of stream)."""
+        for (symbol, name), c in list(self._open.items()):
+            self._emit(symbol, name, c)
+        self._open.clear()
+
+    def _emit(self, symbol: str, name: str, c: list) -> None:
+        self.on_candle({
+            "symbol": symbol, "interval": name,
+            "datetime": pd.Timestamp(c[0], unit="s", tz="UTC").tz_convert(IST),
+            "open": c[1], "high": c[2], "low": c[3], "close": c[4], "volume": c[5],
+        })
+
+
+# -------------------------
+# Fan-out
+# -------------------------
+class FeedHub:
+    """Routes ticks through a CandleAggregator and fans ticks/candles out to subscribers."""
+
+    def __init__(self, intervals: Iterable[str] = ("1m", "5m", "15m"), measure: bool = True):
+        self.aggregator = CandleAggregator(intervals, on_candle=self._on_candle)
+        self._tick_subs: List[Callable] = []
+        self._candle_subs: Dict[str, List[Callable]] = {}
+        self.measure = measure
+        self.tick_latency = LatencyHistogram("tick processing", edges_ms=TICK_EDGES_MS)
+        self.ticks = 0
+
+    def subscribe_ticks(self, fn: Callable) -> None:
+        """fn(symbol, ts, price, qty) on every tick."""
+        self._tick_subs.append(fn)
+
+    def subscribe_candles(self, fn: Callable, interval: str = "1m") -> None:
+        """fn(candle) for every closed candle of `interval`."""
+        self._candle_subs.setdefault(interval, []).append(fn)
+
+    def on_tick(self, symbol: str, ts: float, price: float, qty: float = 0.0) -> None:
+        t0 = time.perf_counter() if self.measure else 0.0
+        self.aggregator.add(symbol, ts, price, qty)
+        for fn in self._tick_subs:
+            fn(symbol, ts, price, qty)
+        self.ticks += 1
+        if self.measure:
+            self.tick_latency.record(time.perf_counter() - t0)
+
+    def flush(self) -> None:
+        self.aggregator.flush()
+
+    def _on_candle(self, candle: dict) -> None:
+        for fn in self._candle_subs.get(candle["interval"], ()):
+            fn(candle)
+
+
+class ThreadedConsumer:
+    """Runs fn(item) on its own thread behind a queue, so slow consumers don't stall the feed."""
+
+    _STOP = object()
+
+    def __init__(self, fn: Callable, maxsize: int = 100000, name: str = "feed-consumer"):
+        self.fn = fn
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def __call__(self, item) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is self._STOP:
+                return
+            try:
+                self.fn(item)
+            except Exception as e:
+                log.error("Feed consumer failed: %s", e)
+
+    def close(self, timeout: Optional[float] = 10) -> None:
+        """Drain the queue and stop the thread."""
+        self.queue.put(self._STOP)
+        self._thread.join(timeout)
+
+
+class StrategyConsumer:
+    """Feeds closed candles to a streaming strategy (backtest.EmaCrossStrategy) and reports its actions."""
+
+    def __init__(self, strategy, on_action: Optional[Callable] = None):
+        self.strategy = strategy
+        self.on_action = on_action or self._log_action
+        self.actions = 0
+
+    def __call__(self, candle: dict) -> None:
+        for action, trade in self.strategy.on_bar(candle):
+            self.actions += 1
+            self.on_action(action, trade, candle)
+
+    @staticmethod
+    def _log_action(action, trade, candle) -> None:
+        price = trade.entry_price if action == "ENTRY" else trade.exit_price
+        reason = trade.entry_reason if action == "ENTRY" else trade.exit_reason
+        log.info("%s %s @ %.2f (%s) candle=%s", action, candle["symbol"], price, reason, candle["datetime"])
+
+
+# -------------------------
+# Replay (local stand-in for the broker feed)
+# -------------------------
+def bar_ticks(df: pd.DataFrame, interval_s: int = 60) -> np.ndarray:
+    """
+    Four ticks per OHLCV bar as an (n*4, 3) array of [ts, price, qty]: open at the bar
+    start, then low/high (up bar) or high/low (down bar), close just before the bar end.
+    Aggregating them back at the bar's interval reproduces the bar exactly.
+    """
+    start = df["datetime"].map(pd.Timestamp.timestamp).to_numpy(dtype=float)
+    o, h, l, c = (df[k].to_numpy(dtype=float) for k in ("open", "high", "low", "close"))
+    v = df["volume"].to_numpy(dtype=float) if "volume" in df.columns else np.zeros(len(df))
+    up = c >= o
+    prices = np.column_stack([o, np.where(up, l, h), np.where(up, h, l), c])
+    offsets = np.array([0.0, 0.25, 0.5, 0.95]) * interval_s
+    times = start[:, None] + offsets[None, :]
+    qty = np.repeat((v / 4.0)[:, None], 4, axis=1)  # quarters of a float sum back exactly
+    return np.column_stack([times.ravel(), prices.ravel(), qty.ravel()])
+
+
+async def replay_server(csv_path: str = REPLAY_CSV, host: str = REPLAY_HOST, port: int = REPLAY_PORT,
+                        speed: float = 60.0, symbol: str = "NIFTY"):
+    """
+    Start (and return) a WebSocket server streaming csv_path's bars as ticks to every
+    client that connects. speed = replayed seconds per wall second (0: as fast as
+    possible). Each stream ends with {"type": "eof"}. port=0 picks a free port.
+    """
+    if websockets is None:
+        raise ImportError("The replay server needs the 'websockets' package (pip install websockets).")
+    ticks = bar_ticks(load_ohlcv(csv_path))
+
+    async def stream(ws):
+        t_wall, t_feed = time.monotonic(), ticks[0, 0] if len(ticks) else 0.0
+        for ts, price, qty in ticks.tolist():
+            if speed > 0:
+                delay = (ts - t_feed) / speed - (time.monotonic() - t_wall)
+                if delay > 0.001:
+                    await asyncio.sleep(delay)
+            await ws.send(json.dumps({"s": symbol, "t": ts, "p": price, "q": qty}))
+        await ws.send(json.dumps({"type": "eof"}))
+
+    server = await websockets.serve(stream, host, port)
+    log.info("Replaying %s (%d ticks) on ws://%s:%d at %sx", csv_path, len(ticks), host,
+             server.sockets[0].getsockname()[1], speed or "max")
+    return server
+
+
+async def serve_replay(*args, **kwargs) -> None:
+    server = await replay_server(*args, **kwargs)
+    async with server:
+        await server.serve_forever()
+
+
+async def consume(url: str, hub: FeedHub) -> int:
+    """Read a tick stream (replay server protocol) into hub until eof/close; returns ticks read."""
+    if websockets is None:
+        raise ImportError("The feed client needs the 'websockets' package (pip install websockets).")
+    n = 0
+    async with websockets.connect(url, max_queue=None) as ws:
+        async for raw in ws:
+            msg = json.loads(raw)
+            if msg.get("type") == "eof":
+                break
+            hub.on_tick(msg["s"], msg["t"], msg["p"], msg.get("q", 0.0))
+            n += 1
+    hub.flush()
+    return n
+
+
+# -------------------------
+# SmartAPI live feed
+# -------------------------
+def smartapi_feed(hub: FeedHub, token_list: list, mode: int = 2, symbols: Optional[dict] = None):
+    """
+    Connect SmartWebSocketV2 (QUOTE mode by default) and push its ticks into hub.
+    token_list is SmartAPI's [{"exchangeType": 1, "tokens": ["26000"]}]; symbols maps
+    token -> name for the candles. Blocks in the SDK's connect() loop.
+    """
+    from SmartApi.smartWebSocketV2 import SmartWebSocketV2
+    from smartapi_session_manager import get_client
+
+    api, session = get_client()
+    sws = SmartWebSocketV2(session["jwtToken"], api.api_key, session["clientcode"], session["feedToken"])
+    day_volume: Dict[str, float] = {}
+    names = symbols or {}
+
+    def on_data(wsapp, msg):
+        token = msg.get("token")
+        # prices in paise; quantity from the change in day volume (LTP mode has none)
+        cum = float(msg.get("volume_trade_for_the_day") or 0.0)
+        qty = max(0.0, cum - day_volume.get(token, cum))
+        day_volume[token] = cum
+        hub.on_tick(names.get(token, token), msg["exchange_timestamp"] / 1000.0, msg["last_traded_price"] / 100.0, qty)
+
+    def on_open(wsapp):
+        sws.subscribe("feed", mode, token_list)
+
+    def on_error(wsapp, error):
+        log.error("SmartAPI feed error: %s", error)
+
+    sws.on_open, sws.on_data, sws.on_error = on_open, on_data, on_error
+    sws.connect()
+
+
+# -------------------------
+# CLI
+# -------------------------
+def _build_hub(args) -> tuple:
+    """Hub with the EMA-cross strategy on 1m candles; trade and candle journals on their own threads."""
+    hub = FeedHub()
+    strategy = EmaCrossStrategy()
+    journal = JournalSink(args.journal, flush_every=1) if args.journal else None
+
+    def record(item):
+        action, trade, candle = item
+        StrategyConsumer._log_action(action, trade, candle)
+        if action == "EXIT" and journal is not None:
+            journal.write(trade.to_dict())
+
+    consumers = [ThreadedConsumer(record, name="trade-journal")]
+    hub.subscribe_candles(StrategyConsumer(strategy, on_action=lambda *item: consumers[0](item)), "1m")
+    candles = JournalSink(args.candles, flush_every=500) if args.candles else None
+    if candles is not None:
+        consumers.append(ThreadedConsumer(candles.write, name="candle-journal"))
+        hub.subscribe_candles(consumers[-1], "1m")
+    return hub, strategy, journal, candles, consumers
+
+
+def run_main(args) -> None:
+    hub, strategy, journal, candles, consumers = _build_hub(args)
+    t0 = time.perf_counter()
+    n = asyncio.run(consume(args.url, hub))
+    eod = strategy.close_open()
+    if eod is not None:
+        consumers[0](("EXIT", eod, strategy.last_bar))
+    for consumer in consumers:
+        consumer.close()
+    for sink in (journal, candles):
+        if sink is not None:
+            sink.close()
+    closed = [t for t in strategy.trades if t.exit_time is not None]
+    print(f"Consumed {n} ticks in {time.perf_counter() - t0:.2f}s; {len(closed)} trades, "
+          f"pnl {sum(t.pnl for t in closed):.2f}")
+    print(hub.tick_latency.format())
+
+
+def bench_main(args) -> None:
+    df = load_ohlcv(args.csv)
+    ticks = bar_ticks(df).tolist()
+    hub = FeedHub(measure=False)
+    hub.subscribe_candles(StrategyConsumer(EmaCrossStrategy(), on_action=lambda *a: None), "1m")
+    t0 = time.perf_counter()
+    for ts, price, qty in ticks:
+        hub.on_tick("NIFTY", ts, price, qty)
+    hub.flush()
+    elapsed = time.perf_counter() - t0
+    print(f"{len(ticks)} ticks (incl. 1m strategy + 5m/15m candles) in {elapsed * 1e3:.1f} ms "
+          f"= {elapsed / len(ticks) * 1e6:.2f} us/tick")
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="replay a 1-minute CSV as a WebSocket tick feed")
+    serve.add_argument("--csv", default=REPLAY_CSV)
+    serve.add_argument("--host", default=REPLAY_HOST)
+    serve.add_argument("--port", type=int, default=REPLAY_PORT)
+    serve.add_argument("--speed", type=float, default=60.0, help="replayed seconds per second (0 = max)")
+    serve.add_argument("--symbol", default="NIFTY")
+    run = sub.add_parser("run", help="consume a feed: candles -> EMA-cross strategy (paper) + journals")
+    run.add_argument("--url", default=f"ws://{REPLAY_HOST}:{REPLAY_PORT}")
+    run.add_argument("--journal", default=os.path.join("data", "feed_trades_journal.csv"))
+    run.add_argument("--candles", default=os.path.join("data", "feed_candles_1m.csv"))
+    bench = sub.add_parser("bench", help="time the tick path without a socket")
+    bench.add_argument("--csv", default=REPLAY_CSV)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve_replay(args.csv, args.host, args.port, args.speed, args.symbol))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "run":
+        run_main(args)
+    else:
+        bench_main(args)
+
+
+if __name__ == "__main__":
+    main()
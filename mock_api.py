@@ -1,12 +1,26 @@
 # mock_api.py
 from flask import Flask, request, jsonify
+import os
 import time
 import math
 from datetime import datetime, timedelta
-import random
+import threading
+import zlib
+
+import numpy as np
+
+from synth_market import SyntheticMarket  # vectorized seeded price paths
 
 app = Flask(__name__)
 
+# optional artificial per-request latency (ms), e.g. MOCK_LATENCY_MS=50, to mimic a remote broker
+MOCK_LATENCY_MS = float(os.environ.get("MOCK_LATENCY_MS", "0"))
+
+@app.before_request
+def _simulate_latency():
+    if MOCK_LATENCY_MS > 0:
+        time.sleep(MOCK_LATENCY_MS / 1000.0)
+
 @app.route("/login", methods=["POST"])
 def login():
     data = request.json or {}
@@ -24,36 +38,104 @@ def place_order():
     order_id = f"MOCK-{int(time.time()*1000)}"
     return jsonify({"status": "ok", "order_id": order_id, "received": payload})
 
+@app.route("/holding", methods=["GET"])
+def holding():
+    return jsonify({"status": "ok", "data": [
+        {"tradingsymbol": "NIFTYBEES", "quantity": 50, "averageprice": 245.3, "ltp": 251.1},
+        {"tradingsymbol": "BANKBEES", "quantity": 20, "averageprice": 512.0, "ltp": 508.4},
+    ]})
+
+@app.route("/funds", methods=["GET"])
+def funds():
+    return jsonify({"status": "ok", "data": {"net": 100000.0, "availablecash": 100000.0, "utiliseddebits": 0.0}})
+
+@app.route("/orderbook", methods=["GET"])
+def orderbook():
+    return jsonify({"status": "ok", "data": []})
+
+# per-symbol 1-minute series, extended as time advances, so a bar keeps its price between
+# polls and a `since` cursor can return just the new bars
+MAX_SERIES = 20000
+_series = {}
+_series_lock = threading.Lock()
+
+
+def _walk(rng, price, n):
+    """n more 1-minute prices from price (a fresh 24x7 synthetic market sharing rng)."""
+    return SyntheticMarket(start_price=price, seed=rng, session=False).closes(n).tolist()
+
+
+def _minute_series(symbol, now_minute, count):
+    """(end minute, prices) with at least `count` bars ending at now_minute."""
+    with _series_lock:
+        s = _series.get(symbol)
+        if s is None:
+            rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+            base = 25000 if symbol.upper().startswith("NIFTY") else 20000
+            market = SyntheticMarket(start_price=base + rng.uniform(-10, 10), seed=rng, session=False)
+            s = _series[symbol] = {"end": now_minute, "rng": rng, "market": market,
+                                   "prices": market.closes(count).tolist()}
+        prices = s["prices"]
+        ahead = int((now_minute - s["end"]).total_seconds() // 60)
+        if ahead > MAX_SERIES:
+            # idle longer than the held window: every held bar would be trimmed, so start a full
+            # window that ends at now_minute (the market still continues from its last price)
+            prices[:] = s["market"].closes(MAX_SERIES).tolist()
+            s["end"] = now_minute
+        elif ahead > 0:
+            # the market keeps its price and regime between polls, so the series just continues
+            prices.extend(s["market"].closes(ahead).tolist())
+            s["end"] = now_minute
+        if count > len(prices):
+            # older history: walk backwards from the first bar
+            prices[:0] = _walk(s["rng"], prices[0], count - len(prices))[::-1]
+        del prices[:max(0, len(prices) - max(count, MAX_SERIES))]
+        return s["end"], prices[-count:]
+
+
+def _parse_since(value):
+    """ISO datetime (naive = local, as this endpoint returns) or epoch seconds -> naive local datetime."""
+    try:
+        return datetime.fromtimestamp(float(value))
+    except ValueError:
+        ts = datetime.fromisoformat(value)
+        return ts.astimezone().replace(tzinfo=None) if ts.tzinfo else ts
+
+
 @app.route("/quote", methods=["GET"])
 def quote():
     """
-    GET /quote?symbol=NIFTY&count=100&force=false
-    Returns a simple time-series of price points (timestamp, price).
+    GET /quote?symbol=NIFTY&count=100&force=false[&since=2025-09-10T10:15:00]
+    Returns a simple time-series of 1-minute price points (datetime, price) ending at
+    the current minute. With `since`, only bars after it are returned (at most count),
+    so a polling client receives one or two new bars instead of the whole window.
     """
     symbol = request.args.get("symbol", "NIFTY")
     count = int(request.args.get("count", "100"))
     # optional parameter 'force' for compatibility
     force = request.args.get("force", "false").lower() in ("1","true","yes")
+    since = request.args.get("since")
 
-    # generate mock price series ending now, 1-minute spacing
-    now = datetime.now()
-    base = 25000 if symbol.upper().startswith("NIFTY") else 20000
-    # small deterministic-ish seed per symbol so repeated calls look similar
-    random.seed(hash(symbol) & 0xffffffff)
-    prices = []
-    price = base + random.uniform(-10, 10)
-    for i in range(count):
-        # simulate minute-by-minute walk
-        delta = random.gauss(0, 4)
-        price = max(1, price + delta)
-        ts = (now - timedelta(minutes=(count - 1 - i))).isoformat()
-        prices.append({"datetime": ts, "price": round(price, 2)})
+    now_minute = datetime.now().replace(second=0, microsecond=0)
+    try:
+        since_dt = _parse_since(since) if since else None
+    except ValueError:
+        return jsonify({"status": "error", "message": f"bad since: {since}"}), 400
+    if since_dt is not None:
+        # bars are stamped on the minute: a cursor inside a minute means "after that minute's bar"
+        since_dt = since_dt.replace(second=0, microsecond=0)
+        count = max(0, min(count, int((now_minute - since_dt).total_seconds() // 60)))
+    end, series = _minute_series(symbol, now_minute, count) if count else (now_minute, [])
+    prices = [{"datetime": (end - timedelta(minutes=(len(series) - 1 - i))).isoformat(), "price": p}
+              for i, p in enumerate(series)]
 
     return jsonify({
         "status": "ok",
         "symbol": symbol,
-        "count": count,
+        "count": len(prices),
         "force": force,
+        "since": since,
+        "last": prices[-1]["datetime"] if prices else since,
         "data": prices
     })
 
@@ -1,12 +1,15 @@
 # mock_smartapi.py
 """
 Mock SmartAPI server — guaranteed CE/PE signals
-GET /quote?symbol=X&count=N&force=ce|pe
+GET /quote?symbol=X&count=N&force=ce|pe[&since=<epoch seconds or ISO datetime>]
  - ce: strong uptrend, ensures BUY_CE
  - pe: strong downtrend, ensures BUY_PE
 """
 from flask import Flask, request, jsonify
 import time
+from datetime import datetime
+
+import numpy as np
 
 app = Flask(__name__)
 
@@ -21,33 +24,40 @@ def login():
         })
     return jsonify({"status": "error", "message": "invalid credentials"}), 401
 
-def generate_forced(symbol="NIFTY", count=100, force="ce", start_price=25000):
-    candles = []
-    price = float(start_price)
-    now = int(time.time())
+# first bar time per (symbol, force): prices are a function of the bar's minute since
+# then, so repeated polls agree and a `since` cursor can return only the new candles
+_anchors = {}
+
+
+def generate_forced(symbol="NIFTY", count=100, force="ce", start_price=25000, since=None):
+    now = int(time.time()) // 60 * 60
+    first = now - (count - 1) * 60
+    anchor = _anchors.setdefault((symbol, force), first)
+    if since is not None:
+        first = max(first, (int(since) // 60 + 1) * 60)
     # decide slope: up = +5 each step, down = -5 each step
     slope = 5 if force == "ce" else -5
-    for i in range(count):
-        open_p = price
-        close_p = price + slope
-        high_p = max(open_p, close_p) + 1
-        low_p = min(open_p, close_p) - 1
-        vol = 100
-        ts = now - (count - 1 - i) * 60
-        candles.append({
-            "symbol": symbol,
-            "timestamp": ts,
-            "open": round(open_p, 2),
-            "high": round(high_p, 2),
-            "low": round(low_p, 2),
-            "close": round(close_p, 2),
-            "volume": vol
-        })
-        price = close_p
-    return candles
+    # whole window as arrays (no per-candle loop); prices depend only on the minute since the anchor
+    ts = np.arange(first, now + 1, 60, dtype=np.int64)
+    open_p = float(start_price) + slope * ((ts - anchor) // 60)
+    close_p = open_p + slope
+    high_p = np.maximum(open_p, close_p) + 1
+    low_p = np.minimum(open_p, close_p) - 1
+    cols = zip(ts.tolist(), np.round(open_p, 2).tolist(), np.round(high_p, 2).tolist(),
+               np.round(low_p, 2).tolist(), np.round(close_p, 2).tolist())
+    return [{"symbol": symbol, "timestamp": t, "open": o, "high": h, "low": l, "close": c, "volume": 100}
+            for t, o, h, l, c in cols]
+
+def _parse_since(value):
+    """Epoch seconds or ISO datetime (naive = local time, like mock_api) -> epoch seconds."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
 
 @app.route("/quote", methods=["GET"])
 def quote():
+    """GET /quote?symbol=X&count=N&force=ce|pe[&since=<epoch seconds or ISO>] -> candles after since (at most N)."""
     symbol = request.args.get("symbol", "NIFTY")
     try:
         count = int(request.args.get("count", "100"))
@@ -56,9 +66,28 @@ def quote():
     force = (request.args.get("force") or "ce").lower()
     if force not in ("ce", "pe"):
         force = "ce"
-    candles = generate_forced(symbol=symbol, count=count, force=force)
+    try:
+        since = _parse_since(request.args["since"]) if request.args.get("since") else None
+    except ValueError:
+        return jsonify({"status": "error", "message": "since must be epoch seconds or an ISO datetime"}), 400
+    candles = generate_forced(symbol=symbol, count=count, force=force, since=since)
     return jsonify(candles)
 
+@app.route("/holding", methods=["GET"])
+def holding():
+    return jsonify({"status": "success", "data": [
+        {"tradingsymbol": "NIFTYBEES", "quantity": 50, "averageprice": 245.3, "ltp": 251.1},
+        {"tradingsymbol": "BANKBEES", "quantity": 20, "averageprice": 512.0, "ltp": 508.4},
+    ]})
+
+@app.route("/funds", methods=["GET"])
+def funds():
+    return jsonify({"status": "success", "data": {"net": 100000.0, "availablecash": 100000.0, "utiliseddebits": 0.0}})
+
+@app.route("/orderbook", methods=["GET"])
+def orderbook():
+    return jsonify({"status": "success", "data": []})
+
 @app.route("/order", methods=["POST"])
 def order():
     body = request.json or {}
@@ -0,0 +1,87 @@
+# quote_buffer.py
+"""
+Client-side rolling window of quotes, kept current with the mock backends' `since`
+cursor: the first poll downloads the window once, later polls ask only for bars
+after the newest one held and append them (trimming to the window length).
+
+Buffers live at module level, keyed on (base, symbol), so they survive Streamlit
+reruns the same way the pooled http_client session does.
+
+    from quote_buffer import fetch_quotes
+    df = fetch_quotes("NIFTY", 2000)        # DataFrame with a datetime column, oldest first
+
+Works with both response shapes: mock_api ({"data": [{"datetime", "price"}]}) and
+mock_smartapi (a bare list of candles with epoch "timestamp").
+"""
+from __future__ import annotations
+import threading
+from typing import Optional
+
+import pandas as pd
+
+import http_client
+
+API_BASE = "http://127.0.0.1:5001"
+
+
+class QuoteBuffer:
+    def __init__(self, symbol: str, maxlen: int = 2000, base: str = API_BASE, params: Optional[dict] = None):
+        self.symbol = symbol
+        self.maxlen = int(maxlen)
+        self.base = base.rstrip("/")
+        self.params = dict(params or {})
+        self.frame = pd.DataFrame()
+        self.cursor = None        # value sent as `since`: the newest bar's own datetime/timestamp
+        self.last_rows = 0        # bars in the most recent response (payload size)
+        self._lock = threading.Lock()
+
+    def poll(self) -> pd.DataFrame:
+        """Fetch bars newer than the cursor, append, trim; returns the current window."""
+        with self._lock:
+            params = {"symbol": self.symbol, "count": self.maxlen, **self.params}
+            if self.cursor is not None:
+                params["since"] = self.cursor
+            r = http_client.get(f"{self.base}/quote", endpoint="quote", params=params)
+            r.raise_for_status()
+            payload = r.json()
+            rows = payload.get("data", []) if isinstance(payload, dict) else payload
+            self.last_rows = len(rows or [])
+            if rows:
+                self._append(pd.DataFrame(rows))
+            return self.frame
+
+    def _append(self, new: pd.DataFrame) -> None:
+        # the cursor echoes the backend's own format back (ISO string or epoch seconds)
+        if "timestamp" in new.columns:
+            self.cursor = int(new["timestamp"].iloc[-1])
+            new.insert(0, "datetime", pd.to_datetime(new["timestamp"], unit="s"))
+        else:
+            self.cursor = str(new["datetime"].iloc[-1])
+            new["datetime"] = pd.to_datetime(new["datetime"], errors="coerce")
+        if not self.frame.empty:
+            new = new[new["datetime"] > self.frame["datetime"].iloc[-1]]
+            new = pd.concat([self.frame, new], ignore_index=True)
+        self.frame = new.iloc[-self.maxlen:].reset_index(drop=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.frame, self.cursor, self.last_rows = pd.DataFrame(), None, 0
+
+
+_buffers = {}
+_buffers_lock = threading.Lock()
+
+
+def get_buffer(symbol: str, count: int, base: str = API_BASE, **params) -> QuoteBuffer:
+    """Shared buffer for (base, symbol); grows (refetching once) if a bigger window is asked for."""
+    key = (base, symbol, tuple(sorted(params.items())))
+    with _buffers_lock:
+        buf = _buffers.get(key)
+        if buf is None or buf.maxlen < count:
+            buf = _buffers[key] = QuoteBuffer(symbol, maxlen=count, base=base, params=params)
+        return buf
+
+
+def fetch_quotes(symbol: str, count: int, base: str = API_BASE, **params) -> pd.DataFrame:
+    """Latest `count` bars for symbol (incremental after the first call)."""
+    return get_buffer(symbol, count, base, **params).poll().tail(count).reset_index(drop=True)
@@ -6,35 +6,16 @@ One-step runner:
 - then calls holding() and prints a safe debug summary
 """
 import os
-import json
 import sys
 
 # Import the session manager's ensure_session() function
 try:
-    from smartapi_session_manager import ensure_session
+    from smartapi_session_manager import ensure_session, get_client
 except Exception as e:
     print("❌ Could not import ensure_session from smartapi_session_manager.py:", e)
     sys.exit(1)
 
-# Import SmartConnect
-try:
-    from SmartApi.smartConnect import SmartConnect
-except Exception:
-    try:
-        from smartapi.smartConnect import SmartConnect
-    except Exception as e:
-        print("❌ Could not import SmartConnect:", e)
-        sys.exit(1)
-
 def call_holding():
-    # Load session.json
-    try:
-        with open("session.json", "r") as f:
-            session = json.load(f)
-    except Exception as e:
-        print("❌ Could not read session.json:", e)
-        return False
-
     api_key = os.environ.get("SMARTAPI_KEY")
     if not api_key:
         print('❌ SMARTAPI_KEY not set for this session. Run:')
@@ -42,18 +23,11 @@ def call_holding():
         return False
 
     try:
-        api = SmartConnect(api_key=api_key)
-        # apply tokens (if present)
-        if session.get("jwtToken"):
-            try:
-                api.setAccessToken(session["jwtToken"])
-            except Exception:
-                pass
-        if session.get("refreshToken"):
-            try:
-                api.setRefreshToken(session["refreshToken"])
-            except Exception:
-                pass
+        # shared client: already has session.json's tokens if ensure_session() ran
+        api, session = get_client(api_key)
+        if not session:
+            print("❌ Could not read session.json")
+            return False
 
         resp = api.holding()
     except Exception as e:
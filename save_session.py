@@ -1,6 +1,7 @@
 # save_session.py
 from SmartApi.smartConnect import SmartConnect
-import getpass, os, json
+import getpass, os
+from session_store import write_session
 
 def main():
     print("\n=== Save SmartAPI session tokens ===\n")
@@ -26,8 +27,7 @@ def main():
             "refreshToken": data.get("refreshToken"),
             "feedToken": data.get("feedToken")
         }
-        with open("session.json", "w") as f:
-            json.dump(session, f, indent=2)
+        write_session("session.json", session)
         print("✅ Saved session tokens to session.json (in C:\\AUTO_TRADING_TRACKER).")
         print("DO NOT share session.json publicly. Keep it secure.")
     else:
@@ -0,0 +1,145 @@
+# session_store.py
+"""
+Crash- and concurrency-safe storage for session.json.
+
+- write_session() writes to a temp file in the same directory and os.replace()s it
+  over the target, so a reader only ever sees the old or the new file, never a
+  truncated one.
+- locked() holds an advisory lock on <path>.lock (fcntl on POSIX, msvcrt on
+  Windows) for read-modify-write sequences such as a token refresh, so several
+  processes (bot, dashboard, refresh script) share one login instead of each
+  re-authenticating. The lock is re-entrant within a process.
+- read_session() keeps the parsed file in memory keyed on (mtime, size) and only
+  re-parses when the file changes.
+
+    from session_store import read_session, write_session, locked
+    with locked("session.json"):
+        session = read_session("session.json")
+        ...
+        write_session("session.json", session)
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+# advisory file locks: fcntl on POSIX, msvcrt on Windows
+try:
+    import fcntl
+except Exception:
+    fcntl = None
+try:
+    import msvcrt
+except Exception:
+    msvcrt = None
+
+LOCK_TIMEOUT = 60.0  # seconds to wait for another process's lock before giving up
+log = logging.getLogger("session_store")
+
+_cache = {}  # abs path -> ((mtime_ns, size), session dict)
+_thread_lock = threading.RLock()
+_held = {}  # abs lock path -> (file object, depth) for the thread holding _thread_lock
+
+
+def _lock_file(f, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for lock on {f.name}")
+            time.sleep(0.05)
+
+
+def _unlock_file(f) -> None:
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    except OSError as e:
+        log.warning("Failed to release lock on %s: %s", f.name, e)
+
+
+@contextmanager
+def locked(path: str, timeout: float = LOCK_TIMEOUT):
+    """Exclusive advisory lock on path (via path + '.lock'), across threads and processes."""
+    lock_path = os.path.abspath(path) + ".lock"
+    with _thread_lock:
+        f, depth = _held.get(lock_path, (None, 0))
+        if f is None:
+            f = open(lock_path, "a+")
+            try:
+                _lock_file(f, timeout)
+            except BaseException:
+                f.close()
+                raise
+        _held[lock_path] = (f, depth + 1)
+        try:
+            yield
+        finally:
+            f, depth = _held.pop(lock_path)
+            if depth > 1:
+                _held[lock_path] = (f, depth - 1)
+            else:
+                _unlock_file(f)
+                f.close()
+
+
+def _stat_key(path: str):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def read_session(path: str) -> Optional[dict]:
+    """Parsed session file (a fresh copy), or None if missing/unreadable."""
+    abspath = os.path.abspath(path)
+    try:
+        key = _stat_key(abspath)
+    except FileNotFoundError:
+        return None
+    cached = _cache.get(abspath)
+    if cached is not None and cached[0] == key:
+        return dict(cached[1])
+    with open(abspath, "r") as f:
+        session = json.load(f)
+    _cache[abspath] = (key, session)
+    return dict(session)
+
+
+def write_session(path: str, session: dict) -> None:
+    """Atomically replace path with session as JSON."""
+    abspath = os.path.abspath(path)
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(abspath) + ".", suffix=".tmp",
+                               dir=os.path.dirname(abspath))
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(session, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        for attempt in range(20):
+            try:
+                os.replace(tmp, abspath)
+                break
+            except PermissionError:
+                # Windows: the target is briefly open in a reader
+                if attempt == 19:
+                    raise
+                time.sleep(0.05)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    _cache[abspath] = (_stat_key(abspath), dict(session))
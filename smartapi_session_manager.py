@@ -3,11 +3,22 @@
 Fail-safe SmartAPI session manager (updated)
 - Ensures generateToken(refreshToken) is called immediately after generateSession
 - Tries refresh first, falls back to manual login, and always exchanges refresh->jwt properly
+- get_client() hands every script in the process the same configured SmartConnect;
+  while the stored jwtToken's exp claim is in the future no profile round-trip is made
+- start_token_refresher() renews the jwtToken in a background thread ahead of expiry,
+  so long-running callers never re-authenticate in-line
+- session.json goes through session_store: atomic replace on write, an advisory lock
+  around refresh/login, and an mtime-keyed in-process read cache
 """
 import os
 import json
+import time
+import base64
 import logging
 import getpass
+import threading
+
+import session_store
 
 # Import SmartConnect from installed package
 try:
@@ -25,16 +36,18 @@ except Exception:
     pyotp = None
 
 SESSION_FILE = "session.json"
+TOKEN_EXPIRY_MARGIN = 120  # seconds before exp at which a jwtToken is treated as expired
+REFRESH_LEAD = 600         # background refresher renews this many seconds ahead of exp
+REFRESH_RETRY = 30         # seconds between attempts after a failed background refresh
+REFRESH_MIN_DELAY = 15     # floor between background refreshes (renewed tokens that live less than the lead)
+REFRESH_INTERVAL = 3600    # renewal period when the jwtToken carries no exp claim
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 log = logging.getLogger("smartapi-session-manager")
 
 
 def load_session():
-    if not os.path.exists(SESSION_FILE):
-        return None
     try:
-        with open(SESSION_FILE, "r") as f:
-            return json.load(f)
+        return session_store.read_session(SESSION_FILE)
     except Exception as e:
         log.error("Failed to read %s: %s", SESSION_FILE, e)
         return None
@@ -42,13 +55,87 @@ def load_session():
 
 def save_session(session):
     try:
-        with open(SESSION_FILE, "w") as f:
-            json.dump(session, f, indent=2)
+        session_store.write_session(SESSION_FILE, session)
         log.info("Saved session.json (clientcode=%s). Keep this file private.", session.get("clientcode"))
     except Exception as e:
         log.error("Failed to save session.json: %s", e)
 
 
+def jwt_claims(token):
+    """Decoded payload of a JWT (signature not verified), or None if it can't be read."""
+    if not token or not isinstance(token, str):
+        return None
+    token = token.split()[-1]  # tolerate a "Bearer " prefix
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    payload = parts[1] + "=" * (-len(parts[1]) % 4)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except Exception:
+        return None
+    return claims if isinstance(claims, dict) else None
+
+
+def jwt_expiry(token):
+    """Epoch seconds from the token's exp claim, or None if unknown."""
+    exp = (jwt_claims(token) or {}).get("exp")
+    try:
+        return float(exp)
+    except (TypeError, ValueError):
+        return None
+
+
+def token_valid(session, margin=TOKEN_EXPIRY_MARGIN):
+    """True when session's jwtToken is known to be valid for at least `margin` more seconds."""
+    exp = jwt_expiry((session or {}).get("jwtToken"))
+    return exp is not None and exp - margin > time.time()
+
+
+def apply_tokens(api, session):
+    """Set whatever tokens session holds on a SmartConnect instance."""
+    for key, setter in (("jwtToken", "setAccessToken"), ("refreshToken", "setRefreshToken"),
+                        ("feedToken", "setFeedToken"), ("clientcode", "setUserId")):
+        if session.get(key):
+            try:
+                getattr(api, setter)(session[key])
+            except Exception:
+                log.debug("api.%s not supported by SDK version; continuing.", setter)
+
+
+# one configured client per process, shared by every caller of get_client()
+_client = None
+_client_session = None
+_client_lock = threading.Lock()
+
+
+def get_client(api_key=None, session=None, reload=False):
+    """
+    Return (api, session): the process-wide SmartConnect with session.json's tokens applied.
+    The client is built on first use; later calls return the same object without
+    re-reading session.json unless reload=True or a new session dict is passed in.
+    session is None when there is no session.json yet.
+    """
+    global _client, _client_session
+    with _client_lock:
+        if _client is None:
+            _client = SmartConnect(api_key=api_key or get_api_key())
+        if session is None:
+            session = load_session() if (reload or _client_session is None) else _client_session
+        if session and session is not _client_session:
+            apply_tokens(_client, session)
+        _client_session = session
+        return _client, session
+
+
+def reset_client():
+    """Drop the cached client (next get_client() builds a fresh one) and stop its refresher."""
+    global _client, _client_session
+    stop_token_refresher()
+    with _client_lock:
+        _client, _client_session = None, None
+
+
 def get_api_key():
     api_key = os.environ.get("SMARTAPI_KEY")
     if api_key:
@@ -107,7 +194,22 @@ def safe_get_profile(api, session):
     return False, resp
 
 
-def attempt_refresh(api, session):
+def attempt_refresh(api, session, save=True):
+    """
+    Exchange refreshToken for new tokens while holding the session.json lock.
+    If another process renewed the file while we waited, adopt its tokens instead.
+    """
+    with session_store.locked(SESSION_FILE):
+        latest = load_session()
+        if latest and latest.get("jwtToken") != session.get("jwtToken") and token_valid(latest):
+            log.info("session.json was already renewed by another process; using its tokens.")
+            session.update(latest)
+            apply_tokens(api, session)
+            return True, {"status": True, "message": "adopted tokens from session.json", "data": latest}
+        return _exchange_refresh_token(api, session, save)
+
+
+def _exchange_refresh_token(api, session, save):
     refresh_token = session.get("refreshToken")
     if not refresh_token:
         return False, {"message": "no refreshToken"}
@@ -140,7 +242,8 @@ def attempt_refresh(api, session):
                 api.setFeedToken(feed)
             except Exception:
                 pass
-        save_session(session)
+        if save:
+            save_session(session)
         return True, resp
     return False, resp
 
@@ -198,16 +301,125 @@ def do_manual_login_and_exchange(api):
     return True, session
 
 
+class TokenRefresher(threading.Thread):
+    """
+    Daemon thread that calls generateToken(refreshToken) `lead` seconds before the
+    jwtToken's exp claim and swaps the new tokens onto the shared client.
+
+    The exchange runs on a separate SmartConnect (built by `connect`), so the trading
+    loop's client is never mid-request on the refresh; only the token assignment
+    happens under the client lock. The session dict is updated in place and saved
+    from this thread.
+
+    The first check runs as soon as the thread starts; after that the refresher
+    waits at least `min_delay` seconds, and a refresh whose jwtToken does not
+    move exp forward counts as a failure (retried every REFRESH_RETRY seconds).
+    """
+
+    def __init__(self, api, session, lead=REFRESH_LEAD, connect=None, min_delay=REFRESH_MIN_DELAY):
+        super().__init__(name="smartapi-token-refresher", daemon=True)
+        self.api = api
+        self.session = session
+        self.lead = lead
+        self.min_delay = min_delay
+        self.connect = connect or (lambda: SmartConnect(api_key=api.api_key))
+        self.failures = 0
+        self._stop_event = threading.Event()
+
+    def next_delay(self):
+        if self.failures:
+            return REFRESH_RETRY
+        exp = jwt_expiry(self.session.get("jwtToken"))
+        if exp is None:
+            return REFRESH_INTERVAL
+        return max(self.min_delay, exp - self.lead - time.time())
+
+    def refresh_once(self):
+        old_exp = jwt_expiry(self.session.get("jwtToken"))
+        side = self.connect()
+        fresh = dict(self.session)
+        apply_tokens(side, fresh)
+        with session_store.locked(SESSION_FILE):
+            ok, resp = attempt_refresh(side, fresh, save=False)
+            if not ok:
+                self.failures += 1
+                log.warning("Background token refresh failed (attempt %d): %s", self.failures, resp)
+                if not token_valid(self.session, margin=0):
+                    log.error("jwtToken has expired and could not be renewed; API calls will fail until a login.")
+                return False
+            with _client_lock:
+                apply_tokens(self.api, fresh)
+                self.session.update(fresh)
+            save_session(self.session)
+        exp = jwt_expiry(self.session.get("jwtToken"))
+        if old_exp is not None and exp is not None and exp <= old_exp:
+            self.failures += 1
+            log.warning("Background token refresh returned a jwtToken that does not extend exp (attempt %d).",
+                        self.failures)
+            return False
+        self.failures = 0
+        log.info("Background token refresh OK; jwtToken valid until %s.",
+                 time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(exp)) if exp else "unknown")
+        return True
+
+    def run(self):
+        exp = jwt_expiry(self.session.get("jwtToken"))
+        # already inside the lead window at start: renew now rather than after min_delay
+        delay = 0.0 if exp is not None and exp - self.lead <= time.time() else self.next_delay()
+        while not self._stop_event.wait(delay):
+            try:
+                self.refresh_once()
+            except Exception as e:
+                self.failures += 1
+                log.warning("Background token refresh raised: %s", e)
+            delay = self.next_delay()
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+
+_refresher = None
+
+
+def start_token_refresher(lead=REFRESH_LEAD):
+    """Start (once per process) the background refresher for the get_client() session."""
+    global _refresher
+    if _refresher is not None and _refresher.is_alive():
+        return _refresher
+    api, session = get_client()
+    if not session or not session.get("refreshToken"):
+        log.warning("No refreshToken in session.json; background token refresh not started.")
+        return None
+    _refresher = TokenRefresher(api, session, lead=lead)
+    _refresher.start()
+    return _refresher
+
+
+def stop_token_refresher():
+    global _refresher
+    if _refresher is not None:
+        _refresher.stop(timeout=5)
+        _refresher = None
+
+
 def ensure_session():
-    api_key = get_api_key()
-    if not api_key:
+    # the key is only needed to build the client; a cached one already has it
+    api_key = get_api_key() if _client is None else None
+    if _client is None and not api_key:
         log.error("API key required.")
         return False
 
-    api = SmartConnect(api_key=api_key)
-    session = load_session()
+    api, session = get_client(api_key)
 
     if session:
+        if token_valid(session):
+            log.info("Stored jwtToken valid until %s — skipping profile check. Client: %s",
+                     time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(jwt_expiry(session["jwtToken"]))),
+                     session.get("clientcode"))
+            return True
+
         log.info("Found existing session.json — checking profile with stored tokens.")
         ok, result = safe_get_profile(api, session)
         if ok:
@@ -219,6 +431,9 @@ def ensure_session():
         log.info("Attempting token refresh with refreshToken...")
         ok, result = attempt_refresh(api, session)
         if ok:
+            if token_valid(session):
+                log.info("Refresh succeeded. Client: %s", session.get("clientcode"))
+                return True
             log.info("Refresh succeeded. Verifying profile with refreshed token...")
             ok2, r2 = safe_get_profile(api, session)
             if ok2:
@@ -230,10 +445,18 @@ def ensure_session():
         else:
             log.warning("Refresh attempt failed: %s", result)
 
-    # fallback: manual login then immediate token exchange
-    log.info("Falling back to manual login and token exchange (generateSession -> generateToken).")
-    ok, result = do_manual_login_and_exchange(api)
+    # fallback: manual login then immediate token exchange. Under the session lock, so a
+    # second process starting at the same time waits and then reuses this login.
+    with session_store.locked(SESSION_FILE):
+        latest = load_session()
+        if token_valid(latest):
+            get_client(session=latest)
+            log.info("Another process logged in meanwhile; using its session. Client: %s", latest.get("clientcode"))
+            return True
+        log.info("Falling back to manual login and token exchange (generateSession -> generateToken).")
+        ok, result = do_manual_login_and_exchange(api)
     if ok:
+        get_client(session=result)
         log.info("Manual login + token exchange succeeded. Session stored.")
         return True
     else:
@@ -0,0 +1,248 @@
+# synth_market.py
+"""
+Seeded, vectorized synthetic market: regime-switching GBM 1-minute (or any
+bar size) OHLCV with an intraday U-shaped volatility / volume profile,
+overnight gaps and NSE session hours. Bars are produced with numpy array
+operations only (random draws, cumsum, exp) in cache-sized blocks; there is
+no per-bar Python loop. This runs at several million bars per second.
+
+Backs the mocks (mock_api /quote, the dashboards' simulate paths,
+trading_journal.make_mock_ohlc) and the benchmark fixtures (bench_indicators).
+
+    from synth_market import SyntheticMarket, generate_bars
+    df = generate_bars(1_000_000, seed=1)                         # datetime, open, high, low, close, volume
+    df = generate_bars(300, end=pd.Timestamp.now().floor("min"), session=False)  # 24x7 grid ending now
+    mkt = SyntheticMarket(start_price=25000, seed=7)
+    a = mkt.bars(375)          # one session ...
+    b = mkt.bars(375)          # ... and the next, continuing price, regime and time
+
+Model, per bar of `freq_seconds`:
+- regimes (REGIMES) set the annual drift and volatility; a regime lasts a
+  geometric number of bars (mean `mean_regime_bars`) and the next one is
+  drawn by `regime_weights`;
+- log return = (mu - sigma^2/2) dt + sigma sqrt(dt) Z, with sigma scaled by
+  the intraday profile (busier at the open and close);
+- with session=True bars sit on Mon-Fri 09:15-15:30 (no holiday calendar) and
+  the first bar of a day opens with an overnight gap; with session=False the
+  grid is continuous;
+- high / low extend past open / close by a half-normal share of the bar's
+  volatility; volume = base * profile * lognormal noise, higher on big moves;
+- prices are rounded to `tick`.
+"""
+from __future__ import annotations
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+SESSION_OPEN = 9 * 3600 + 15 * 60      # 09:15, seconds after midnight (exchange time)
+SESSION_SECONDS = 375 * 60             # 09:15-15:30
+TRADING_DAYS = 252
+EPOCH_DAY = np.datetime64("2000-01-03", "D")  # a Monday; session grid positions count from here
+
+# name -> (annual drift, annual volatility)
+REGIMES = {
+    "calm": (0.05, 0.08),
+    "trend_up": (0.60, 0.11),
+    "trend_down": (-0.60, 0.14),
+    "volatile": (0.0, 0.24),
+}
+REGIME_WEIGHTS = {"calm": 0.55, "trend_up": 0.15, "trend_down": 0.15, "volatile": 0.15}
+OHLCV = ["open", "high", "low", "close", "volume"]
+CHUNK = 1 << 16  # bars generated per block
+
+
+def intraday_profile(x: np.ndarray, depth: float) -> np.ndarray:
+    """U-shaped multiplier over the session (x in [0, 1)), averaging 1: 1 + depth * ((2x - 1)^2 - 1/3)."""
+    return 1.0 + depth * ((2.0 * x - 1.0) ** 2 - 1.0 / 3.0)
+
+
+class SyntheticMarket:
+    """
+    Stateful generator: each bars() / arrays() / closes() call continues from the
+    previous one (price, regime and grid position), so a mock can extend a series
+    as time advances. seed may be an int, None or a numpy Generator (shared).
+    """
+    def __init__(self, start_price: float = 25000.0, seed=None, freq_seconds: int = 60, session: bool = True,
+                 regimes: Optional[dict] = None, regime_weights: Optional[dict] = None,
+                 mean_regime_bars: float = 240.0, overnight_vol: float = 0.004, vol_profile: float = 0.9,
+                 base_volume: float = 5000.0, volume_profile: float = 2.4, tick: float = 0.05):
+        if session and SESSION_SECONDS % freq_seconds:
+            raise ValueError(f"freq_seconds={freq_seconds} does not divide the {SESSION_SECONDS}s session")
+        self.rng = np.random.default_rng(seed)
+        self.freq_seconds = int(freq_seconds)
+        self.session = bool(session)
+        regimes = regimes or REGIMES
+        weights = regime_weights or {k: REGIME_WEIGHTS.get(k, 1.0) for k in regimes}
+        self.regime_names = list(regimes)
+        self._mu = np.array([regimes[k][0] for k in self.regime_names], dtype=float)
+        self._sigma = np.array([regimes[k][1] for k in self.regime_names], dtype=float)
+        w = np.array([weights.get(k, 0.0) for k in self.regime_names], dtype=float)
+        self._weights = w / w.sum()
+        self.mean_regime_bars = float(mean_regime_bars)
+        self.overnight_vol = float(overnight_vol)
+        self.vol_profile = float(vol_profile)
+        self.base_volume = float(base_volume)
+        self.volume_profile = float(volume_profile)
+        self.tick = float(tick)
+
+        self.bars_per_session = SESSION_SECONDS // self.freq_seconds if self.session else 0
+        if self.session:
+            x = (np.arange(self.bars_per_session) + 0.5) / self.bars_per_session
+            self._vol_table = intraday_profile(x, self.vol_profile)
+            self._volume_table = intraday_profile(x, self.volume_profile)
+        self._tick_paise = round(self.tick * 100)
+        bars_per_year = TRADING_DAYS * self.bars_per_session if self.session else 365 * 86400 / self.freq_seconds
+        self._dt = 1.0 / bars_per_year
+
+        self.price = float(start_price)
+        self.pos: Optional[int] = None  # next grid position (None: start at "now" on first use)
+        self._regime = int(self.rng.choice(len(self._weights), p=self._weights))
+        self._regime_left = int(self.rng.geometric(1.0 / self.mean_regime_bars))
+
+    # ---- time grid ----
+    @staticmethod
+    def _wall_clock(ts) -> pd.Timestamp:
+        ts = pd.Timestamp(ts)
+        return ts.tz_convert("Asia/Kolkata").tz_localize(None) if ts.tzinfo is not None else ts
+
+    def floor_position(self, ts) -> int:
+        """Grid position of the last bar starting at or before ts (exchange time for aware ts)."""
+        ts = self._wall_clock(ts)
+        if not self.session:
+            return int(ts.value // (self.freq_seconds * 10**9))
+        day = np.datetime64(ts.date(), "D")
+        secs = (ts - ts.normalize()).total_seconds() - SESSION_OPEN
+        if np.is_busday(day) and secs >= 0:
+            slot = min(int(secs // self.freq_seconds), self.bars_per_session - 1)
+        else:  # before the open or on a weekend: the previous session's last bar
+            day = np.busday_offset(day, -1 if np.is_busday(day) else 0, roll="backward")
+            slot = self.bars_per_session - 1
+        return int(np.busday_count(EPOCH_DAY, day)) * self.bars_per_session + slot
+
+    def times(self, pos) -> np.ndarray:
+        """datetime64[ns] bar start times (exchange wall clock) for grid positions."""
+        pos = np.asarray(pos, dtype=np.int64)
+        if not self.session:
+            return (pos * (self.freq_seconds * 10**9)).view("datetime64[ns]")
+        day_idx = pos // self.bars_per_session
+        if day_idx.size == 0:
+            return day_idx.view("datetime64[ns]")
+        # calendar lookup once per trading day, then plain int64 nanosecond arithmetic per bar
+        first = int(day_idx.min())
+        days = np.busday_offset(EPOCH_DAY, np.arange(first, int(day_idx.max()) + 1), roll="forward")
+        day_ns = days.astype("datetime64[ns]").view(np.int64)
+        secs = SESSION_OPEN + (pos % self.bars_per_session) * self.freq_seconds
+        return (day_ns[day_idx - first] + secs * 10**9).view("datetime64[ns]")
+
+    def seek(self, start=None, end=None, n: int = 0) -> None:
+        """Place the next bar at the first grid time >= start, or so that n bars end at or before end."""
+        if start is not None:
+            pos = self.floor_position(start)
+            self.pos = pos if self.times(pos) == np.datetime64(self._wall_clock(start)) else pos + 1
+        elif end is not None:
+            self.pos = self.floor_position(end) - int(n) + 1
+
+    # ---- generation ----
+    def _regime_path(self, n: int) -> np.ndarray:
+        """Regime index per bar: geometric run lengths drawn in blocks, expanded with np.repeat."""
+        ids = [np.full(min(n, self._regime_left), self._regime, dtype=np.int8)]
+        filled = len(ids[0])
+        self._regime_left -= filled
+        while filled < n:
+            m = int((n - filled) / self.mean_regime_bars) + 8
+            runs = self.rng.geometric(1.0 / self.mean_regime_bars, size=m)
+            regs = self.rng.choice(len(self._weights), size=m, p=self._weights).astype(np.int8)
+            need = n - filled
+            ends = np.cumsum(runs)
+            k = int(np.searchsorted(ends, need))  # run that covers the last bar (or m if none)
+            k = min(k, m - 1)
+            block = np.repeat(regs[:k + 1], runs[:k + 1])[:need]
+            ids.append(block)
+            filled += len(block)
+            if filled >= n:
+                self._regime = int(regs[k])
+                self._regime_left = int(ends[k] - need)
+        return np.concatenate(ids) if len(ids) > 1 else ids[0]
+
+    def arrays(self, n: int, start=None, end=None) -> dict:
+        """
+        n bars as numpy arrays: datetime (datetime64[ns]), open, high, low, close, volume,
+        regime (index into regime_names) and session (trading-day ordinal; 0 when session=False).
+        """
+        n = int(n)
+        if start is not None or end is not None:
+            self.seek(start=start, end=end, n=n)
+        if self.pos is None:
+            self.seek(end=pd.Timestamp.now(), n=n)
+        pos = self.pos + np.arange(n, dtype=np.int64)
+        self.pos += n
+        out = {c: np.empty(n) for c in ("open", "high", "low", "close")}
+        out["volume"] = np.empty(n, dtype=np.int64)
+        out["regime"] = np.empty(n, dtype=np.int8)
+        # cache-sized blocks: the temporaries are reused instead of touching fresh memory per array
+        for i in range(0, n, CHUNK):
+            self._fill(pos[i:i + CHUNK], {c: a[i:i + CHUNK] for c, a in out.items()})
+        out["datetime"] = self.times(pos)
+        out["session"] = pos // self.bars_per_session if self.session else np.zeros(n, dtype=np.int64)
+        return out
+
+    def _fill(self, pos: np.ndarray, out: dict) -> None:
+        """Generate len(pos) consecutive bars into the out views, continuing price and regime."""
+        n = len(pos)
+        rng = self.rng
+        regime = self._regime_path(n)
+        if self.session:
+            slot = pos % self.bars_per_session
+            vol_mult = self._vol_table[slot]  # per-slot profile tables, gathered per bar
+            vol_shape = self._volume_table[slot]
+            first_bar = np.flatnonzero(slot == 0)
+        else:
+            vol_mult = vol_shape = 1.0
+            first_bar = np.empty(0, dtype=np.int64)
+
+        sigma = self._sigma[regime] * vol_mult * np.sqrt(self._dt)
+        z = rng.standard_normal(n)
+        ret = (self._mu[regime] * self._dt - 0.5 * sigma ** 2) + sigma * z
+        step = ret.copy()
+        step[first_bar] += rng.standard_normal(len(first_bar)) * self.overnight_vol  # overnight gap
+
+        close = np.exp(np.log(self.price) + np.cumsum(step))
+        open_ = close * np.exp(-ret)  # previous close, moved by the gap on a day's first bar
+        wick = np.abs(rng.standard_normal((2, n))) * sigma * 0.6
+        high = np.maximum(open_, close) * np.exp(wick[0])
+        low = np.minimum(open_, close) * np.exp(-wick[1])
+        volume = self.base_volume * vol_shape * rng.lognormal(0.0, 0.35, n) * (1.0 + 0.5 * np.abs(z))
+        self.price = float(close[-1])
+
+        for name, values in (("open", open_), ("high", high), ("low", low), ("close", close)):
+            if self.tick > 0:
+                # whole ticks -> paise -> rupees (exact to 2 decimals, like round(x, 2))
+                np.divide(np.rint(values / self.tick) * self._tick_paise, 100.0, out=out[name])
+            else:
+                out[name][:] = values
+        np.maximum(volume, 1, out=volume)
+        out["volume"][:] = volume
+        out["regime"][:] = regime
+
+    def bars(self, n: int, start=None, end=None, tz: Optional[str] = None) -> pd.DataFrame:
+        """n bars as a DataFrame: datetime (naive exchange time, or localized to tz), open, high, low, close, volume."""
+        a = self.arrays(n, start=start, end=end)
+        t = pd.DatetimeIndex(a["datetime"])
+        if tz is not None:
+            t = t.tz_localize("Asia/Kolkata").tz_convert(tz) if self.session else t.tz_localize(tz)
+        return pd.DataFrame({"datetime": t, **{c: a[c] for c in OHLCV}})
+
+    def closes(self, n: int) -> np.ndarray:
+        """Just the close path for the next n bars (price-only feeds)."""
+        return self.arrays(n)["close"]
+
+
+def generate_bars(n: int, start=None, end=None, start_price: float = 25000.0, seed=None,
+                  freq_seconds: int = 60, session: bool = True, tz: Optional[str] = None, **params) -> pd.DataFrame:
+    """
+    n OHLCV bars from a fresh SyntheticMarket. With neither start nor end the bars end at
+    the current time. params go to SyntheticMarket (regimes, base_volume, tick, ...).
+    """
+    mkt = SyntheticMarket(start_price=start_price, seed=seed, freq_seconds=freq_seconds, session=session, **params)
+    return mkt.bars(n, start=start, end=end, tz=tz)
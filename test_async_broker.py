@@ -0,0 +1,166 @@
+# test_async_broker.py
+"""
+async_broker.HttpBroker against mock_api.py served in-process: a full
+snapshot returns every payload, and with per-request latency on the mock it
+takes about one round-trip rather than the sum of them. SmartApiBroker is
+exercised with a stub SmartConnect.
+Run with: python test_async_broker.py  (or pytest test_async_broker.py)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+import async_broker
+import mock_api
+
+SYMBOLS = ["NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY"]
+LATENCY_MS = 150
+
+
+def serve_mock():
+    server = make_server("127.0.0.1", 0, mock_api.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+async def timed_snapshot(base, use_aiohttp):
+    async with async_broker.HttpBroker(base, use_aiohttp=use_aiohttp) as broker:
+        t0 = time.perf_counter()
+        snap = await broker.snapshot(SYMBOLS, count=50)
+        return snap, time.perf_counter() - t0
+
+
+def test_snapshot_is_concurrent():
+    server, base = serve_mock()
+    old_latency = mock_api.MOCK_LATENCY_MS
+    mock_api.MOCK_LATENCY_MS = LATENCY_MS
+    try:
+        for use_aiohttp in (True, False):
+            snap, elapsed = asyncio.run(timed_snapshot(base, use_aiohttp))
+            assert set(snap["quotes"]) == set(SYMBOLS)
+            assert all(len(q["data"]) == 50 for q in snap["quotes"].values())
+            assert snap["holdings"]["data"] and snap["funds"]["data"]["net"] > 0
+            assert snap["order_book"]["status"] == "ok"
+            # 7 calls at LATENCY_MS each: sequential would be >= 7 * LATENCY_MS
+            assert elapsed < 3 * LATENCY_MS / 1000.0, (use_aiohttp, elapsed)
+    finally:
+        mock_api.MOCK_LATENCY_MS = old_latency
+        server.shutdown()
+
+
+def test_rate_limiter_spaces_calls():
+    async def run():
+        limiter = async_broker.RateLimiter(rate=20.0, burst=1)
+        t0 = time.perf_counter()
+        for _ in range(5):
+            await limiter.acquire()
+        return time.perf_counter() - t0
+
+    assert asyncio.run(run()) >= 4 / 20.0 * 0.9
+
+
+class StubSmartConnect:
+    """SmartConnect stand-in: blocking calls that sleep, record their arguments and may fail."""
+
+    def __init__(self, delay=0.05, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _call(self, name, *args):
+        with self._lock:
+            self.calls.append((name, args, time.perf_counter()))
+        time.sleep(self.delay)
+
+    def ltpData(self, exchange, tradingsymbol, symboltoken):
+        self._call("ltpData", exchange, tradingsymbol, symboltoken)
+        if tradingsymbol in self.fail:
+            raise ConnectionError(f"no quote for {tradingsymbol}")
+        return {"status": True, "data": {"exchange": exchange, "tradingsymbol": tradingsymbol,
+                                         "symboltoken": symboltoken, "ltp": 100.0}}
+
+    def holding(self):
+        self._call("holding")
+        return {"status": True, "data": [{"tradingsymbol": "NIFTYBEES", "quantity": 50}]}
+
+    def rmsLimit(self):
+        self._call("rmsLimit")
+        return {"status": True, "data": {"net": "100000.00"}}
+
+    def orderBook(self):
+        self._call("orderBook")
+        return {"status": True, "data": []}
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_smartapi_broker_with_stub():
+    symbols = [("NSE", f"SYM{i}-EQ", str(1000 + i)) for i in range(6)]
+    api = StubSmartConnect(fail={"SYM3-EQ"})
+    handler = ListHandler()
+    async_broker.log.addHandler(handler)
+
+    async def run():
+        async with async_broker.SmartApiBroker(api, rate_limits={"quote": 100.0}) as broker:
+            t0 = time.perf_counter()
+            snap = await broker.snapshot(symbols)
+            return snap, time.perf_counter() - t0
+
+    try:
+        snap, elapsed = asyncio.run(run())
+    finally:
+        async_broker.log.removeHandler(handler)
+    assert list(snap["quotes"]) == [s[1] for s in symbols]
+    assert snap["quotes"]["SYM3-EQ"] is None
+    assert snap["quotes"]["SYM0-EQ"]["data"]["symboltoken"] == "1000"
+    assert any("SYM3-EQ" in m and "no quote" in m for m in handler.messages), handler.messages
+    assert snap["holdings"]["data"][0]["quantity"] == 50
+    assert snap["funds"]["data"]["net"] == "100000.00" and snap["order_book"]["data"] == []
+    names = sorted(name for name, _, _ in api.calls)
+    assert names == ["holding", "ltpData", "ltpData", "ltpData", "ltpData", "ltpData", "ltpData",
+                     "orderBook", "rmsLimit"]
+    # 9 blocking calls of 50 ms on worker threads: about one call, not nine
+    assert elapsed < 4 * api.delay, elapsed
+
+
+def test_smartapi_broker_rate_limit():
+    symbols = [("NSE", f"SYM{i}-EQ", str(i)) for i in range(8)]
+    api = StubSmartConnect(delay=0.0)
+
+    async def run():
+        # 4 quotes/s with a burst of 4: the last 4 of 8 calls wait ~0.25 s each
+        async with async_broker.SmartApiBroker(api, rate_limits={"quote": 4.0}) as broker:
+            t0 = time.perf_counter()
+            quotes = await broker.quotes(symbols)
+            return quotes, time.perf_counter() - t0
+
+    quotes, elapsed = asyncio.run(run())
+    assert all(q is not None for q in quotes.values())
+    assert elapsed >= 4 / 4.0 * 0.9, elapsed
+    starts = sorted(t for _, _, t in api.calls)
+    assert starts[-1] - starts[3] >= 3 / 4.0 * 0.9
+
+
+def main():
+    print("\n=== async_broker vs mock_api ===\n")
+    test_snapshot_is_concurrent()
+    test_rate_limiter_spaces_calls()
+    test_smartapi_broker_with_stub()
+    test_smartapi_broker_rate_limit()
+    print("✅ Concurrent snapshot and rate limiting OK.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# test_backtest_engine.py
+"""
+Regression check: the vectorized backtest engine must produce exactly the same
+trades as the bar-by-bar loop on data/nifty_1min.cleaned.csv.
+Run with: python test_backtest_engine.py  (or pytest test_backtest_engine.py)
+"""
+
+import os
+import tempfile
+import time
+
+import backtest
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nifty_1min.cleaned.csv")
+
+
+def run_both(df, **kwargs):
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        loop_res, loop_sum, _ = backtest.run_backtest(df, out_dir=os.path.join(tmp, "loop"), engine="loop", **kwargs)
+        t1 = time.perf_counter()
+        vec_res, vec_sum, _ = backtest.run_backtest(df, out_dir=os.path.join(tmp, "vec"), engine="vectorized", **kwargs)
+        t2 = time.perf_counter()
+    return (loop_res, loop_sum, t1 - t0), (vec_res, vec_sum, t2 - t1)
+
+
+def test_vectorized_matches_loop():
+    df = backtest.read_csv_robust(DATA_PATH)
+    for params in ({}, {"tp": 0.0005, "sl": 0.0003, "vol_window": 5}):
+        (loop_res, loop_sum, _), (vec_res, vec_sum, _) = run_both(df, **params)
+        assert loop_res.to_dict("records") == vec_res.to_dict("records"), params
+        assert loop_sum == vec_sum, params
+
+
+def main():
+    print("\n=== Backtest engine regression (loop vs vectorized) ===\n")
+    df = backtest.read_csv_robust(DATA_PATH)
+    (loop_res, loop_sum, loop_t), (vec_res, vec_sum, vec_t) = run_both(df)
+    print(f"loop:       {loop_sum}  ({loop_t * 1000:.1f} ms)")
+    print(f"vectorized: {vec_sum}  ({vec_t * 1000:.1f} ms)")
+    if loop_res.to_dict("records") == vec_res.to_dict("records") and loop_sum == vec_sum:
+        print("\n✅ Trades match.")
+    else:
+        print("\n❌ Trades differ.")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# test_candle_store.py
+"""
+candle_store: 5m/15m/1h candles maintained incrementally (bar by bar, with the
+forming bar revised) equal a pandas resample of the full 1m history, for
+tz-aware and naive frames, and after the 1m history is trimmed.
+Run with: python test_candle_store.py  (or pytest test_candle_store.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+import backtest
+import candle_store as cs
+from test_backtest_engine import DATA_PATH
+
+AGG = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+RULES = {"5m": "5min", "15m": "15min", "1h": "1h"}
+
+
+def sample_bars(naive=False):
+    df = backtest.read_csv_robust(DATA_PATH)
+    df["volume"] = np.random.default_rng(7).integers(0, 5000, len(df)).astype(float)
+    df = df.set_index(df["datetime"].dt.tz_convert(backtest.IST))[cs.OHLCV]
+    if naive:
+        df.index = df.index.tz_localize(None)
+    df.index.name = "datetime"
+    return df
+
+
+def reference(bars, tf):
+    return bars.resample(RULES[tf]).agg(AGG).dropna(subset=["open"])
+
+
+def assert_same(got, ref, label):
+    assert np.array_equal(got.index, ref.index), label
+    assert np.allclose(got.to_numpy(), ref.to_numpy(), rtol=0, atol=1e-9), label
+
+
+def feed_incrementally(store, symbol, bars, chunk=7):
+    for i in range(0, len(bars), chunk):
+        part = bars.iloc[i:i + chunk]
+        # the newest bar first arrives half-formed, then again complete on the next poll
+        forming = part.iloc[[-1]].copy()
+        forming[["high", "low", "close", "volume"]] = forming[["open", "open", "open", "volume"]].to_numpy() * [1, 1, 1, 0.5]
+        store.update(symbol, pd.concat([part.iloc[:-1], forming]))
+        store.update(symbol, part)
+
+
+def test_incremental_matches_resample():
+    for naive in (False, True):
+        bars = sample_bars(naive)
+        store = cs.CandleStore()
+        feed_incrementally(store, "NIFTY", bars)
+        assert_same(store.get("NIFTY", "1m"), bars, "1m")
+        for tf in store.timeframes:
+            assert_same(store.get("NIFTY", tf), reference(bars, tf), f"{tf} naive={naive}")
+        assert len(store.get("NIFTY", "5m", 10)) == 10
+
+
+def test_trimmed_history_and_price_only_input():
+    bars = sample_bars()
+    store = cs.CandleStore(max_minutes=500)
+    feed_incrementally(store, "NIFTY", bars, chunk=50)
+    kept = store.get("NIFTY", "1m")
+    assert len(kept) == 500 and kept.index[-1] == bars.index[-1]
+    for tf in store.timeframes:
+        ref = reference(kept, tf)
+        got = store.get("NIFTY", tf)
+        # candles wholly inside the kept window agree; at most the oldest one differs (partial)
+        assert_same(got.iloc[1:], ref.iloc[1:], tf)
+
+    # mock_api shape: datetime + price only
+    prices = pd.DataFrame({"datetime": bars.index[:30].tz_localize(None), "price": bars["close"].iloc[:30].to_numpy()})
+    store.update("BANK", prices)
+    five = store.get("BANK", "5m")
+    assert (five["volume"] == 0).all() and five["close"].iloc[0] == prices["price"].iloc[4]
+    assert store.get("NOPE", "15m").empty
+    assert store.minutes_for(120) == 500  # capped at what the store keeps
+
+
+def test_updates_append_in_place():
+    bars = sample_bars()
+    store = cs.CandleStore(max_minutes=600)
+    store.update("NIFTY", bars.iloc[:600])
+    held = store._bars["NIFTY"]
+    buffers = set()
+    for i in range(600, len(bars)):
+        store.update("NIFTY", bars.iloc[i - 1:i + 1])  # previous bar again + one new bar
+        buffers.add(id(held.t))
+        if i < 900:
+            # room left in the preallocated buffer: trimming only moves an offset
+            assert len(buffers) == 1 and held.hi == i + 1
+    # the tail wraps back to the front a few times; the buffer grows once at most
+    assert len(buffers) <= 2
+    assert store.update("NIFTY", bars.iloc[-5:-1]) == 0  # nothing newer than what is held
+    assert store.rows("NIFTY") == 600 and store.last_time("NIFTY") == bars.index[-1]
+    kept = store.get("NIFTY", "1m")
+    assert_same(kept, bars.iloc[-600:], "1m")
+    for tf in store.timeframes:
+        got = store.get("NIFTY", tf)
+        assert store.rows("NIFTY", tf) == len(got)
+        assert_same(got.iloc[1:], reference(kept, tf).iloc[1:], tf)
+    # frames handed out are copies
+    kept.iloc[-1, 0] = -1.0
+    assert store.get("NIFTY", "1m", 1)["open"].iloc[0] != -1.0
+
+
+def test_derive_ohlcv_from_prices():
+    bars = sample_bars()
+    prices = pd.DataFrame({"datetime": bars.index[:30].tz_localize(None), "price": bars["close"].iloc[:30].to_numpy()})
+    df = cs.derive_ohlcv(prices)
+    close = prices["price"]
+    assert df["open"].iloc[0] == close.iloc[0] and (df["open"].iloc[1:].to_numpy() == close.iloc[:-1].to_numpy()).all()
+    assert (df["high"] > df[["open", "close"]].max(axis=1)).all()
+    assert (df["low"] < df[["open", "close"]].min(axis=1)).all()
+    assert (df["volume"] >= 200).all() and "price" in df.columns
+    # columns the source has are left alone
+    assert cs.derive_ohlcv(bars.iloc[:5]).equals(bars.iloc[:5])
+
+    store = cs.CandleStore()
+    store.update("NIFTY", df)
+    one = store.get("NIFTY", "1m")
+    assert (one["high"] > one["low"]).all() and (one["volume"] > 0).all()
+
+
+def main():
+    print("\n=== candle_store ===\n")
+    test_incremental_matches_resample()
+    test_trimmed_history_and_price_only_input()
+    test_updates_append_in_place()
+    test_derive_ohlcv_from_prices()
+    print("✅ Incremental candles match pandas resample.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# test_chart_reduce.py
+"""
+chart_reduce: OHLC groups keep the exact extremes, LTTB matches the reference
+algorithm, narrowing the visible range returns full-resolution candles, and the
+journal chart of a multi-month 1-minute history stays at the pixel budget.
+Run with: python test_chart_reduce.py  (or pytest test_chart_reduce.py)
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import chart_reduce as cr
+
+HERE = Path(__file__).parent.resolve()
+
+
+def minute_candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 25000 + rng.normal(0, 4, n).cumsum()
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 2, (2, n)))
+    return pd.DataFrame({
+        "time": pd.date_range("2025-06-02 09:15", periods=n, freq="min"),
+        "open": open_,
+        "high": np.maximum(open_, close) + spread[0],
+        "low": np.minimum(open_, close) - spread[1],
+        "close": close,
+        "volume": rng.integers(100, 1000, n).astype(float),
+    })
+
+
+def lttb_reference(x, y, n_out):
+    """Textbook LTTB (per-bucket means), for comparison."""
+    n = len(y)
+    every = (n - 2) / (n_out - 2)
+    a, out = 0, [0]
+    for i in range(n_out - 2):
+        lo, hi = int(np.floor(i * every)) + 1, int(np.floor((i + 1) * every)) + 1
+        nlo, nhi = hi, min(int(np.floor((i + 2) * every)) + 1, n)
+        ax, ay = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - ax) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (ay - y[a]))
+        a = lo + int(np.argmax(area))
+        out.append(a)
+    return np.array(out + [n - 1])
+
+
+def test_lttb_matches_reference():
+    rng = np.random.default_rng(1)
+    for n, n_out in ((1000, 100), (10007, 333), (50, 10), (100, 98)):
+        x = np.arange(n, dtype=float)
+        y = rng.normal(size=n).cumsum()
+        assert np.array_equal(cr.lttb_indices(x, y, n_out), lttb_reference(x, y, n_out)), (n, n_out)
+    assert np.array_equal(cr.lttb_indices(np.arange(5.0), np.ones(5), 10), np.arange(5))
+
+
+def test_reduce_ohlc_keeps_extremes():
+    df = minute_candles(10_001)
+    view = cr.reduce_ohlc(df, 300, time_col="time")
+    k = cr.group_size(len(df), 300)
+    assert len(view) <= 300 and len(view) == -(-len(df) // k)
+    assert view["high"].max() == df["high"].max() and view["low"].min() == df["low"].min()
+    assert view["open"].iloc[0] == df["open"].iloc[0] and view["close"].iloc[-1] == df["close"].iloc[-1]
+    assert view["volume"].sum() == df["volume"].sum()
+    assert view["time"].iloc[1] == df["time"].iloc[k]
+
+    # datetime-index frames (trading_dashboard_backup) work the same way
+    indexed = cr.reduce_ohlc(df.set_index("time"), 300)
+    assert np.array_equal(indexed.index, view["time"]) and np.allclose(indexed["high"], view["high"])
+
+
+def test_zoom_requeries_at_full_resolution():
+    df = minute_candles(90 * 1440)  # three months of 1-minute candles
+    df["ema9"] = df["close"].ewm(span=9, adjust=False).mean()
+    view, lines = cr.chart_data(df, width_px=1200, overlays=("ema9",), time_col="time")
+    assert len(view) <= 300 and len(lines["ema9"]) == 600
+
+    t0 = df["time"].iloc[5000]
+    zoomed, zlines = cr.chart_data(df, width_px=1200, x_range=(t0, t0 + pd.Timedelta(minutes=199)),
+                                   overlays=("ema9",), time_col="time")
+    raw = df.iloc[5000:5200]
+    assert len(zoomed) == 200 and zoomed.equals(raw[zoomed.columns])
+    assert np.array_equal(zlines["ema9"].to_numpy(), raw["ema9"].to_numpy())
+
+
+def test_journal_chart_payload_is_bounded():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(HERE / "trading_journal.py"), default_timeout=120)
+    at.run()
+    at.number_input[0].set_value(20000)
+    at.number_input[1].set_value(1)
+    at.run()
+    assert not at.exception
+    fig = json.loads(at.get("plotly_chart")[0].proto.spec)
+    candles = [t for t in fig["data"] if t["type"] == "candlestick"][0]
+    assert len(candles["x"]) <= cr.CHART_WIDTH_PX // cr.PX_PER_CANDLE
+
+
+def main():
+    print("\n=== chart_reduce ===\n")
+    test_lttb_matches_reference()
+    test_reduce_ohlc_keeps_extremes()
+    test_zoom_requeries_at_full_resolution()
+    test_journal_chart_payload_is_bounded()
+    print("✅ Chart reduction checks passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# test_dashboard_cache.py
+"""
+dashboard_cache: CSV reads are served from cache until the file changes on disk,
+cache keys roll over with the candle, and the cached IndicatorCache gives the
+same values as a one-pass IndicatorState over the whole series. Also reruns the
+mock dashboard with streamlit's AppTest to check reruns hit the cache.
+Run with: python test_dashboard_cache.py  (or pytest test_dashboard_cache.py)
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import backtest
+import dashboard_cache as dc
+from indicators import IndicatorState
+from test_backtest_engine import DATA_PATH
+
+HERE = Path(__file__).parent.resolve()
+
+
+def test_read_csv_invalidates_on_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "journal.csv"
+        pd.DataFrame({"pnl": [1.0, 2.0]}).to_csv(path, index=False)
+        first = dc.read_csv(path)
+        first["pnl"] = 0.0  # callers get copies; the cached frame is untouched
+        assert dc.read_csv(path)["pnl"].tolist() == [1.0, 2.0]
+        pd.DataFrame({"pnl": [1.0, 2.0, 3.0]}).to_csv(path, index=False)
+        assert dc.read_csv(path)["pnl"].tolist() == [1.0, 2.0, 3.0]
+        os.remove(path)
+        try:
+            dc.read_csv(path)
+            assert False, "missing file must raise"
+        except FileNotFoundError:
+            pass
+
+
+def test_candle_bucket():
+    t = 1_700_000_000.0
+    assert dc.candle_bucket("5m", t) == dc.candle_bucket("5m", t - t % 300 + 299.9)
+    assert dc.candle_bucket("5m", t - t % 300 + 300) == dc.candle_bucket("5m", t) + 1
+    assert dc.ttl_for("15m") == 900 and dc.candle_seconds(120) == 120
+
+
+def one_pass(df):
+    state = IndicatorState()
+    return pd.DataFrame([state.update(bar) for bar in df.to_dict("records")], index=df.index)
+
+
+def test_indicator_cache_matches_one_pass():
+    df = backtest.read_csv_robust(DATA_PATH).set_index("datetime")[["open", "high", "low", "close", "volume"]]
+    df["volume"] = np.random.default_rng(3).integers(0, 5000, len(df)).astype(float)
+    expected = one_pass(df)
+
+    cache = dc.IndicatorCache()
+    window = 120
+    for end in range(window, len(df) + 1, 17):
+        got = cache.frame(df.iloc[end - window:end])
+        if end == window:
+            assert np.allclose(got.to_numpy(), expected.iloc[:window].to_numpy(), equal_nan=True)
+    got = cache.frame(df.iloc[-window:])
+    # folded bar by bar from the first window onwards: identical to one pass over the whole series
+    assert np.allclose(got.to_numpy(), expected.iloc[-window:].to_numpy(), rtol=0, atol=1e-9)
+
+    # a different series (e.g. resimulated data) restarts the state
+    shifted = df.iloc[-window:].copy()
+    shifted["close"] += 100.0
+    restarted = cache.frame(shifted)
+    assert np.allclose(restarted.to_numpy(), one_pass(shifted).to_numpy(), equal_nan=True)
+
+
+def test_dashboard_rerun_uses_cache():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(HERE / "trading_dashboard.py"), default_timeout=60)
+    t0 = time.perf_counter()
+    at.run()  # simulated 1m history for every timeframe + indicators
+    cold = time.perf_counter() - t0
+    assert not at.exception
+    t0 = time.perf_counter()
+    at.run()  # a widget interaction within the same minute
+    warm = time.perf_counter() - t0
+    assert not at.exception
+    assert warm < cold
+
+
+def main():
+    print("\n=== dashboard_cache ===\n")
+    test_read_csv_invalidates_on_change()
+    test_candle_bucket()
+    test_indicator_cache_matches_one_pass()
+    test_dashboard_rerun_uses_cache()
+    print("✅ Dashboard cache checks passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# test_data_store.py
+"""
+Offline checks for data_store: cache hits and misses, invalidation when the
+source CSV changes (mtime, size, content), refresh=True, same-named files in
+different folders, and the plain-CSV fallback without pyarrow.
+Run with: python test_data_store.py  (or pytest test_data_store.py)
+"""
+
+import os
+import tempfile
+
+import backtest
+import data_store
+
+HEADER = "datetime,open,high,low,close,volume\n"
+
+
+def write_csv(path, closes):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        for i, c in enumerate(closes):
+            f.write(f"2025-09-01 09:{15 + i:02d}:00,{c},{c + 1},{c - 1},{c},{100 + i}\n")
+
+
+class CountingReader:
+    """Wraps backtest.read_csv_robust to count how often the CSV is actually parsed."""
+
+    def __init__(self):
+        self.calls = 0
+        self.real = backtest.read_csv_robust
+
+    def __call__(self, path):
+        self.calls += 1
+        return self.real(path)
+
+    def __enter__(self):
+        backtest.read_csv_robust = self
+        return self
+
+    def __exit__(self, *exc):
+        backtest.read_csv_robust = self.real
+
+
+def test_hit_miss_and_invalidation():
+    with tempfile.TemporaryDirectory() as tmp, CountingReader() as reader:
+        cache = os.path.join(tmp, "cache")
+        path = os.path.join(tmp, "bars.csv")
+        write_csv(path, [100.0, 101.0, 102.0])
+
+        first = data_store.load_ohlcv(path, cache_dir=cache)
+        assert reader.calls == 1 and len(first) == 3
+        again = data_store.load_ohlcv(path, cache_dir=cache)
+        assert reader.calls == 1 and again.equals(first)
+
+        # touched but identical: the hash still matches, cache kept
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+        data_store.load_ohlcv(path, cache_dir=cache)
+        assert reader.calls == 1
+
+        # same size, different bytes, new mtime: sha1 differs
+        write_csv(path, [100.0, 101.0, 109.0])
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+        df = data_store.load_ohlcv(path, cache_dir=cache)
+        assert reader.calls == 2 and df["close"].iloc[-1] == 109.0
+
+        # new size
+        write_csv(path, [100.0, 101.0, 109.0, 110.0])
+        df = data_store.load_ohlcv(path, cache_dir=cache)
+        assert reader.calls == 3 and len(df) == 4
+        assert data_store.load_ohlcv(path, cache_dir=cache).equals(df) and reader.calls == 3
+
+        # refresh=True always re-parses
+        data_store.load_ohlcv(path, cache_dir=cache, refresh=True)
+        assert reader.calls == 4
+        assert not [n for n in os.listdir(cache) if n.endswith(".tmp")]
+
+
+def test_same_name_in_different_folders():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, "cache")
+        a = os.path.join(tmp, "a", "NIFTY.csv")
+        b = os.path.join(tmp, "b", "NIFTY.csv")
+        os.makedirs(os.path.dirname(a))
+        os.makedirs(os.path.dirname(b))
+        write_csv(a, [100.0, 101.0])
+        write_csv(b, [200.0, 201.0, 202.0])
+        assert data_store.cache_key(a) != data_store.cache_key(b)
+        assert data_store.cache_key(a).startswith("NIFTY-")
+        assert len(data_store.load_ohlcv(a, cache_dir=cache)) == 2
+        assert len(data_store.load_ohlcv(b, cache_dir=cache)) == 3
+        with CountingReader() as reader:
+            assert data_store.load_ohlcv(a, cache_dir=cache)["close"].iloc[0] == 100.0
+            assert data_store.load_ohlcv(b, cache_dir=cache)["close"].iloc[0] == 200.0
+            assert reader.calls == 0
+
+
+def test_without_pyarrow_parses_csv():
+    saved = data_store.feather
+    data_store.feather = None
+    try:
+        with tempfile.TemporaryDirectory() as tmp, CountingReader() as reader:
+            cache = os.path.join(tmp, "cache")
+            path = os.path.join(tmp, "bars.csv")
+            write_csv(path, [100.0, 101.0])
+            assert len(data_store.load_ohlcv(path, cache_dir=cache)) == 2
+            assert len(data_store.load_ohlcv(path, cache_dir=cache)) == 2
+            assert reader.calls == 2
+            assert not os.path.exists(cache)
+    finally:
+        data_store.feather = saved
+
+
+def main():
+    print("\n=== data_store ===\n")
+    test_hit_miss_and_invalidation()
+    test_same_name_in_different_folders()
+    test_without_pyarrow_parses_csv()
+    print("✅ OHLCV cache hits, invalidation and fallback OK.")
+
+
+if __name__ == "__main__":
+    main()
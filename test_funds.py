@@ -4,20 +4,12 @@ Test SmartAPI session by fetching funds (safe read-only call).
 Uses session.json created by smartapi_session_manager.py.
 """
 
-import os, json
-from SmartApi.smartConnect import SmartConnect
+import os
+from smartapi_session_manager import get_client
 
 def main():
     print("\n=== Test Funds Fetch ===\n")
 
-    # Load session
-    try:
-        with open("session.json", "r") as f:
-            session = json.load(f)
-    except Exception as e:
-        print("❌ Could not read session.json:", e)
-        return
-
     api_key = os.environ.get("SMARTAPI_KEY")
     if not api_key:
         print("❌ SMARTAPI_KEY not set. Run:")
@@ -25,10 +17,10 @@ def main():
         return
 
     try:
-        api = SmartConnect(api_key=api_key)
-        api.setAccessToken(session["jwtToken"])
-        api.setRefreshToken(session["refreshToken"])
-        api.setFeedToken(session["feedToken"])
+        api, session = get_client(api_key)
+        if not session:
+            print("❌ Could not read session.json")
+            return
 
         funds = api.getFunds()
     except Exception as e:
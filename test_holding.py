@@ -5,20 +5,11 @@ Uses session.json created by smartapi_session_manager.py.
 """
 
 import os
-import json
-from SmartApi.smartConnect import SmartConnect
+from smartapi_session_manager import get_client
 
 def main():
     print("\n=== Test Holdings Fetch ===\n")
 
-    # Load session
-    try:
-        with open("session.json", "r") as f:
-            session = json.load(f)
-    except Exception as e:
-        print("❌ Could not read session.json:", e)
-        return
-
     api_key = os.environ.get("SMARTAPI_KEY")
     if not api_key:
         print("❌ SMARTAPI_KEY not set. Run:")
@@ -26,9 +17,10 @@ def main():
         return
 
     try:
-        api = SmartConnect(api_key=api_key)
-        api.setAccessToken(session["jwtToken"])
-        api.setRefreshToken(session["refreshToken"])
+        api, session = get_client(api_key)
+        if not session:
+            print("❌ Could not read session.json")
+            return
         # call holdings
         holdings_resp = api.holding()
     except Exception as e:
@@ -0,0 +1,74 @@
+# test_http_client.py
+"""
+trading_bot_patched's login -> quote -> order sequence through http_client
+reuses one keep-alive connection to the backend.
+
+Werkzeug's dev server (app.run) sends "Connection: close" on every response,
+so the mock app is served here through a small HTTP/1.1 handler that keeps
+connections open, like a production server or the real broker would.
+Run with: python test_http_client.py  (or pytest test_http_client.py)
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import http_client
+import mock_api
+import trading_bot_patched as bot
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = []
+    flask_client = mock_api.app.test_client()
+
+    def setup(self):
+        super().setup()
+        KeepAliveHandler.connections.append(self.client_address)
+
+    def _proxy(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        resp = self.flask_client.open(self.path, method=self.command, data=body,
+                                      headers={"Content-Type": self.headers.get("Content-Type", "")})
+        data = resp.get_data()
+        self.send_response(resp.status_code)
+        self.send_header("Content-Type", resp.content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = _proxy
+
+    def log_message(self, *args):
+        pass
+
+
+def test_calls_share_one_connection():
+    KeepAliveHandler.connections = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    old_base = bot.API_BASE
+    bot.API_BASE = f"http://127.0.0.1:{server.server_port}"
+    http_client.close_session()
+    try:
+        assert bot.login()["status"] == "ok"
+        for _ in range(3):
+            assert len(bot.get_quote("NIFTY", 20)["data"]) == 20
+        assert bot.place_order({"symbol": "NIFTY", "qty": 1})["status"] == "ok"
+        assert len(KeepAliveHandler.connections) == 1, KeepAliveHandler.connections
+    finally:
+        bot.API_BASE = old_base
+        http_client.close_session()
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    print("\n=== http_client keep-alive ===\n")
+    test_calls_share_one_connection()
+    print("✅ One pooled connection served every call.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# test_indicator_state.py
+"""
+Check that the streaming IndicatorState reproduces backtest.add_indicators
+exactly, one candle at a time.
+Run with: python test_indicator_state.py  (or pytest test_indicator_state.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+import backtest
+from indicators import IndicatorState
+from test_backtest_engine import DATA_PATH
+
+COLUMNS = ["ema9", "ema21", "rsi14", "vwap", "vol_avg_20"]
+
+
+def streamed(df):
+    state = IndicatorState()
+    rows = [state.update(bar) for bar in df[["high", "low", "close", "volume"]].to_dict("records")]
+    return pd.DataFrame(rows, index=df.index)
+
+
+def test_streaming_matches_batch():
+    df = backtest.read_csv_robust(DATA_PATH)
+    rng = np.random.default_rng(7)
+    # the sample file has zero volume; also check with real-looking volume for VWAP / vol_avg
+    for volume in (df["volume"].to_numpy(), rng.integers(0, 5000, len(df)).astype(float)):
+        d = df.assign(volume=volume)
+        batch = backtest.add_indicators(d)
+        stream = streamed(d)
+        for col in COLUMNS:
+            assert np.array_equal(batch[col].to_numpy(), stream[col].to_numpy()), col
+
+
+def test_from_frame_continues_like_batch():
+    df = backtest.read_csv_robust(DATA_PATH)
+    state = IndicatorState.from_frame(df.iloc[:-1])
+    last = state.update(df.iloc[-1])
+    batch = backtest.add_indicators(df).iloc[-1]
+    assert all(last[col] == batch[col] for col in COLUMNS)
+
+
+def test_session_vwap_resets_per_ist_date():
+    df = backtest.read_csv_robust(DATA_PATH)
+    df["volume"] = np.random.default_rng(3).integers(0, 500, len(df)).astype(float)
+    batch = backtest.add_indicators(df, session_vwap=True)
+
+    # reference: plain pandas groupby on the IST date
+    day = df["datetime"].dt.tz_convert("Asia/Kolkata").dt.date
+    typ_vol = (df["high"] + df["low"] + df["close"]) / 3.0 * df["volume"]
+    ref = (typ_vol.groupby(day).cumsum() / df["volume"].groupby(day).cumsum()).groupby(day).ffill().fillna(df["close"])
+    assert np.array_equal(batch["vwap"].to_numpy(), ref.to_numpy())
+
+    state = IndicatorState(session_vwap=True)
+    stream = [state.update(bar)["vwap"] for bar in df.to_dict("records")]
+    assert np.array_equal(batch["vwap"].to_numpy(), np.array(stream))
+
+
+def main():
+    print("\n=== IndicatorState vs add_indicators ===\n")
+    test_streaming_matches_batch()
+    test_from_frame_continues_like_batch()
+    test_session_vwap_resets_per_ist_date()
+    print("✅ Streaming indicators match the batch version.")
+
+
+if __name__ == "__main__":
+    main()
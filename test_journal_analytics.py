@@ -0,0 +1,69 @@
+# test_journal_analytics.py
+"""
+journal_analytics: the cumsum balance and groupby daily summary equal the
+iterrows / per-day loops they replace (bench_journal.rollups_rowwise), and the
+weekly / monthly rollups chain their start and end balances consistently.
+Run with: python test_journal_analytics.py  (or pytest test_journal_analytics.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+import journal_analytics as ja
+from bench_journal import journal_frame, make_trades, rollups_rowwise
+
+
+def test_rollups_match_rowwise():
+    df = journal_frame(make_trades(3000, seed=9))
+    expected_balance, expected_daily = rollups_rowwise(df, 250000.0)
+    balance = ja.cumulative_balance(df, 250000.0)
+    assert balance.equals(expected_balance)
+    df["cumulative_balance"] = balance
+    pd.testing.assert_frame_equal(ja.daily_summary(df, 250000.0), expected_daily)
+
+
+def test_weekly_monthly_chain():
+    df = journal_frame(make_trades(5000, seed=2))
+    df["cumulative_balance"] = ja.cumulative_balance(df, 100000.0)
+    closed = df[df["exit_time_parsed"].notna()]
+    local = closed["exit_time_parsed"].dt.tz_convert("Asia/Kolkata")
+    for freq, key, labels in (("W", "week", (local.dt.normalize() - pd.to_timedelta(local.dt.weekday, unit="D")).dt.date),
+                              ("M", "month", local.dt.strftime("%Y-%m"))):
+        summary = ja.period_summary(df, freq, 100000.0)
+        assert summary[key].tolist() == sorted(set(labels))
+        assert summary["trades"].sum() == len(closed)
+        assert summary["wins"].sum() == int((closed["pnl"] > 0).sum())
+        assert np.allclose(summary[f"{ja.PERIODS[freq][1]}_pnl"].sum(), closed["pnl"].sum(), atol=0.01 * len(summary))
+        assert summary["start_balance"].iloc[0] == 100000.0
+        assert (summary["start_balance"].iloc[1:].to_numpy() == summary["end_balance"].iloc[:-1].to_numpy()).all()
+        assert summary["end_balance"].iloc[-1] == round(df["cumulative_balance"].iloc[-1], 2)
+
+    rng = ja.balance_range(df, 100000.0)
+    assert rng["end_balance"] == df["cumulative_balance"].iloc[-1]
+    assert rng["peak_balance"] >= max(rng["start_balance"], rng["end_balance"]) and rng["max_drawdown"] >= 0
+
+
+def test_empty_and_quick_stats():
+    df = journal_frame(make_trades(50, seed=1))
+    df["cumulative_balance"] = ja.cumulative_balance(df, 0.0)
+    stats = ja.quick_stats(df)
+    closed = df[df["exit_time_parsed"].notna()]
+    assert stats["num_realized"] == len(closed)
+    assert np.isclose(stats["total_realized"], df["pnl"].sum())
+    open_only = df[df["exit_time_parsed"].isna()]
+    assert list(ja.period_summary(open_only, "D").columns)[:3] == ["date", "start_balance", "end_balance"]
+    assert ja.period_summary(open_only, "M").empty
+    summary = ja.period_summary(df, "D", 0.0)
+    assert summary["daily_pct"].isna().iloc[0]  # start balance 0: % undefined
+
+
+def main():
+    print("\n=== journal_analytics ===\n")
+    test_rollups_match_rowwise()
+    test_weekly_monthly_chain()
+    test_empty_and_quick_stats()
+    print("✅ Journal rollups match the row-wise loops.")
+
+
+if __name__ == "__main__":
+    main()
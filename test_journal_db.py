@@ -0,0 +1,129 @@
+# test_journal_db.py
+"""
+journal_db: inserts, upserts for exits and notes, date-range / symbol / status
+queries, and an idempotent import of the existing CSV journal layouts.
+Run with: python test_journal_db.py  (or pytest test_journal_db.py)
+"""
+
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+import pytz
+
+from bench_journal import make_trades
+from journal_db import JournalDB
+from journal_enrich import enrich_trades
+
+
+def test_insert_upsert_query():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = JournalDB(os.path.join(tmp, "journal.db"))
+        tid = db.insert({"symbol": "NIFTY", "qty": 75, "side": "BUY", "entry_price": 120.5,
+                         "entry_time": "2025-09-01 09:20:00", "exit_time": ""})
+        assert db.get(tid)["quantity"] == 75.0 and db.get(tid)["exit_time"] is None
+        try:
+            db.insert({"trade_id": tid, "symbol": "NIFTY"})
+            raise AssertionError("duplicate trade_id accepted")
+        except sqlite3.IntegrityError:
+            pass
+
+        aware = pytz.utc.localize(datetime(2025, 9, 1, 4, 0))  # 09:30 in Kolkata
+        assert db.close_trade(tid, exit_price=131.0, exit_time=aware)
+        assert db.set_notes(tid, "breakout")
+        assert not db.set_notes("missing", "x")
+        row = db.get(tid)
+        assert (row["exit_price"], row["exit_time"], row["notes"], row["entry_price"]) == \
+            (131.0, "2025-09-01 09:30:00", "breakout", 120.5)
+
+        db.upsert({"trade_id": "B-1", "symbol": "BANKNIFTY", "entry_time": "2025-09-02 10:00:00", "entry_price": 10})
+        db.upsert({"trade_id": "B-1", "fees": 5})  # only fees changes
+        assert db.get("B-1")["entry_price"] == 10.0 and db.get("B-1")["fees"] == 5.0
+        db.upsert({"trade_id": "B-2", "symbol": "BANKNIFTY", "entry_time": "2025-09-03 15:29:59"})
+        assert db.count() == 3
+
+        assert db.query(start="2025-09-02", end="2025-09-03")["trade_id"].tolist() == ["B-1"]
+        assert db.query(start="2025-09-02")["trade_id"].tolist() == ["B-1", "B-2"]
+        assert db.query(symbol="BANKNIFTY", status="open")["trade_id"].tolist() == ["B-1", "B-2"]
+        assert db.query(status="closed")["trade_id"].tolist() == [tid]
+        assert db.query(start="2025-09-01 09:30:00", end="2025-09-01 09:31", on="exit_time")["trade_id"].tolist() == [tid]
+        assert db.query(limit=2)["trade_id"].tolist() == ["B-1", "B-2"]
+        db.close()
+
+
+def test_import_existing_layouts():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = JournalDB(os.path.join(tmp, "journal.db"))
+        layouts = {
+            "trades.csv": ("trade_id,symbol,quantity,lot_size,entry_price,exit_price,entry_time,exit_time,fees,notes\n"
+                           "MOCK-1,NIFTY,1,1,25040.0,,2025-09-11 13:20:58,,0.0,auto-recorded (success)\n"),
+            "journal.csv": ("entry_time,exit_time,symbol,qty,side,entry_price,exit_price,pnl,notes\n"
+                            ",,NIFTY,75,BUY,,,0.0,\n2025-09-09 11:48:44,,NIFTY,75,BUY,,,0.0,\n"),
+            "data_trades.csv": ("date,symbol,type,entry_time,entry_price,exit_time,exit_price,qty,pnl,cumulative_balance,notes\n"
+                                "2025-09-07,NIFTY,CE,09:21,152.5,09:47,178.2,75,1927.5,1927.5,test trade\n"),
+            "trades_journal.csv": ("entry_time,entry_price,exit_time,exit_price,direction,pnl,pnl_percent,entry_reason,exit_reason\n"
+                                   "2025-09-04 03:46:00+00:00,24876.9,2025-09-04 03:47:00+00:00,24866.8,LONG,-10.1,-0.0004,EMA_CROSS_UP,EMA_CROSS_DOWN\n"),
+        }
+        for name, text in layouts.items():
+            path = os.path.join(tmp, name)
+            with open(path, "w", encoding="utf-8-sig") as f:
+                f.write(text)
+            db.import_csv(path, source=name)
+            db.import_csv(path, source=name)  # re-import updates, never duplicates
+        assert db.count() == 5
+
+        assert db.get("MOCK-1")["notes"] == "auto-recorded (success)"
+        first = db.get("journal.csv#1")
+        assert first["entry_time"] is None and first["quantity"] == 75.0 and first["side"] == "BUY"
+        day = db.get("data_trades.csv#1")
+        assert (day["entry_time"], day["exit_time"], day["quantity"]) == ("2025-09-07 09:21:00", "2025-09-07 09:47:00", 75.0)
+        assert '"type": "CE"' in day["extra"]
+        utc = db.get("trades_journal.csv#1")
+        assert (utc["entry_time"], utc["side"]) == ("2025-09-04 09:16:00", "LONG")
+        assert "EMA_CROSS_UP" in utc["extra"]
+        db.close()
+
+
+def test_import_unparseable_times():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "journal.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("trade_id,symbol,entry_time,exit_time,entry_price\n"
+                    "T1,NIFTY,2025-09-01 09:17:00,pending,10\n"
+                    "T2,NIFTY,N/A,2025-09-01 10:00:00,11\n")
+        db = JournalDB(os.path.join(tmp, "journal.db"))
+        assert db.import_csv(path) == 2
+        assert (db.get("T1")["entry_time"], db.get("T1")["exit_time"]) == ("2025-09-01 09:17:00", None)
+        assert (db.get("T2")["entry_time"], db.get("T2")["exit_time"]) == (None, "2025-09-01 10:00:00")
+        db.close()
+
+
+def test_round_trip_feeds_the_journal():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = JournalDB(os.path.join(tmp, "journal.db"))
+        raw = make_trades(500, seed=3)
+        assert db.import_frame(raw, source="synthetic") == 500
+        stored = enrich_trades(db.to_frame())
+        expected = enrich_trades(raw)
+        for col in ["quantity", "entry_price", "exit_price", "entry_time_display", "exit_time_display", "pnl"]:
+            pd.testing.assert_series_equal(stored[col], expected[col], check_names=False, check_dtype=False)
+        # month range on the indexed exit_time
+        closed = expected[expected["exit_time_parsed"].notna()]
+        in_march = closed["exit_time_display"].between("2023-03-01", "2023-04-01", inclusive="left")
+        assert len(db.query(start="2023-03-01", end="2023-04-01", on="exit_time")) == int(in_march.sum())
+        db.close()
+
+
+def main():
+    print("\n=== journal_db ===\n")
+    test_insert_upsert_query()
+    test_import_existing_layouts()
+    test_import_unparseable_times()
+    test_round_trip_feeds_the_journal()
+    print("✅ SQLite journal: inserts, upserts, range queries and CSV import OK.")
+
+
+if __name__ == "__main__":
+    main()
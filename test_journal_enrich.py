@@ -0,0 +1,66 @@
+# test_journal_enrich.py
+"""
+journal_enrich.enrich_trades gives the same frame as the row-wise .apply()
+pipeline (bench_journal.enrich_rowwise), including blanks, missing columns,
+mixed layouts and explicit UTC offsets.
+Run with: python test_journal_enrich.py  (or pytest test_journal_enrich.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+from bench_journal import enrich_rowwise, make_trades
+from journal_enrich import enrich_trades
+
+
+def test_matches_rowwise_on_synthetic_journal():
+    raw = make_trades(2000, seed=4)
+    expected = enrich_rowwise(raw, lot_size=50, default_fees=7.5)
+    got = enrich_trades(raw, lot_size=50, default_fees=7.5)
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_edge_cases_match_rowwise():
+    raw = pd.DataFrame({
+        " Entry_Time ": ["2025-09-01 09:17:00", "", None, "01/09/2025 10:05", "2025-09-02T11:00:00+00:00",
+                         "garbage", "   "],
+        "exit_time": ["2025-09-01 09:43:00", "2025-09-01 10:45:00", "2025-09-02 11:40:00", np.nan, "",
+                      "2025-09-03 15:29:59", "2025-09-03 15:30:00"],
+        "quantity": [1, "2", None, 0, 3, "x", 1],
+        "entry_price": [20.0, 12.0, 150.0, 30.0, None, 0.0, 10.0],
+        "exit_price": [45.0, 7.0, 130.0, 50.0, 40.0, 5.0, None],
+        "fees": [15, None, 12, 8, "", 1, 2],
+    })  # no trade_id / symbol / lot_size / notes columns
+    pd.testing.assert_frame_equal(enrich_trades(raw, lot_size=25, default_fees=3.0),
+                                  enrich_rowwise(raw, lot_size=25, default_fees=3.0))
+
+    # mixed offsets force the value-by-value path
+    mixed = pd.DataFrame({"entry_time": ["2025-09-01 09:17:00+05:30", "2025-09-01 04:00:00+00:00", ""],
+                          "exit_time": ["2025-09-01 09:43:00", "2025-09-01 10:00:00", "2025-09-01 11:00:00"]})
+    got = enrich_trades(mixed)
+    pd.testing.assert_frame_equal(got, enrich_rowwise(mixed))
+    assert got["entry_time_display"].tolist() == ["2025-09-01 09:17:00", "2025-09-01 09:30:00", ""]
+
+
+def test_unparseable_time_cells():
+    # non-blank cells no format can read ("pending", "N/A") become NaT, as parse_datetime returned
+    raw = pd.DataFrame({"entry_time": ["2025-09-01 09:17:00", "pending", "N/A", "01/09/2025 10:05"],
+                        "exit_time": ["2025-09-01 09:43:00", "", None, "N/A"],
+                        "entry_price": [10.0, 11.0, 12.0, 13.0], "exit_price": [12.0, 13.0, None, 14.0]})
+    got = enrich_trades(raw)
+    pd.testing.assert_frame_equal(got, enrich_rowwise(raw))
+    assert str(got["entry_time_parsed"].dtype) == "datetime64[ns, Asia/Kolkata]"
+    assert got["entry_time_display"].tolist() == ["2025-09-01 09:17:00", "", "", "2025-01-09 10:05:00"]
+    assert got["exit_time_display"].tolist() == ["2025-09-01 09:43:00", "", "", ""]
+
+
+def main():
+    print("\n=== journal_enrich ===\n")
+    test_matches_rowwise_on_synthetic_journal()
+    test_edge_cases_match_rowwise()
+    test_unparseable_time_cells()
+    print("✅ Vectorized journal enrichment matches the row-wise pipeline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# test_journal_sink.py
+"""
+Checks for backtest.JournalSink: run_id tagging, buffered flushes every
+flush_every rows, per-run files, and the one-time header upgrade of a journal
+written before run_id existed.
+Run with: python test_journal_sink.py  (or pytest test_journal_sink.py)
+"""
+
+import csv
+import os
+import tempfile
+
+import pandas as pd
+
+import backtest
+
+
+def trade_row(i):
+    t = backtest.Trade(entry_time=pd.Timestamp("2025-09-01 09:15") + pd.Timedelta(minutes=i), entry_price=100.0 + i)
+    t.close(t.entry_time + pd.Timedelta(minutes=5), 101.0 + i, "TP")
+    return t.to_dict()
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+def test_run_id_and_header_upgrade():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trades_journal.csv")
+        old_fields = list(trade_row(0).keys())
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=old_fields)
+            writer.writeheader()
+            writer.writerows([trade_row(0), trade_row(1)])
+
+        sink = backtest.JournalSink(path, run_id="run-a", flush_every=2)
+        for i in range(3):
+            sink.write(trade_row(10 + i))
+            if i == 0:
+                assert len(read_rows(path)[1]) == 2  # buffered, nothing written yet
+        fields, rows = read_rows(path)
+        assert fields == ["run_id"] + old_fields  # upgraded on the first flush
+        assert len(rows) == 4 and [r["run_id"] for r in rows] == ["", "", "run-a", "run-a"]
+        sink.close()
+        assert len(read_rows(path)[1]) == 5
+
+        with backtest.JournalSink(path, run_id="run-b") as sink_b:
+            sink_b.write(trade_row(20))
+            sink_b.write(trade_row(21))
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert sum(line.startswith("run_id,") for line in lines) == 1  # header rewritten once only
+        fields, rows = read_rows(path)
+        assert fields == ["run_id"] + old_fields
+        assert [r["run_id"] for r in rows] == ["", "", "run-a", "run-a", "run-a", "run-b", "run-b"]
+        assert rows[0]["entry_price"] == "100.0" and rows[-1]["entry_price"] == "121.0"
+
+
+def test_per_run_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "journal", "trades.csv")
+        sink = backtest.JournalSink(path, run_id="r1", per_run=True)
+        assert sink.path == os.path.join(tmp, "journal", "trades_r1.csv")
+        os.makedirs(os.path.dirname(sink.path))
+        with open(sink.path, "w", encoding="utf-8") as f:
+            f.write("stale,contents\n1,2\n")
+        with sink:
+            for i in range(3):
+                sink.write(trade_row(i))
+        fields, rows = read_rows(sink.path)
+        assert fields == list(trade_row(0).keys())  # no run_id column: the file name carries it
+        assert len(rows) == 3
+        assert not os.path.exists(path)
+
+
+def main():
+    print("\n=== JournalSink ===\n")
+    test_run_id_and_header_upgrade()
+    test_per_run_files()
+    print("✅ Journal run_id tagging, flushing and header upgrade OK.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# test_market_feed.py
+"""
+market_feed: ticks replayed from the sample CSV aggregate back into the same
+1m bars (and into pandas-resampled 5m/15m bars), and the full WebSocket path
+(replay server -> client -> FeedHub -> EmaCrossStrategy) trades exactly like
+the batch backtest.
+Run with: python test_market_feed.py  (or pytest test_market_feed.py)
+"""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+import backtest
+import market_feed as mf
+from test_backtest_engine import DATA_PATH
+
+OHLCV = ["open", "high", "low", "close", "volume"]
+
+
+def sample_bars():
+    df = backtest.read_csv_robust(DATA_PATH)
+    df["volume"] = np.random.default_rng(5).integers(0, 5000, len(df)).astype(float)
+    return df
+
+
+def aggregate(df, intervals):
+    out = {name: [] for name in intervals}
+    agg = mf.CandleAggregator(intervals, on_candle=lambda c: out[c["interval"]].append(c))
+    for ts, price, qty in mf.bar_ticks(df).tolist():
+        agg.add("NIFTY", ts, price, qty)
+    agg.flush()
+    return {name: pd.DataFrame(rows).set_index("datetime")[OHLCV] for name, rows in out.items()}
+
+
+def test_ticks_rebuild_bars():
+    df = sample_bars()
+    candles = aggregate(df, ("1m", "5m", "15m"))
+    bars = df.set_index(df["datetime"].dt.tz_convert(backtest.IST))[OHLCV]
+    assert np.array_equal(candles["1m"].index, bars.index)
+    assert np.array_equal(candles["1m"].to_numpy(), bars.to_numpy())
+    for name, rule in (("5m", "5min"), ("15m", "15min")):
+        ref = bars.resample(rule).agg({"open": "first", "high": "max", "low": "min",
+                                       "close": "last", "volume": "sum"}).dropna(subset=["open"])
+        assert np.array_equal(candles[name].index, ref.index), name
+        assert np.allclose(candles[name].to_numpy(), ref.to_numpy(), rtol=0, atol=1e-9), name
+
+
+def test_replay_feed_trades_like_backtest():
+    df = backtest.read_csv_robust(DATA_PATH)  # what the replay server streams
+    expected, _, _ = backtest.run_backtest(df, out_dir=None, engine="loop")
+
+    async def run():
+        server = await mf.replay_server(DATA_PATH, port=0, speed=0)
+        port = server.sockets[0].getsockname()[1]
+        hub = mf.FeedHub()
+        strategy = backtest.EmaCrossStrategy()
+        hub.subscribe_candles(mf.StrategyConsumer(strategy, on_action=lambda *a: None), "1m")
+        try:
+            n = await mf.consume(f"ws://127.0.0.1:{port}", hub)
+        finally:
+            server.close()
+            await server.wait_closed()
+        return n, hub, strategy
+
+    n, hub, strategy = asyncio.run(run())
+    assert n == 4 * len(df)
+    strategy.close_open()
+    got = backtest._summarize(strategy.trades, None)[0]
+    for col in ("entry_time", "exit_time"):
+        got[col] = got[col].dt.tz_convert("UTC")
+    assert got.equals(expected)
+    assert hub.tick_latency.percentile(50) < 1.0  # ms per tick
+
+
+def main():
+    print("\n=== market_feed ===\n")
+    test_ticks_rebuild_bars()
+    test_replay_feed_trades_like_backtest()
+    print("✅ Tick aggregation and replay feed checks passed.")
+
+
+if __name__ == "__main__":
+    main()
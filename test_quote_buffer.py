@@ -0,0 +1,104 @@
+# test_quote_buffer.py
+"""
+`since` cursor on mock_api / mock_smartapi /quote and the client-side
+QuoteBuffer: after the first poll only the bars after the cursor are sent,
+and the rolling buffer stays identical to a full refetch.
+Run with: python test_quote_buffer.py  (or pytest test_quote_buffer.py)
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+from werkzeug.serving import make_server
+
+import http_client
+import mock_api
+import mock_smartapi
+from quote_buffer import QuoteBuffer
+
+
+def serve(app):
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def check_incremental(app, params=None):
+    server, base = serve(app)
+    try:
+        buf = QuoteBuffer("NIFTY", maxlen=500, base=base, params=params)
+        full = buf.poll().copy()
+        assert buf.last_rows == 500 and len(full) == 500
+
+        # steady state: nothing new since the last bar -> empty payload, window unchanged
+        assert buf.poll().equals(full) and buf.last_rows <= 1
+
+        # pretend the last three polls were missed: only those bars come back
+        buf.frame = full.iloc[:-3].reset_index(drop=True)
+        last = buf.frame.iloc[-1]
+        buf.cursor = int(last["timestamp"]) if "timestamp" in full.columns else last["datetime"].isoformat()
+        polled = buf.poll()
+        assert 3 <= buf.last_rows <= 4, buf.last_rows
+        assert len(polled) == 500
+        # bars already held keep their prices (the series is stable across polls)
+        overlap = polled.merge(full, on="datetime", suffixes=("", "_full"))
+        assert len(overlap) >= 499 and (overlap["close" if "close" in full else "price"]
+                                        == overlap["close_full" if "close" in full else "price_full"]).all()
+        # a fresh full fetch agrees with the buffered window
+        fresh = QuoteBuffer("NIFTY", maxlen=500, base=base, params=params).poll()
+        assert fresh.equals(polled)
+    finally:
+        http_client.close_session()
+        server.shutdown()
+
+
+def test_mock_api_since():
+    check_incremental(mock_api.app)
+
+
+def test_mock_smartapi_since():
+    check_incremental(mock_smartapi.app, params={"force": "ce"})
+
+
+def test_since_inside_a_minute():
+    # a cursor that is not on the minute still returns the newest bar
+    client = mock_api.app.test_client()
+    since = datetime.now().replace(second=0, microsecond=0) - timedelta(minutes=2) + timedelta(seconds=30)
+    data = client.get("/quote", query_string={"symbol": "NIFTY", "since": since.isoformat()}).get_json()["data"]
+    first = since.replace(second=0) + timedelta(minutes=1)
+    assert data[0]["datetime"] == first.isoformat() and len(data) in (2, 3)  # 3 if the minute rolled over
+
+    # mock_smartapi takes the same ISO cursor as well as epoch seconds
+    client = mock_smartapi.app.test_client()
+    iso = client.get("/quote", query_string={"force": "pe", "since": since.isoformat()}).get_json()
+    epoch = client.get("/quote", query_string={"force": "pe", "since": since.timestamp()}).get_json()
+    assert iso == epoch and iso[0]["timestamp"] == int(first.timestamp())
+    assert client.get("/quote", query_string={"since": "yesterday"}).status_code == 400
+
+
+def test_series_after_a_long_gap():
+    mock_api._series.pop("GAP", None)
+    start = datetime(2025, 9, 1, 9, 15)
+    count = mock_api.MAX_SERIES + 100
+    _, before = mock_api._minute_series("GAP", start, count)
+    later = start + timedelta(minutes=mock_api.MAX_SERIES + 50)
+    end, window = mock_api._minute_series("GAP", later, count)
+    assert end == later and len(window) == count
+    # nothing from before the gap is relabelled as if it were adjacent to the new bars
+    assert window[:100] != before[-100:]
+    end, window2 = mock_api._minute_series("GAP", later + timedelta(minutes=1), count)
+    assert window2[:-1] == window[1:]
+    mock_api._series.pop("GAP", None)
+
+
+def main():
+    print("\n=== quote since-cursor ===\n")
+    test_mock_api_since()
+    test_mock_smartapi_since()
+    test_since_inside_a_minute()
+    test_series_after_a_long_gap()
+    print("✅ Incremental quotes match full refetches.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# test_read_csv_robust.py
+"""
+The sniffed single-read path of backtest.read_csv_robust must give the same
+OHLCV frame as the old trial-read fallback for the layouts kept in data/.
+Run with: python test_read_csv_robust.py  (or pytest test_read_csv_robust.py)
+"""
+
+import os
+
+import backtest
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CASES = {
+    "nifty_1min.cleaned.csv": "plain",
+    "nifty_1min.csv": "yfinance",
+    "price_data.csv": "plain",
+    "last_run.csv": "datetime_index",
+}
+
+
+def fallback_frame(path, columns):
+    df = backtest._read_csv_fallback(path)
+    df = df.dropna(subset=["datetime", "open", "high", "low", "close"]).sort_values("datetime").reset_index(drop=True)
+    # the fast path reads OHLCV as float64; passthrough columns keep pandas' inferred dtypes
+    return df[columns].astype({c: "float64" for c in ("open", "high", "low", "close", "volume")})
+
+
+def test_sniffer_detects_layouts():
+    for name, layout in CASES.items():
+        assert backtest.sniff_csv_layout(os.path.join(DATA_DIR, name))["layout"] == layout, name
+
+
+def test_sniffed_read_matches_fallback():
+    for name in CASES:
+        path = os.path.join(DATA_DIR, name)
+        df = backtest.read_csv_robust(path)
+        fallback = backtest._read_csv_fallback(path)
+        assert list(df.columns) == ["datetime"] + [c for c in fallback.columns if c != "datetime"], name
+        assert df.equals(fallback_frame(path, list(df.columns))), name
+
+
+def test_passthrough_columns_kept():
+    df = backtest.read_csv_robust(os.path.join(DATA_DIR, "last_run.csv"))
+    assert {"ema9", "vwap", "atr14", "adx14"} <= set(df.columns)
+
+
+def main():
+    print("\n=== read_csv_robust sniffer ===\n")
+    test_sniffer_detects_layouts()
+    test_sniffed_read_matches_fallback()
+    test_passthrough_columns_kept()
+    print("✅ Sniffed reads match the fallback reader.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# test_run_sweep.py
+"""
+backtest.run_sweep must give, per parameter combination, the same summary as a
+serial run_backtest, and must unlink its shared-memory OHLCV block afterwards,
+also when a worker raises. --session-vwap reaches both the sweep and the
+single-file command.
+Run with: python test_run_sweep.py  (or pytest test_run_sweep.py)
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+from multiprocessing import shared_memory
+
+import pandas as pd
+
+import backtest
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nifty_1min.cleaned.csv")
+
+
+class RecordShared:
+    """Wraps backtest._share_ohlcv to remember the names of the blocks it creates."""
+
+    def __init__(self):
+        self.names = []
+        self.real = backtest._share_ohlcv
+
+    def __call__(self, df):
+        shm, meta = self.real(df)
+        self.names.append(shm.name)
+        return shm, meta
+
+    def __enter__(self):
+        backtest._share_ohlcv = self
+        return self
+
+    def __exit__(self, *exc):
+        backtest._share_ohlcv = self.real
+
+
+def assert_unlinked(name):
+    try:
+        shared_memory.SharedMemory(name=name).close()
+    except FileNotFoundError:
+        return
+    raise AssertionError(f"shared memory block {name} was not unlinked")
+
+
+def test_sweep_matches_serial_runs():
+    df = backtest.read_csv_robust(DATA_PATH)
+    grid = backtest.build_grid({"tp": "0.003,0.005", "sl": "0.0025", "vol_window": "10,20",
+                                "ema_fast": "9", "ema_slow": "21"})
+    assert len(grid) == 4
+    with RecordShared() as shared:
+        table = backtest.run_sweep(df, grid, workers=2)
+    assert len(shared.names) == 1
+    assert_unlinked(shared.names[0])
+
+    assert len(table) == len(grid) and table["rank"].tolist() == [1, 2, 3, 4]
+    got = {tuple(row[p] for p in backtest.SWEEP_PARAMS): row for row in table.to_dict("records")}
+    for params in grid:
+        _, summary, _ = backtest.run_backtest(df, out_dir=None, **params)
+        row = got[tuple(params[p] for p in backtest.SWEEP_PARAMS)]
+        assert {k: row[k] for k in summary} == summary, params
+
+
+def test_shared_memory_unlinked_when_a_worker_raises():
+    df = backtest.read_csv_robust(DATA_PATH).head(200)
+    grid = [{"tp": 0.005, "sl": 0.0025, "vol_window": 20, "ema_fast": 9, "ema_slow": 21},
+            {"tp": 0.005, "sl": 0.0025, "vol_window": 20, "ema_fast": 9, "ema_slow": 21, "bogus": 1}]
+    with RecordShared() as shared:
+        try:
+            backtest.run_sweep(df, grid, workers=2)
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("worker error was not raised")
+    assert len(shared.names) == 1
+    assert_unlinked(shared.names[0])
+
+
+def test_session_vwap_sweep_and_cli():
+    df = backtest.read_csv_robust(DATA_PATH)
+    grid = backtest.build_grid({"tp": "0.003,0.005"})
+    table = backtest.run_sweep(df, grid, workers=2, session_vwap=True)
+    for row in table.to_dict("records"):
+        params = {p: row[p] for p in backtest.SWEEP_PARAMS}
+        _, summary, _ = backtest.run_backtest(df, out_dir=None, session_vwap=True, **params)
+        assert {k: row[k] for k in summary} == summary, params
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # the single-file command writes under ./data
+        try:
+            out = os.path.join(tmp, "sweep.csv")
+            with contextlib.redirect_stdout(io.StringIO()):
+                backtest.main(["sweep", DATA_PATH, "--tp", "0.003,0.005", "--workers", "2",
+                               "--session-vwap", "--out", out])
+                backtest.main([DATA_PATH, "--session-vwap"])
+        finally:
+            os.chdir(cwd)
+        saved = pd.read_csv(out)
+        pd.testing.assert_frame_equal(saved[list(table.columns)], table, check_dtype=False)
+        _, summary, _ = backtest.run_backtest(df, out_dir=None, engine="vectorized", session_vwap=True)
+        assert len(pd.read_csv(os.path.join(tmp, "data", "backtest_results.csv"))) == summary["total_trades"]
+
+
+def main():
+    print("\n=== run_sweep ===\n")
+    test_sweep_matches_serial_runs()
+    test_shared_memory_unlinked_when_a_worker_raises()
+    test_session_vwap_sweep_and_cli()
+    print("✅ Sweep matches serial runs; shared memory released.")
+
+
+if __name__ == "__main__":
+    main()
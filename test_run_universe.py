@@ -0,0 +1,65 @@
+# test_run_universe.py
+"""
+backtest.run_universe over two small CSVs and one broken file: the per-symbol
+table matches single-symbol runs, the portfolio trades, equity curve and summary
+aggregate them, and the broken file shows up as an error row.
+Run with: python test_run_universe.py  (or pytest test_run_universe.py)
+"""
+
+import os
+import tempfile
+
+import backtest
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nifty_1min.cleaned.csv")
+
+
+def test_universe_with_broken_file():
+    df = backtest.read_csv_robust(DATA_PATH)
+    frames = {"AAA": df.iloc[:900], "BBB": df.iloc[900:]}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # workers write the columnar cache under ./data/cache
+        try:
+            for symbol, frame in frames.items():
+                frame.to_csv(os.path.join(tmp, f"{symbol}.csv"), index=False)
+            with open(os.path.join(tmp, "BROKEN.csv"), "w", encoding="utf-8") as f:
+                f.write("this is not,a price file\nfoo,bar\n")
+            paths = backtest.resolve_universe(tmp)
+            assert [backtest.symbol_from_path(p) for p in paths] == ["AAA", "BBB", "BROKEN"]
+            per_symbol, trades, curve, portfolio = backtest.run_universe(paths, workers=2)
+        finally:
+            os.chdir(cwd)
+
+    assert per_symbol["symbol"].tolist() == ["AAA", "BBB", "BROKEN"]
+    broken = per_symbol.set_index("symbol").loc["BROKEN"]
+    assert "datetime" in broken["error"]
+    assert per_symbol["error"].iloc[:2].isna().all()
+
+    expected_trades = 0
+    for row in per_symbol.iloc[:2].to_dict("records"):
+        _, summary, _ = backtest.run_backtest(frames[row["symbol"]].reset_index(drop=True), out_dir=None)
+        assert {k: row[k] for k in summary} == summary, row["symbol"]
+        expected_trades += summary["total_trades"]
+
+    assert len(trades) == expected_trades > 0
+    assert set(trades["symbol"]) == {"AAA", "BBB"}
+    assert str(trades["exit_time"].dt.tz) == "Asia/Kolkata"
+    assert len(curve) == len(trades) and curve["exit_time"].is_monotonic_increasing
+    assert abs(curve["equity"].iloc[-1] - trades["pnl"].sum()) < 1e-9
+    assert (curve["drawdown"] <= 0).all()
+
+    assert portfolio["symbols"] == 3 and portfolio["failed"] == 1
+    assert portfolio["total_trades"] == expected_trades
+    assert abs(portfolio["total_pnl"] - per_symbol["total_pnl"].sum()) < 1e-9
+    assert portfolio["max_drawdown"] == curve["drawdown"].min()
+
+
+def main():
+    print("\n=== run_universe ===\n")
+    test_universe_with_broken_file()
+    print("✅ Universe table, portfolio curve and error row OK.")
+
+
+if __name__ == "__main__":
+    main()
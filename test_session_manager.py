@@ -0,0 +1,156 @@
+# test_session_manager.py
+"""
+Offline checks for smartapi_session_manager: JWT expiry parsing, the
+per-process client cache and the background token refresher. No broker
+calls are made.
+Run with: python test_session_manager.py  (or pytest test_session_manager.py)
+"""
+
+import base64
+import json
+import os
+import tempfile
+import time
+
+import smartapi_session_manager as sm
+
+
+def make_jwt(claims):
+    def seg(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).rstrip(b"=").decode()
+    return f"{seg({'alg': 'HS512', 'typ': 'JWT'})}.{seg(claims)}.signature"
+
+
+def test_jwt_expiry():
+    exp = int(time.time()) + 3600
+    token = make_jwt({"username": "A123", "exp": exp})
+    assert sm.jwt_expiry(token) == exp
+    assert sm.jwt_expiry("Bearer " + token) == exp
+    assert sm.jwt_expiry("not-a-jwt") is None
+    assert sm.jwt_expiry(None) is None
+    assert sm.token_valid({"jwtToken": token})
+    assert not sm.token_valid({"jwtToken": make_jwt({"exp": int(time.time()) + 30})})
+    assert not sm.token_valid({"jwtToken": make_jwt({"username": "A123"})})
+
+
+def test_get_client_is_cached():
+    token = make_jwt({"exp": int(time.time()) + 3600})
+    with tempfile.TemporaryDirectory() as tmp:
+        old_file = sm.SESSION_FILE
+        sm.SESSION_FILE = os.path.join(tmp, "session.json")
+        try:
+            sm.reset_client()
+            sm.save_session({"clientcode": "A123", "jwtToken": token, "refreshToken": "r1", "feedToken": "f1"})
+            api, session = sm.get_client("dummy-key")
+            assert api.access_token == token and api.refresh_token == "r1" and api.feed_token == "f1"
+            api2, session2 = sm.get_client()
+            assert api2 is api and session2 is session
+            # valid exp claim: ensure_session answers from the cache, no getProfile
+            assert sm.ensure_session()
+        finally:
+            sm.reset_client()
+            sm.SESSION_FILE = old_file
+
+
+class FakeConnect:
+    """Stands in for SmartConnect: records tokens, answers generateToken locally."""
+
+    def __init__(self, new_jwt=None):
+        self.api_key = "dummy-key"
+        self.new_jwt = new_jwt
+        self.access_token = self.refresh_token = self.feed_token = None
+
+    def setAccessToken(self, t):
+        self.access_token = t
+
+    def setRefreshToken(self, t):
+        self.refresh_token = t
+
+    def setFeedToken(self, t):
+        self.feed_token = t
+
+    def setUserId(self, u):
+        pass
+
+    def generateToken(self, refresh_token):
+        return {"status": True, "data": {"jwtToken": self.new_jwt, "refreshToken": "r2", "feedToken": "f2"}}
+
+
+def test_background_refresher_swaps_tokens():
+    old = make_jwt({"exp": int(time.time()) + 5})
+    new = make_jwt({"exp": int(time.time()) + 3600})
+    with tempfile.TemporaryDirectory() as tmp:
+        old_file = sm.SESSION_FILE
+        sm.SESSION_FILE = os.path.join(tmp, "session.json")
+        try:
+            api = FakeConnect()
+            session = {"clientcode": "A123", "jwtToken": old, "refreshToken": "r1"}
+            sm.apply_tokens(api, session)
+            refresher = sm.TokenRefresher(api, session, lead=60, connect=lambda: FakeConnect(new))
+            assert refresher.next_delay() == sm.REFRESH_MIN_DELAY  # already inside the lead window: floored
+            refresher.start()
+            deadline = time.time() + 5
+            while api.access_token != new and time.time() < deadline:
+                time.sleep(0.01)
+            refresher.stop(timeout=5)
+            assert api.access_token == new and api.refresh_token == "r2" and api.feed_token == "f2"
+            assert session["jwtToken"] == new
+            assert sm.load_session()["jwtToken"] == new
+            assert refresher.next_delay() > 3000
+        finally:
+            sm.SESSION_FILE = old_file
+
+
+def test_short_lived_token_does_not_hot_loop():
+    now = int(time.time())
+    old = make_jwt({"exp": now + 5})
+    with tempfile.TemporaryDirectory() as tmp:
+        old_file = sm.SESSION_FILE
+        sm.SESSION_FILE = os.path.join(tmp, "session.json")
+        try:
+            # renewed jwtToken lives less than the lead: wait min_delay, not 0
+            session = {"clientcode": "A123", "jwtToken": old, "refreshToken": "r1"}
+            short = make_jwt({"exp": now + 30})
+            refresher = sm.TokenRefresher(FakeConnect(), session, lead=600, connect=lambda: FakeConnect(short))
+            assert refresher.refresh_once() and session["jwtToken"] == short
+            assert refresher.next_delay() == sm.REFRESH_MIN_DELAY
+            # "successful" refresh that hands back the same exp: a failure, retried on REFRESH_RETRY
+            same = make_jwt({"exp": now + 30, "jti": "2"})
+            refresher.connect = lambda: FakeConnect(same)
+            assert not refresher.refresh_once()
+            assert refresher.failures == 1 and refresher.next_delay() == sm.REFRESH_RETRY
+            refresher.connect = lambda: FakeConnect(make_jwt({"exp": now + 3600}))
+            assert refresher.refresh_once() and refresher.failures == 0
+            assert refresher.next_delay() > 2000
+        finally:
+            sm.SESSION_FILE = old_file
+
+
+def test_refresh_adopts_tokens_renewed_elsewhere():
+    renewed = make_jwt({"exp": int(time.time()) + 3600})
+    with tempfile.TemporaryDirectory() as tmp:
+        old_file = sm.SESSION_FILE
+        sm.SESSION_FILE = os.path.join(tmp, "session.json")
+        try:
+            # another process already wrote fresh tokens to session.json
+            sm.save_session({"clientcode": "A123", "jwtToken": renewed, "refreshToken": "r9"})
+            api = FakeConnect(new_jwt="should-not-be-used")
+            session = {"clientcode": "A123", "jwtToken": make_jwt({"exp": 1}), "refreshToken": "r1"}
+            ok, _ = sm.attempt_refresh(api, session)
+            assert ok and session["jwtToken"] == renewed and api.access_token == renewed
+        finally:
+            sm.SESSION_FILE = old_file
+
+
+def main():
+    print("\n=== smartapi_session_manager (offline) ===\n")
+    test_jwt_expiry()
+    test_get_client_is_cached()
+    test_background_refresher_swaps_tokens()
+    test_short_lived_token_does_not_hot_loop()
+    test_refresh_adopts_tokens_renewed_elsewhere()
+    print("✅ Session manager checks passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# test_session_store.py
+"""
+session_store: atomic writes, the mtime-keyed read cache and the cross-process
+lock that lets several processes share one refresh.
+Run with: python test_session_store.py  (or pytest test_session_store.py)
+"""
+
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+import session_store
+
+
+def _hold_lock(path, ready, release):
+    with session_store.locked(path):
+        ready.set()
+        release.wait(10)
+
+
+def test_write_is_atomic_and_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.json")
+        assert session_store.read_session(path) is None
+        session_store.write_session(path, {"jwtToken": "a", "refreshToken": "r"})
+        assert os.listdir(tmp) == ["session.json"]  # no temp file left behind
+        first = session_store.read_session(path)
+        assert first == {"jwtToken": "a", "refreshToken": "r"}
+        first["jwtToken"] = "mutated"  # callers get copies, not the cached dict
+        assert session_store.read_session(path)["jwtToken"] == "a"
+
+        # another writer (e.g. a different process) replaces the file: mtime changes, cache re-reads
+        time.sleep(0.01)
+        with open(path, "w") as f:
+            f.write('{"jwtToken": "bb"}')
+        assert session_store.read_session(path) == {"jwtToken": "bb"}
+
+
+def test_lock_excludes_other_processes():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.json")
+        ctx = mp.get_context("spawn")
+        ready, release = ctx.Event(), ctx.Event()
+        holder = ctx.Process(target=_hold_lock, args=(path, ready, release))
+        holder.start()
+        try:
+            assert ready.wait(30)
+            try:
+                with session_store.locked(path, timeout=0.3):
+                    raise AssertionError("lock acquired while another process holds it")
+            except TimeoutError:
+                pass
+        finally:
+            release.set()
+            holder.join(30)
+        with session_store.locked(path, timeout=5):
+            with session_store.locked(path, timeout=0):  # re-entrant in-process
+                pass
+
+
+def main():
+    print("\n=== session_store ===\n")
+    test_write_is_atomic_and_cached()
+    test_lock_excludes_other_processes()
+    print("✅ Session store checks passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# test_synth_market.py
+"""
+synth_market: seeded and reproducible, OHLC consistent, bars on the session grid
+(Mon-Fri 09:15-15:29) or a continuous grid ending at `end`, continuation between
+calls, U-shaped intraday volume, and the mocks / dashboards that now use it.
+Run with: python test_synth_market.py  (or pytest test_synth_market.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+import mock_api
+import synth_market
+from synth_market import SyntheticMarket, generate_bars
+
+
+def test_seeded_and_consistent():
+    a = generate_bars(20000, start="2025-09-05 15:20", seed=11)
+    b = generate_bars(20000, start="2025-09-05 15:20", seed=11)
+    pd.testing.assert_frame_equal(a, b)
+    assert not a["close"].equals(generate_bars(20000, start="2025-09-05 15:20", seed=12)["close"])
+
+    assert list(a.columns) == ["datetime"] + synth_market.OHLCV
+    assert (a["high"] >= a[["open", "close"]].max(axis=1)).all()
+    assert (a["low"] <= a[["open", "close"]].min(axis=1)).all()
+    assert (a["volume"] >= 1).all() and (a["low"] > 0).all()
+    assert np.allclose(a["close"] * 20, np.rint(a["close"] * 20))  # 0.05 ticks
+
+    t = a["datetime"]
+    assert t.is_monotonic_increasing and t.iloc[0] == pd.Timestamp("2025-09-05 15:20")
+    assert t.dt.weekday.max() <= 4
+    minutes = t.dt.hour * 60 + t.dt.minute
+    assert minutes.min() == 9 * 60 + 15 and minutes.max() == 15 * 60 + 29
+    assert t.iloc[10] == pd.Timestamp("2025-09-08 09:15")  # Friday close -> Monday open
+    # within a session each bar opens at the previous close; the next day gaps
+    same_day = (t.dt.date == t.shift().dt.date).to_numpy()
+    assert (a["open"].to_numpy()[1:][same_day[1:]] == a["close"].to_numpy()[:-1][same_day[1:]]).all()
+
+
+def test_grid_end_and_continuation():
+    df = generate_bars(5, end="2025-09-08 10:02:30", seed=1, session=False)
+    assert df["datetime"].iloc[-1] == pd.Timestamp("2025-09-08 10:02")
+    assert (df["datetime"].diff().dropna() == pd.Timedelta(minutes=1)).all()
+    assert generate_bars(3, end="2025-09-08 09:00", seed=1)["datetime"].iloc[-1] == pd.Timestamp("2025-09-05 15:29")
+    fifteen = generate_bars(30, start="2025-09-08 09:20", seed=1, freq_seconds=900)
+    assert fifteen["datetime"].iloc[0] == pd.Timestamp("2025-09-08 09:30") and len(set(fifteen["datetime"].dt.date)) == 2
+
+    mkt = SyntheticMarket(seed=5, session=False)
+    first = mkt.bars(100, start="2025-09-08 10:00")
+    second = mkt.bars(100)
+    assert second["datetime"].iloc[0] == first["datetime"].iloc[-1] + pd.Timedelta(minutes=1)
+    assert second["open"].iloc[0] == first["close"].iloc[-1]
+
+    aware = generate_bars(10, start=pd.Timestamp("2025-09-08 03:45", tz="UTC"), seed=1, tz="Asia/Kolkata")
+    assert str(aware["datetime"].dt.tz) == "Asia/Kolkata" and aware["datetime"].iloc[0].hour == 9
+
+
+def test_regimes_and_intraday_profile():
+    a = SyntheticMarket(seed=2).arrays(375 * 200, start="2024-01-01")
+    slot = np.arange(len(a["close"])) % 375
+    vol_by_slot = pd.Series(a["volume"]).groupby(slot).mean()
+    assert vol_by_slot.iloc[:15].mean() > 3 * vol_by_slot.iloc[170:205].mean() < vol_by_slot.iloc[-15:].mean()
+    share = np.bincount(a["regime"], minlength=4) / len(a["regime"])
+    assert (share > 0.05).all()  # every regime visited
+    r = np.diff(np.log(a["close"]))[slot[1:] != 0]
+    reg = a["regime"][1:][slot[1:] != 0]
+    calm, volatile = (SyntheticMarket().regime_names.index(k) for k in ("calm", "volatile"))
+    assert r[reg == volatile].std() > 2 * r[reg == calm].std()
+    assert set(np.unique(a["session"])) == set(a["session"][slot == 0])
+
+
+def test_mocks_use_generator():
+    mock_api._series.clear()
+    client = mock_api.app.test_client()
+    data = client.get("/quote?symbol=NIFTY&count=300").get_json()["data"]
+    prices = np.array([p["price"] for p in data])
+    assert len(prices) == 300 and 20000 < prices.mean() < 30000 and np.diff(prices).std() > 0
+    again = client.get("/quote?symbol=NIFTY&count=300").get_json()["data"]
+    shift = len({p["datetime"] for p in again} - {p["datetime"] for p in data})  # minutes that rolled over
+    assert [p["price"] for p in again][:300 - shift] == [p["price"] for p in data][shift:]  # a bar keeps its price
+    more = client.get("/quote?symbol=NIFTY&count=600").get_json()["data"]  # extends backwards
+    assert len(more) == 600 and more[-300]["price"] == data[0]["price"]
+
+    from trading_journal import make_mock_ohlc
+    candles = make_mock_ohlc(periods=40, freq_minutes=15, start_price=100.0)
+    assert list(candles.columns) == ["time", "open", "high", "low", "close", "volume"] and len(candles) == 40
+    assert (candles["time"].diff().dropna() == pd.Timedelta(minutes=15)).all()
+
+
+def main():
+    print("\n=== synth_market ===\n")
+    test_seeded_and_consistent()
+    test_grid_end_and_continuation()
+    test_regimes_and_intraday_profile()
+    test_mocks_use_generator()
+    print("✅ Synthetic market: seeded, on the session grid, continuous, regime-switching.")
+
+
+if __name__ == "__main__":
+    main()
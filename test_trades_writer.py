@@ -0,0 +1,101 @@
+# test_trades_writer.py
+"""
+trades_writer: the queued recorder writes the same rows the pandas append did,
+appends under an existing header (extra columns, BOM), recovers from a torn last
+row, and is safe to call from several threads.
+Run with: python test_trades_writer.py  (or pytest test_trades_writer.py)
+"""
+
+import os
+import tempfile
+import threading
+
+import pandas as pd
+
+import trades_writer
+from bench_trades_writer import append_trade_pandas
+from trades_writer import FIELDS, TradeRecorder, recover
+
+
+def order(i: int):
+    return {"status": "ok", "order_id": f"MOCK-{i}"}, {"symbol": "NIFTY", "quantity": 2, "price": 25000.0 + i}
+
+
+def test_rows_match_pandas_append():
+    with tempfile.TemporaryDirectory() as tmp:
+        old, new = os.path.join(tmp, "old.csv"), os.path.join(tmp, "new.csv")
+        with TradeRecorder(new) as rec:
+            for i in range(5):
+                append_trade_pandas(*order(i), old)
+                assert rec.record(*order(i)) == f"MOCK-{i}"
+            rec.flush()
+            assert rec.written == 5 and len(pd.read_csv(new)) == 5  # visible before close
+        a, b = pd.read_csv(old), pd.read_csv(new)
+        assert list(b.columns) == FIELDS
+        pd.testing.assert_frame_equal(a.drop(columns="entry_time"), b.drop(columns="entry_time"))
+        assert b["entry_time"].str.match(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$").all()
+
+        # the compatibility wrapper goes through the shared recorder
+        assert trades_writer.append_trade_to_csv(*order(9), trades_csv_path=new)
+        trades_writer.get_recorder(new).close()
+        assert pd.read_csv(new)["trade_id"].iloc[-1] == "MOCK-9"
+
+
+def test_existing_header_and_recovery():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trades.csv")
+        header = '"' + '","'.join(FIELDS + ["open", "high", "low", "close"]) + '"\n'
+        good = '"MOCK-1","NIFTY","1","1","25040.0","","2025-09-11 13:20:58","","0.0","auto","25040","25040","25040","25040"\n'
+        with open(path, "w", encoding="utf-8-sig") as f:
+            f.write(header + good + '"MOCK-2","NIF')  # crash mid-row
+        with TradeRecorder(path) as rec:
+            assert rec.fieldnames[-1] == "close"
+            rec.record(*order(3))
+        df = pd.read_csv(path)
+        assert df["trade_id"].tolist() == ["MOCK-1", "MOCK-3"]
+        assert df["open"].isna().tolist() == [False, True]
+
+        # a complete last row without its newline is kept
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(good.rstrip("\n"))
+        assert recover(path)[0] == "trade_id"
+        assert pd.read_csv(path)["trade_id"].tolist() == ["MOCK-1", "MOCK-3", "MOCK-1"]
+
+        # a torn header is dropped and rewritten
+        torn = os.path.join(tmp, "torn.csv")
+        with open(torn, "w") as f:
+            f.write("trade_id,symbol,quan")
+        assert recover(torn) == [] and os.path.getsize(torn) == 0
+
+
+def test_threads():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trades.csv")
+        rec = TradeRecorder(path, fsync_interval=0.01)
+        workers = [threading.Thread(target=lambda k=k: [rec.record(*order(k * 1000 + i)) for i in range(250)])
+                   for k in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        rec.close()
+        rec.close()
+        ids = pd.read_csv(path)["trade_id"]
+        assert len(ids) == 1000 and ids.is_unique
+        try:
+            rec.record(*order(0))
+            raise AssertionError("record() after close() accepted")
+        except RuntimeError:
+            pass
+
+
+def main():
+    print("\n=== trades_writer ===\n")
+    test_rows_match_pandas_append()
+    test_existing_header_and_recovery()
+    test_threads()
+    print("✅ Trade recorder: rows, recovery and threads OK.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,42 +3,259 @@
 Lightweight writer for executed trades.
 Safe to import from non-Streamlit scripts (e.g., trading_bot.py).
 Writes/appends to trades.csv with columns compatible with trading_journal.py.
+
+Recording a fill stays off the order path. TradeRecorder.record() builds one row
+and puts it on a queue, which takes microseconds. A background thread owns a
+persistent append handle and writes each batch with the csv module, without
+pandas. After a batch the handle is flushed to the OS, and os.fsync() runs at
+most every fsync_interval seconds and on close.
+
+Crash safety:
+- A row is in the file once flush() returns; on the disk itself within
+  fsync_interval seconds.
+- A torn last line left by a crash mid-write is truncated away on the next
+  open, so appends always start on a fresh line.
+- An existing file keeps its own header. Its extra columns are written
+  blank, missing ones are skipped.
+
+    from trades_writer import get_recorder
+    rec = get_recorder("trades.csv")
+    rec.record(order_resp, order_payload)      # returns the trade_id
+    rec.flush()                                # optional: wait until written
+
+append_trade_to_csv() keeps its old signature and goes through the shared recorder.
 """
+import atexit
+import csv
+import io
+import logging
 import os
+import queue
+import threading
+import time
 from datetime import datetime
-import pandas as pd
+
 import pytz
 
 KOLKATA = pytz.timezone("Asia/Kolkata")
+FIELDS = ["trade_id", "symbol", "quantity", "lot_size", "entry_price", "exit_price",
+          "entry_time", "exit_time", "fees", "notes"]
+FSYNC_INTERVAL = 1.0  # seconds between fsyncs while rows keep arriving
+
+log = logging.getLogger("trades_writer")
+_STOP = object()
+
+
+def _kolkata_text(ts: float) -> str:
+    """Kolkata wall-clock text for an epoch time, formatted once per second (fills bunch up)."""
+    global _stamp
+    sec = int(ts)
+    if _stamp[0] != sec:
+        _stamp = (sec, datetime.fromtimestamp(sec, KOLKATA).strftime("%Y-%m-%d %H:%M:%S"))
+    return _stamp[1]
+
+
+_stamp = (None, "")
+
+
+def trade_row(order_resp: dict, order_payload: dict) -> dict:
+    """The trades.csv row for an executed order (entry_time stamped now, Asia/Kolkata)."""
+    now = time.time()
+    lot_size = order_payload.get("lot_size", None)
+    return {
+        "trade_id": order_resp.get("order_id") if isinstance(order_resp, dict) else str(int(now)),
+        "symbol": order_payload.get("symbol", ""),
+        "quantity": order_payload.get("quantity", 0),
+        "lot_size": lot_size if lot_size is not None else 1,
+        "entry_price": order_payload.get("price", None),
+        "exit_price": None,
+        "entry_time": _kolkata_text(now),
+        "exit_time": "",
+        "fees": 0.0,
+        "notes": f"auto-recorded ({order_resp.get('status') if isinstance(order_resp, dict) else 'unknown'})"
+    }
+
+
+def _fields(line: bytes) -> list:
+    return next(csv.reader(io.StringIO(line.decode("utf-8-sig"))), [])
+
+
+def _last_newline(f, end: int) -> int:
+    """Offset of the last b"\n" before end (-1 if none), scanning back in chunks."""
+    while end > 0:
+        start = max(0, end - 65536)
+        f.seek(start)
+        nl = f.read(end - start).rfind(b"\n")
+        if nl >= 0:
+            return start + nl
+        end = start
+    return -1
+
+
+def recover(path: str) -> list:
+    """
+    Make path safe to append to and return its header ([] for a missing or empty file).
+    A trailing partial row (crash mid-write) is truncated back to the last newline; a
+    complete row that only lacks its newline gets one.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return []
+        f.seek(0)
+        first = f.readline()
+        header = _fields(first)
+        if not first.endswith(b"\n"):
+            # the file is a single line: our own header torn mid-write, or a header without its newline
+            if header != FIELDS and ",".join(FIELDS).startswith(first.decode("utf-8-sig").strip()):
+                f.truncate(0)
+                return []
+            f.write(b"\n")
+            return header
+        tail = _last_newline(f, size) + 1
+        if tail < size:
+            f.seek(tail)
+            if len(_fields(f.read())) == len(header):
+                f.seek(0, os.SEEK_END)
+                f.write(b"\n")
+            else:
+                log.warning("%s: dropping %d bytes of a partially written last row", path, size - tail)
+                f.truncate(tail)
+    return header
+
+
+class TradeRecorder:
+    """
+    Append-only trades CSV fed by a queue: record() from any thread, one writer thread
+    with a persistent handle. Use one recorder per file (get_recorder shares them).
+    """
+    def __init__(self, path: str = "trades.csv", fsync_interval: float = FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_interval = float(fsync_interval)
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        header = recover(path)
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file, lineterminator="\n")
+        if not header:
+            header = list(FIELDS)
+            self._writer.writerow(header)
+            self._file.flush()
+        self.fieldnames = header
+        self.written = 0
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"trades-writer:{os.path.basename(path)}", daemon=True)
+        self._thread.start()
+
+    def record(self, order_resp: dict, order_payload: dict) -> str:
+        """Queue the row for an executed order; returns its trade_id."""
+        row = trade_row(order_resp, order_payload)
+        self.record_row(row)
+        return row["trade_id"]
+
+    def record_row(self, row: dict) -> None:
+        """Queue an arbitrary trade row (keys matching the file's header)."""
+        if self._closed:
+            raise RuntimeError(f"TradeRecorder for {self.path} is closed")
+        self._queue.put(row)
+
+    def flush(self) -> None:
+        """Block until every row queued so far has been written and flushed to the OS."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self) -> None:
+        """Write what is queued, fsync and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self) -> "TradeRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        fields = self.fieldnames
+        last_sync = time.monotonic()
+        dirty = False
+        stop = False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval if dirty else None)
+            except queue.Empty:
+                item = None
+            batch = [] if item is None else [item]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = stop or any(item is _STOP for item in batch)
+            rows = []
+            try:
+                for item in batch:
+                    if isinstance(item, dict):
+                        rows.append(["" if item.get(f) is None else item.get(f) for f in fields])
+                if rows:
+                    self._writer.writerows(rows)
+                    self._file.flush()
+                    self.written += len(rows)
+                    dirty = True
+                    log.debug("Appended %d trade(s) to %s", len(rows), self.path)
+                if dirty and (stop or time.monotonic() - last_sync >= self.fsync_interval or not rows):
+                    os.fsync(self._file.fileno())
+                    last_sync = time.monotonic()
+                    dirty = False
+            except Exception as e:  # keep serving the queue; the rows of this batch are reported lost
+                log.error("Failed to write %d trade(s) to %s: %s", len(rows), self.path, e)
+            finally:
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+        self._file.close()
+
+
+_recorders = {}  # abs path -> TradeRecorder
+_recorders_lock = threading.Lock()
+
+
+def get_recorder(path: str = "trades.csv") -> TradeRecorder:
+    """Shared TradeRecorder per file (one writer thread and handle per process), closed at exit."""
+    key = os.path.abspath(path)
+    with _recorders_lock:
+        rec = _recorders.get(key)
+        if rec is None or rec._closed:
+            rec = _recorders[key] = TradeRecorder(path)
+        return rec
+
+
+@atexit.register
+def close_all() -> None:
+    with _recorders_lock:
+        for rec in _recorders.values():
+            rec.close()
+
 
 def append_trade_to_csv(order_resp: dict, order_payload: dict, trades_csv_path: str = "trades.csv"):
     """
     Append a single executed trade to trades.csv.
     order_resp: dict returned by the mock /order endpoint (expects 'order_id' and 'status' and optionally 'details')
     order_payload: dict used to place the order (expects symbol, quantity, price, instrument)
+    The row is queued on the shared recorder and written by its thread; call
+    get_recorder(trades_csv_path).flush() to wait for it.
     """
     try:
-        trade_row = {
-            "trade_id": order_resp.get("order_id") if isinstance(order_resp, dict) else str(int(datetime.now().timestamp())),
-            "symbol": order_payload.get("symbol", ""),
-            "quantity": order_payload.get("quantity", 0),
-            "lot_size": order_payload.get("lot_size", None) if order_payload.get("lot_size", None) is not None else 1,
-            "entry_price": order_payload.get("price", None),
-            "exit_price": None,
-            "entry_time": datetime.now(tz=KOLKATA).strftime("%Y-%m-%d %H:%M:%S"),
-            "exit_time": "",
-            "fees": 0.0,
-            "notes": f"auto-recorded ({order_resp.get('status') if isinstance(order_resp, dict) else 'unknown'})"
-        }
-
-        file_exists = os.path.exists(trades_csv_path)
-        df_row = pd.DataFrame([trade_row])
-        if not file_exists:
-            df_row.to_csv(trades_csv_path, index=False, mode="w")
-        else:
-            df_row.to_csv(trades_csv_path, index=False, mode="a", header=False)
-
-        print(f"Appended trade to {trades_csv_path}: {trade_row['trade_id']}")
+        get_recorder(trades_csv_path).record(order_resp, order_payload)
         return True
     except Exception as e:
         print("Failed to append trade to CSV:", e)
@@ -4,35 +4,35 @@ Trading bot entry point with SmartAPI session bootstrap.
 
 How it works:
 1. Calls ensure_session() from smartapi_session_manager.py (this will refresh or prompt for login/TOTP).
-2. Loads session.json and sets api.setAccessToken(jwtToken) etc.
-3. Proceeds to run the bot logic inside main().
+2. Takes the process-wide SmartConnect from get_client() (tokens from session.json already applied).
+3. Runs the live loop (live_loop.LiveLoop): at every candle close it fetches only the
+   newly closed bars, updates the EMA-cross strategy incrementally and routes orders.
 
-Replace the BOT LOGIC placeholder with your existing trading_bot code (or import and call your functions).
+Orders are paper-traded (logged + journaled) unless --live is given.
+
+    python trading_bot.py --symbol NIFTY --exchange NSE --symboltoken 26000 --interval 5m
+    python trading_bot.py --source mock --interval 1m          # against mock_api.py, no login
 """
 
+import argparse
 import os
-import json
 import sys
 import time
 import logging
+from datetime import datetime
+
+import pandas as pd
+
+from backtest import IST, EmaCrossStrategy, JournalSink
+from live_loop import INTERVALS, LiveLoop
 
 # Import the session manager's ensure_session (this will prompt for credentials/TOTP if needed)
 try:
-    from smartapi_session_manager import ensure_session
+    from smartapi_session_manager import ensure_session, get_client, start_token_refresher
 except Exception as e:
     print("❌ Could not import ensure_session from smartapi_session_manager.py:", e)
     sys.exit(1)
 
-# Import SmartConnect (handle both package name variants)
-try:
-    from SmartApi.smartConnect import SmartConnect
-except Exception:
-    try:
-        from smartapi.smartConnect import SmartConnect
-    except Exception as e:
-        print("❌ Could not import SmartConnect from smartapi packages:", e)
-        sys.exit(1)
-
 
 LOG = logging.getLogger("trading_bot")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
@@ -50,84 +50,146 @@ def bootstrap_session():
         LOG.error("Could not establish SmartAPI session. Exiting.")
         raise SystemExit(1)
 
-    # 2) Load session.json
-    try:
-        with open("session.json", "r") as f:
-            session = json.load(f)
-    except Exception as e:
-        LOG.error("Failed to read session.json after ensure_session(): %s", e)
-        raise SystemExit(1)
-
-    # 3) Get API key from environment
-    api_key = os.environ.get("SMARTAPI_KEY")
-    if not api_key:
-        LOG.error("SMARTAPI_KEY environment variable not set. Exiting.")
-        raise SystemExit(1)
-
-    # 4) Create and configure SmartConnect
-    api = SmartConnect(api_key=api_key)
-
-    jwt_token = session.get("jwtToken")
-    refresh_token = session.get("refreshToken")
-    feed_token = session.get("feedToken")
-
-    if not jwt_token:
+    # 2) Same SmartConnect ensure_session() just validated; no second read of session.json
+    api, session = get_client()
+    if not session or not session.get("jwtToken"):
         LOG.error("No jwtToken present in session.json - please re-run the session manager.")
         raise SystemExit(1)
 
-    try:
-        api.setAccessToken(jwt_token)
-        if refresh_token:
-            try:
-                api.setRefreshToken(refresh_token)
-            except Exception:
-                LOG.debug("api.setRefreshToken not supported by SDK version; continuing.")
-        if feed_token:
-            try:
-                api.setFeedToken(feed_token)
-            except Exception:
-                LOG.debug("api.setFeedToken not supported by SDK version; continuing.")
-    except Exception as e:
-        LOG.error("Failed to set tokens on SmartConnect: %s", e)
-        raise SystemExit(1)
+    # 3) Renew the jwtToken in the background ahead of expiry (no in-line re-auth mid-session)
+    start_token_refresher()
 
     LOG.info("✅ SmartAPI session initialized for client: %s", session.get("clientcode"))
     return api, session
 
 
-def main():
+SMARTAPI_INTERVALS = {"1m": "ONE_MINUTE", "5m": "FIVE_MINUTE", "15m": "FIFTEEN_MINUTE"}
+CANDLE_COLUMNS = ["datetime", "open", "high", "low", "close", "volume"]
+
+
+def smartapi_fetcher(api, exchange, symboltoken, interval):
+    """fetch_bars(since) backed by getCandleData over [since, now] only."""
+    step = pd.Timedelta(seconds=INTERVALS[interval])
+
+    def fetch(since, lookback=None):
+        now = pd.Timestamp.now(tz=IST)
+        start = since if since is not None else now - (lookback or 2 * step)
+        resp = api.getCandleData({
+            "exchange": exchange,
+            "symboltoken": symboltoken,
+            "interval": SMARTAPI_INTERVALS[interval],
+            "fromdate": start.tz_convert(IST).strftime("%Y-%m-%d %H:%M"),
+            "todate": now.strftime("%Y-%m-%d %H:%M"),
+        })
+        rows = (resp or {}).get("data") or []
+        df = pd.DataFrame(rows, columns=CANDLE_COLUMNS)
+        df["datetime"] = pd.to_datetime(df["datetime"], utc=True).dt.tz_convert(IST)
+        return df
+    return fetch
+
+
+def mock_fetcher(symbol, interval):
+    """fetch_bars(since) against the mock REST backend (trading_bot_patched.API_BASE)."""
+    import trading_bot_patched as patched
+    step = INTERVALS[interval]
+    local_tz = datetime.now().astimezone().tzinfo
+
+    def fetch(since, lookback=None):
+        # the mock serves 1-minute points; with a cursor it returns only the bars after it
+        if since is not None:
+            payload = patched.get_quote(symbol=symbol, count=10000, since=since.isoformat())
+        else:
+            count = int((lookback or pd.Timedelta(seconds=2 * step)).total_seconds() // 60) + step // 60 + 1
+            payload = patched.get_quote(symbol=symbol, count=count)
+        df = patched.normalize_candles(payload)
+        if df.empty:
+            return pd.DataFrame(columns=CANDLE_COLUMNS)
+        df = df.rename_axis("datetime").reset_index()
+        # naive local minute timestamps -> tz-aware candle starts on the interval grid
+        start = df["datetime"].dt.tz_localize(local_tz).dt.floor(f"{step}s")
+        df["volume"] = df.get("volume", 0.0)
+        bars = df.groupby(start).agg(open=("open", "first"), high=("high", "max"), low=("low", "min"),
+                                     close=("close", "last"), volume=("volume", "sum"))
+        return bars.rename_axis("datetime").reset_index()
+    return fetch
+
+
+def make_order_router(api, args):
+    def route(action, trade, bar):
+        side = "BUY" if action == "ENTRY" else "SELL"
+        price = trade.entry_price if action == "ENTRY" else trade.exit_price
+        reason = trade.entry_reason if action == "ENTRY" else trade.exit_reason
+        LOG.info("%s %s x%d @ %.2f (%s) bar=%s", side, args.symbol, args.qty, price, reason, bar["datetime"])
+        if not args.live:
+            return None
+        try:
+            if api is None:
+                import trading_bot_patched as patched
+                return patched.place_order({"symbol": args.symbol, "side": side, "qty": args.qty, "price": price})
+            return api.placeOrder({
+                "variety": "NORMAL",
+                "tradingsymbol": args.symbol,
+                "symboltoken": args.symboltoken,
+                "transactiontype": side,
+                "exchange": args.exchange,
+                "ordertype": "MARKET",
+                "producttype": "INTRADAY",
+                "duration": "DAY",
+                "quantity": str(args.qty),
+            })
+        except Exception as e:
+            LOG.error("Order routing failed: %s", e)
+            return None
+    return route
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="EMA-cross live trading loop")
+    parser.add_argument("--source", choices=("smartapi", "mock"), default="smartapi")
+    parser.add_argument("--symbol", default="NIFTY")
+    parser.add_argument("--exchange", default="NSE")
+    parser.add_argument("--symboltoken", default="26000", help="SmartAPI instrument token (26000 = NIFTY 50 index)")
+    parser.add_argument("--interval", choices=tuple(INTERVALS), default="1m")
+    parser.add_argument("--qty", type=int, default=1)
+    parser.add_argument("--tp", type=float, default=0.005)
+    parser.add_argument("--sl", type=float, default=0.0025)
+    parser.add_argument("--vol-window", type=int, default=20)
+    parser.add_argument("--warmup-days", type=float, default=3.0, help="history used to seed the indicators")
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds after candle close before fetching")
+    parser.add_argument("--max-candles", type=int, default=None)
+    parser.add_argument("--journal", default=os.path.join("data", "live_trades_journal.csv"))
+    parser.add_argument("--live", action="store_true", help="send real orders (default: paper-trade, log only)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """
-    Main bot flow.
-    Replace the placeholder below with your existing trading routines.
-    The `api` object is a configured SmartConnect ready to call endpoints like api.holding(), api.orderBook(), etc.
+    Main bot flow: session bootstrap, indicator warm-up, then the candle-aligned live loop.
     """
-    api, session = bootstrap_session()
-
-    # === YOUR BOT LOGIC HERE ===
-    # Replace the block below with your existing trading_bot code or call your functions
-    # Example safe read-only checks:
+    args = parse_args(argv)
+    if args.source == "smartapi":
+        api, session = bootstrap_session()
+        fetch = smartapi_fetcher(api, args.exchange, args.symboltoken, args.interval)
+    else:
+        api = None
+        fetch = mock_fetcher(args.symbol, args.interval)
+
+    journal = JournalSink(args.journal, flush_every=1)
+    strategy = EmaCrossStrategy(tp=args.tp, sl=args.sl, vol_window=args.vol_window, journal=journal)
+    loop = LiveLoop(fetch, strategy, make_order_router(api, args), interval=args.interval, settle=args.settle)
+
+    # seed indicators from recent history so the first live candle is evaluated with warm EMAs/RSI
+    history = loop.closed_bars(fetch(None, lookback=pd.Timedelta(days=args.warmup_days)), time.time())
+    if history is not None and not history.empty:
+        strategy.warm_up(history)
+        loop.last_ts = history["datetime"].iloc[-1]
+        LOG.info("Warmed up on %d candles up to %s", len(history), loop.last_ts)
+
+    LOG.info("Live loop: %s %s candles, %s mode", args.symbol, args.interval, "LIVE" if args.live else "paper")
     try:
-        LOG.info("Running a quick holdings check as smoke test...")
-        resp = api.holding()
-        if isinstance(resp, dict):
-            status = resp.get("status") if "status" in resp else resp.get("success")
-            LOG.info("Holdings status: %s", status)
-        else:
-            LOG.warning("Holdings returned unexpected type: %s", type(resp))
-    except Exception as e:
-        LOG.error("Exception during holdings check: %s", e)
-
-    # --- Example loop skeleton for bot running (customize as needed) ---
-    # while True:
-    #     # fetch market data
-    #     # run strategies
-    #     # place orders via api
-    #     time.sleep(5)
-    #
-    # Replace the above with your actual trading logic or import and call it.
-    # ============================
-
-    LOG.info("Bot startup complete. Replace placeholder logic with your trading code.")
+        loop.run(max_candles=args.max_candles)
+    finally:
+        journal.close()
 
 
 if __name__ == "__main__":
@@ -1,24 +1,29 @@
 # trading_bot_patched.py
-import requests
 import pandas as pd
 from requests.exceptions import RequestException
 from datetime import datetime
 
+import http_client
+import indicators
+
 API_BASE = 'http://127.0.0.1:5001'
 
 def login(client_code='demo', password='demo'):
     try:
-        r = requests.post(f"{API_BASE}/login", json={"client_code": client_code, "password": password}, timeout=5)
+        r = http_client.post(f"{API_BASE}/login", endpoint="login", json={"client_code": client_code, "password": password})
         r.raise_for_status()
         return r.json()
     except RequestException as e:
         print('Login failed (network):', e)
         return None
 
-def get_quote(symbol='NIFTY', count=100):
+def get_quote(symbol='NIFTY', count=100, since=None):
+    """since: only bars after this datetime (ISO) / epoch, when the backend supports it."""
     try:
         params = {"symbol": symbol, "count": count}
-        r = requests.get(f"{API_BASE}/quote", params=params, timeout=8)
+        if since is not None:
+            params["since"] = since
+        r = http_client.get(f"{API_BASE}/quote", endpoint="quote", params=params)
         r.raise_for_status()
         return r.json()
     except RequestException as e:
@@ -27,7 +32,7 @@ def get_quote(symbol='NIFTY', count=100):
 
 def place_order(payload: dict):
     try:
-        r = requests.post(f"{API_BASE}/place_order", json=payload, timeout=5)
+        r = http_client.post(f"{API_BASE}/place_order", endpoint="place_order", json=payload)
         r.raise_for_status()
         return r.json()
     except RequestException as e:
@@ -74,9 +79,10 @@ def compute_indicators(df: pd.DataFrame):
         print('No data for indicators')
         return df
     out = df.copy()
-    out['sma_20'] = out['close'].rolling(window=20, min_periods=1).mean()
-    out['sma_50'] = out['close'].rolling(window=50, min_periods=1).mean()
-    out['ema_20'] = out['close'].ewm(span=20, adjust=False).mean()
+    close = out['close'].to_numpy(dtype=float)
+    out['sma_20'] = indicators.sma(close, 20)
+    out['sma_50'] = indicators.sma(close, 50)
+    out['ema_20'] = indicators.ema(close, 20)
     return out
 
 def main():
@@ -3,7 +3,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import requests
+import http_client  # pooled keep-alive session (module state survives Streamlit reruns)
+import quote_buffer  # incremental (since-cursor) quotes over the pooled http_client session
+import candle_store  # in-memory 1m bars + derived 5m/15m/1h candles
+import dashboard_cache  # st.cache_data / st.cache_resource helpers (candle-cadence TTLs)
+import synth_market  # vectorized synthetic 1m bars for the simulate path
 from datetime import datetime
 
 # page config
@@ -16,39 +20,47 @@ ORANGE = "#FF7A2D"
 WHITE = "#FFFFFF"
 GRAY = "#F4F6F8"
 
-# small helper: simulate quotes
-def fetch_quotes(symbol: str, count: int, simulate: bool=False):
+# small helper: simulate 1m bars ending at `end` (continuing from last_close if given)
+def simulate_bars(symbol: str, end: pd.Timestamp, count: int, last_close: float = None):
+    base = last_close if last_close is not None else (25000 if symbol.upper().startswith("NIFTY") else 20000)
+    df = synth_market.generate_bars(count, end=end, start_price=base, session=False)
+    return df.set_index("datetime")
+
+# 1m bars per symbol live in the candle store; 5m/15m/1h are derived incrementally,
+# so every timeframe is served from memory and switching the selector is instant.
+store = candle_store.get_store()
+
+def fetch_quotes(symbol: str, count: int, timeframe: str = "1m", simulate: bool=False):
+    minutes = store.minutes_for(count)  # enough 1m history for `count` candles on every timeframe
     if simulate:
-        now = pd.Timestamp.now()
-        t = pd.date_range(end=now, periods=count, freq="T")
-        noise = np.random.normal(0, 4, size=count).cumsum()
-        base = 25000 if symbol.upper().startswith("NIFTY") else 20000
-        close = base + noise
-        df = pd.DataFrame({
-            "datetime": t,
-            "open": np.roll(close, 1),
-            "high": close + np.abs(np.random.normal(0, 2, size=count)),
-            "low": close - np.abs(np.random.normal(0, 2, size=count)),
-            "close": close,
-            "volume": np.random.randint(100, 1000, size=count)
-        })
-        df.loc[df.index[0], "open"] = df.loc[df.index[0], "close"]
-        df = df.set_index("datetime")
-        return df
+        key = f"sim:{symbol}"
+        now = pd.Timestamp.now().floor("min")
+        last = store.last_time(key)
+        if last is not None and store.rows(key) < minutes:
+            store.clear(key)  # more candles asked for than simulated so far: start over
+            last = None
+        missing = minutes if last is None else int((now - last) / pd.Timedelta(minutes=1))
+        if missing > 0:
+            last_close = None if last is None else float(store.get(key, "1m", 1)["close"].iloc[-1])
+            store.update(key, simulate_bars(symbol, now, min(missing, minutes), last_close))
+        return store.get(key, timeframe, count)
     # try real backend
     try:
-        r = requests.get(f"{API_BASE}/quote", params={"symbol": symbol, "count": count}, timeout=5)
-        r.raise_for_status()
-        payload = r.json()
-        data = payload.get("data", [])
-        df = pd.DataFrame(data)
-        if "datetime" in df.columns:
-            df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
-            df = df.set_index("datetime")
-        return df
+        # rolling buffer: only bars newer than the last poll come over the wire
+        store.update(symbol, quote_buffer.fetch_quotes(symbol, minutes, base=API_BASE))
     except Exception as e:
-        # return empty with columns on error
-        return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
+        # serve whatever is held (empty with columns if nothing yet)
+        pass
+    return store.get(symbol, timeframe, count)
+
+# widget clicks within the same minute re-render from this cache; the 1m feed only
+# changes once per candle, so the minute number is part of the key
+@st.cache_data(ttl=dashboard_cache.ttl_for("1m"), show_spinner=False, max_entries=64)
+def load_candles(symbol: str, count: int, timeframe: str, simulate: bool, minute: int):
+    df = fetch_quotes(symbol, count, timeframe, simulate=simulate)
+    # streaming EMAs: the cached IndicatorState only folds bars it has not seen yet
+    ind = dashboard_cache.indicator_cache(f"{'sim:' if simulate else ''}{symbol}:{timeframe}").frame(df)
+    return df.join(ind[["ema9", "ema21"]]) if not ind.empty else df
 
 # --- CSS & layout skeleton (safe, with matching tags) ---
 st.markdown(
@@ -128,7 +140,7 @@ st.markdown('<div class="side-panel">', unsafe_allow_html=True)
 st.markdown('<div style="font-weight:700;font-size:18px;margin-bottom:10px;">Controls</div>', unsafe_allow_html=True)
 
 symbol = st.text_input("Symbol (example: NIFTY)", value="NIFTY", key="left_symbol")
-timeframe = st.selectbox("Timeframe", ["1m", "5m", "15m"], index=0, key="left_timeframe")
+timeframe = st.selectbox("Timeframe", list(candle_store.TIMEFRAMES), index=0, key="left_timeframe")
 count = st.number_input("Candles (count)", min_value=20, max_value=2000, value=120, step=10, key="left_count")
 simulate = st.checkbox("Simulate data (ignore backend)", value=True, key="left_sim")
 refresh = st.button("Refresh now", key="left_refresh")
@@ -145,14 +157,17 @@ st.markdown('<div class="center-body">', unsafe_allow_html=True)
 # center content: price chart and ledger
 st.subheader(f"Price Chart {symbol} — {timeframe}")
 if refresh:
+    load_candles.clear()
     st.experimental_rerun()
 
-df = fetch_quotes(symbol, int(count), simulate=simulate)
+if not simulate:
+    http_client.get_session()  # pooled keep-alive session, created once per server process
+df = load_candles(symbol, int(count), timeframe, simulate, dashboard_cache.candle_bucket("1m"))
 if df.empty or "close" not in df.columns or df["close"].dropna().empty:
     st.info("No price data available. Try 'Simulate' or change symbol/count.")
 else:
     # simple line chart (native streamlit)
-    st.line_chart(df["close"])
+    st.line_chart(df[[c for c in ("close", "ema9", "ema21") if c in df.columns]])
 
 st.markdown("### Ledger")
 # example empty ledger
@@ -4,13 +4,28 @@
 import streamlit as st
 import pandas as pd
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 import plotly.graph_objects as go
 
+import dashboard_cache  # CSV reads cached until the file changes on disk
+import chart_reduce  # OHLC aggregation to the chart's pixel width
+import journal_db  # indexed SQLite trade journal
+
 # --- Paths (file sits next to this script) ---
 BASE_DIR = Path(__file__).parent.resolve()
 price_path = BASE_DIR / "price_data.csv"
-journal_path = BASE_DIR / "journal.csv"
+journal_path = BASE_DIR / "journal.csv"  # legacy CSV journal, imported once into journal.db
+journal_db_path = BASE_DIR / "journal.db"
+
+
+@st.cache_resource
+def journal() -> journal_db.JournalDB:
+    """The journal database; on first use the legacy journal.csv (if any) is imported into it."""
+    db = journal_db.get_db(journal_db_path)
+    if db.count() == 0 and journal_path.exists():
+        db.import_csv(str(journal_path), source="journal.csv")
+    return db
+
 
 st.set_page_config(page_title="Auto Trading Tracker", layout="wide")
 st.title("AUTO TRADING TRACKER — Dashboard (Workable)")
@@ -42,21 +57,9 @@ with st.sidebar:
             "notes": ""
         }
 
-        # Append to CSV (create if doesn't exist)
-        if journal_path.exists():
-            try:
-                dfj = pd.read_csv(journal_path)
-                dfj = pd.concat([dfj, pd.DataFrame([new_trade])], ignore_index=True)
-            except Exception:
-                dfj = pd.DataFrame([new_trade])
-        else:
-            dfj = pd.DataFrame([new_trade])
-
-        # Ensure consistent column order
-        cols = ["entry_time", "exit_time", "symbol", "qty", "side", "entry_price", "exit_price", "pnl", "notes"]
-        dfj = dfj.reindex(columns=cols)
-        dfj.to_csv(journal_path, index=False)
-        st.success("New trade saved to journal.csv (extended format)")
+        # one INSERT into the journal database (the history is never re-read or rewritten)
+        trade_id = journal().insert(new_trade)
+        st.success(f"New trade {trade_id} saved to the journal")
 
     st.markdown("---")
     st.write("Quick actions")
@@ -78,7 +81,7 @@ col1, col2 = st.columns([2, 1])
 loaded = False
 if price_path.exists():
     try:
-        df = pd.read_csv(price_path, parse_dates=["datetime"])
+        df = dashboard_cache.read_csv(price_path, parse_dates=["datetime"])
         df = df.sort_values("datetime").set_index("datetime")
         loaded = True
     except Exception as e:
@@ -89,12 +92,19 @@ else:
 with col1:
     st.subheader("Price / Candlestick")
     if loaded:
+        # zooming (narrower range) re-queries the reducer at a finer resolution
+        x_range = None
+        if len(df) > 1:
+            t_first, t_last = df.index[0].to_pydatetime(), df.index[-1].to_pydatetime()
+            x_range = st.slider("Visible range", min_value=t_first, max_value=t_last, value=(t_first, t_last),
+                                step=timedelta(minutes=1), format="MM-DD HH:mm")
+        view, _ = chart_reduce.chart_data(df, x_range=x_range)
         fig = go.Figure(data=[go.Candlestick(
-            x=df.index,
-            open=df['open'],
-            high=df['high'],
-            low=df['low'],
-            close=df['close']
+            x=view.index,
+            open=view['open'],
+            high=view['high'],
+            low=view['low'],
+            close=view['close']
         )])
         fig.update_layout(height=540, margin=dict(l=10, r=10, t=30, b=10))
         st.plotly_chart(fig, use_container_width=True)
@@ -106,15 +116,17 @@ with col1:
 
 with col2:
     st.subheader("Trade Journal")
-    if journal_path.exists():
-        try:
-            dfj = pd.read_csv(journal_path)
-            st.dataframe(dfj)
-            csv_bytes = dfj.to_csv(index=False).encode('utf-8')
-            st.download_button("Download journal.csv", data=csv_bytes, file_name="journal.csv", mime="text/csv")
-        except Exception as e:
-            st.error(f"Unable to read journal: {e}")
-    else:
+    try:
+        dfj = journal().to_frame()
+    except Exception as e:
+        dfj = None
+        st.error(f"Unable to read journal: {e}")
+    if dfj is not None and not dfj.empty:
+        cols = ["entry_time", "exit_time", "symbol", "quantity", "side", "entry_price", "exit_price", "pnl", "notes"]
+        st.dataframe(dfj[cols].rename(columns={"quantity": "qty"}))
+        csv_bytes = dfj.to_csv(index=False).encode('utf-8')
+        st.download_button("Download journal.csv", data=csv_bytes, file_name="journal.csv", mime="text/csv")
+    elif dfj is not None:
         st.info("No trades yet. Use 'New trade (mock)' in the sidebar to add a trade.")
 
 st.markdown("---")
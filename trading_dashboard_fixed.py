@@ -5,7 +5,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import requests
+import http_client  # pooled keep-alive session (module state survives Streamlit reruns)
+import quote_buffer  # incremental (since-cursor) quotes over the pooled http_client session
+import candle_store  # in-memory 1m bars + derived 5m/15m/1h candles
+import dashboard_cache  # st.cache_data / st.cache_resource helpers (candle-cadence TTLs)
+import synth_market  # vectorized synthetic 1m bars for the simulate path
 from datetime import datetime
 
 st.set_page_config(page_title="Trading Journal (Fixed)", layout="wide", initial_sidebar_state="collapsed")
@@ -31,7 +35,7 @@ left_col, center_col, right_col = st.columns([0.22, 1.0, 0.26])
 with left_col:
     st.markdown("**Controls**")
     symbol = st.text_input("Symbol (example: NIFTY)", value="NIFTY", key="left_symbol")
-    timeframe = st.selectbox("Timeframe", ["1m", "5m", "15m"], index=0, key="left_timeframe")
+    timeframe = st.selectbox("Timeframe", list(candle_store.TIMEFRAMES), index=0, key="left_timeframe")
     count = st.number_input("Candles (count)", min_value=20, max_value=2000, value=120, step=10, key="left_count")
     simulate = st.checkbox("Simulate data (ignore backend)", value=SIMULATE_DEFAULT, key="left_sim")
     refresh = st.button("Refresh now", key="left_refresh")
@@ -58,56 +62,46 @@ with right_col:
 
 # Helpers
 def simulate_quotes(symbol: str, count: int, tf: str = "1m"):
-    now = pd.Timestamp.now().floor("T")
-    freq = {"1m":"T", "5m":"5T", "15m":"15T"}.get(tf, "T")
-    idx = pd.date_range(end=now, periods=count, freq=freq)
+    # simulate 1m bars, then aggregate to the timeframe (same resampler the candle store uses)
+    seconds = candle_store.TIMEFRAMES.get(tf, 60)
+    minutes = count * seconds // 60
+    now = pd.Timestamp.now().floor("min")
     base = 25000 if symbol.upper().startswith("NIFTY") else 20000
-    noise = np.random.normal(0, 4, size=count).cumsum()
-    close = base + noise
-    df = pd.DataFrame({
-        "datetime": idx,
-        "open": np.roll(close, 1),
-        "high": close + np.abs(np.random.normal(0, 2, size=count)),
-        "low": close - np.abs(np.random.normal(0, 2, size=count)),
-        "close": close,
-        "volume": np.random.randint(100, 1500, size=count)
-    }).set_index("datetime")
-    df.iloc[0, df.columns.get_indexer(["open"])] = df.iloc[0]["close"]
-    return df
-
-def fetch_quotes_from_api(symbol: str, count: int):
-    r = requests.get(f"{API_BASE}/quote", params={"symbol": symbol, "count": count}, timeout=5)
-    r.raise_for_status()
-    payload = r.json()
-    data = payload.get("data", [])
-    df = pd.DataFrame(data)
-    if df.empty:
-        return pd.DataFrame()
-    if "datetime" in df.columns:
-        df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
-        df = df.set_index("datetime")
-    if "close" in df.columns:
-        df["open"] = df.get("open", df["close"].shift(1).fillna(df["close"]))
-        df["high"] = df.get("high", df[["open","close"]].max(axis=1) + (df["close"] * 0.001).abs())
-        df["low"]  = df.get("low", df[["open","close"]].min(axis=1) - (df["close"] * 0.001).abs())
-    if "volume" not in df.columns:
-        df["volume"] = (df["close"].pct_change().fillna(0).abs() * 1000 + 200).round().astype(int)
-    return df.sort_index()
+    df = synth_market.generate_bars(minutes, end=now, start_price=base, session=False).set_index("datetime")
+    return candle_store.resample_ohlcv(df.astype(float), seconds).iloc[-count:]
+
+def fetch_quotes_from_api(symbol: str, count: int, tf: str = "1m"):
+    # rolling buffer: only bars newer than the last poll come over the wire; the candle
+    # store keeps the 1m bars and derives 5m/15m/1h incrementally, all served from memory.
+    # mock_api sends prices only: open/high/low/volume are derived from the price series first
+    store = candle_store.get_store()
+    quotes = quote_buffer.fetch_quotes(symbol, store.minutes_for(count), base=API_BASE)
+    store.update(symbol, candle_store.derive_ohlcv(quotes))
+    return store.get(symbol, tf, count)
 
 def get_data_safe(symbol, count, simulate_flag, tf):
     if simulate_flag:
         return simulate_quotes(symbol, count, tf), None
     try:
-        df = fetch_quotes_from_api(symbol, count)
+        df = fetch_quotes_from_api(symbol, count, tf)
         if df.empty:
             return simulate_quotes(symbol, count, tf), "Backend returned empty data, using simulated data."
         return df, None
     except Exception as e:
         return simulate_quotes(symbol, count, tf), f"Quote fetch error: {e}"
 
+# widget clicks within the same minute re-render from cache instead of refetching
+@st.cache_data(ttl=dashboard_cache.ttl_for("1m"), show_spinner=False, max_entries=64)
+def load_data(symbol, count, simulate_flag, tf, minute):
+    return get_data_safe(symbol, count, simulate_flag, tf)
+
 # Main
+if refresh:
+    load_data.clear()
 if refresh or True:
-    df, err = get_data_safe(symbol, int(count), simulate, timeframe)
+    if not simulate:
+        http_client.get_session()  # pooled keep-alive session, created once per server process
+    df, err = load_data(symbol, int(count), simulate, timeframe, dashboard_cache.candle_bucket("1m"))
     if err:
         message_placeholder.error(err)
     else:
@@ -5,7 +5,9 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import requests
+import quote_buffer  # incremental (since-cursor) quotes over the pooled http_client session
+import candle_store  # derive_ohlcv: candles from a price-only series
+import synth_market  # vectorized synthetic bars for the simulate path
 from datetime import datetime, timedelta
 
 st.set_page_config(page_title="Trading Journal (Fixed)", layout="wide", initial_sidebar_state="collapsed")
@@ -73,42 +75,21 @@ with right_col:
 def simulate_quotes(symbol: str, count: int):
     now = pd.Timestamp.now().floor("T")
     # frequency depends on timeframe: simple mapping
-    freq = {"1m":"T", "5m":"5T", "15m":"15T"}.get(timeframe, "T")
-    idx = pd.date_range(end=now, periods=count, freq=freq)
+    seconds = {"1m": 60, "5m": 300, "15m": 900}.get(timeframe, 60)
     base = 25000 if symbol.upper().startswith("NIFTY") else 20000
-    noise = np.random.normal(loc=0.0, scale=4.0, size=count).cumsum()
-    close = base + noise
-    df = pd.DataFrame({
-        "datetime": idx,
-        "open": np.roll(close, 1),
-        "high": close + np.abs(np.random.normal(0, 2, size=count)),
-        "low": close - np.abs(np.random.normal(0, 2, size=count)),
-        "close": close,
-        "volume": np.random.randint(100, 1500, size=count)
-    }).set_index("datetime")
-    df.iloc[0, df.columns.get_indexer(["open"])] = df.iloc[0]["close"]
-    return df
+    df = synth_market.generate_bars(count, end=now, start_price=base, freq_seconds=seconds, session=False)
+    return df.set_index("datetime")
 
 def fetch_quotes_from_api(symbol: str, count: int):
     try:
-        r = requests.get(f"{API_BASE}/quote", params={"symbol": symbol, "count": count}, timeout=5)
-        r.raise_for_status()
-        payload = r.json()
-        data = payload.get("data", [])
-        df = pd.DataFrame(data)
+        # rolling buffer: only bars newer than the last poll come over the wire
+        df = quote_buffer.fetch_quotes(symbol, count, base=API_BASE)
         if df.empty:
             return pd.DataFrame()
         if "datetime" in df.columns:
-            df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
             df = df.set_index("datetime")
-        # ensure open/high/low/close exist
-        if "close" in df.columns:
-            df["open"] = df.get("open", df["close"].shift(1).fillna(df["close"]))
-            df["high"] = df.get("high", df[["open","close"]].max(axis=1) + (df["close"] * 0.001).abs())
-            df["low"]  = df.get("low", df[["open","close"]].min(axis=1) - (df["close"] * 0.001).abs())
-        if "volume" not in df.columns:
-            df["volume"] = (df["close"].pct_change().fillna(0).abs() * 1000 + 200).round().astype(int)
-        return df.sort_index()
+        # ensure open/high/low/close/volume exist (mock_api sends a bare price series)
+        return candle_store.derive_ohlcv(df).sort_index()
     except Exception as e:
         # bubble up error to caller to show message and fallback
         raise
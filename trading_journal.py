@@ -4,61 +4,62 @@
 # or: python trading_journal.py  (for smoke-run behavior)
 
 from datetime import datetime, timedelta
-import math
 import pandas as pd
 import numpy as np
 import streamlit as st
 import plotly.graph_objects as go
 
+import indicators
+import dashboard_cache  # st.cache_data helpers (candle-cadence keys)
+import chart_reduce  # OHLC aggregation / LTTB to the chart's pixel width
+import synth_market  # vectorized synthetic candles
+
 # -------------------------
 # Utility: EMA (simple)
 # -------------------------
 def ema(series: pd.Series, period: int) -> pd.Series:
     """
     Compute exponential moving average. Returns a Series aligned with the input.
-    Uses pandas' ewm if available (preferred).
+    Uses the shared indicators.ema kernel (same values as pandas' ewm(adjust=False)).
     """
-    try:
-        return series.ewm(span=period, adjust=False).mean()
-    except Exception:
-        # fallback simple implementation
-        alpha = 2 / (period + 1)
-        out = []
-        prev = None
-        for v in series.fillna(method="ffill").tolist():
-            if prev is None:
-                prev = v
-            else:
-                prev = alpha * v + (1 - alpha) * prev
-            out.append(prev)
-        return pd.Series(out, index=series.index)
+    return pd.Series(indicators.ema(series.to_numpy(dtype=float), period), index=series.index)
 
 # -------------------------
 # Mock OHLC generator
 # -------------------------
 def make_mock_ohlc(start_dt: datetime = None, periods: int = 30, freq_minutes: int = 15, start_price: float = 25000.0) -> pd.DataFrame:
     """
-    Generate simple synthetic OHLC candles.
+    Generate synthetic OHLC candles (synth_market: regime-switching random walk, vectorized).
     Returns DataFrame with columns: time, open, high, low, close, volume
     """
     if start_dt is None:
         start_dt = datetime.now()
-    rng = [start_dt + timedelta(minutes=freq_minutes * i) for i in range(periods)]
-    prices = []
-    p = float(start_price)
-    for i in range(periods):
-        # random walk
-        move = np.random.normal(loc=0.0, scale=0.3) * (1 + math.sin(i / 3))
-        p = max(1, p + move)
-        o = p + np.random.normal(0, 0.5)
-        c = p + np.random.normal(0, 0.5)
-        hi = max(o, c) + abs(np.random.normal(0, 0.5))
-        lo = min(o, c) - abs(np.random.normal(0, 0.5))
-        vol = max(1, int(abs(np.random.normal(200, 50))))
-        prices.append((rng[i], round(o, 2), round(hi, 2), round(lo, 2), round(c, 2), vol))
-    df = pd.DataFrame(prices, columns=["time", "open", "high", "low", "close", "volume"])
-    df["time"] = pd.to_datetime(df["time"])
-    return df
+    df = synth_market.generate_bars(periods, start=start_dt, start_price=start_price,
+                                    freq_seconds=freq_minutes * 60, session=False)
+    return df.rename(columns={"datetime": "time"})
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_candles(periods: int, freq_minutes: int, start_price: float, candle: int) -> pd.DataFrame:
+    """
+    Mock candles with time_str/ema9/ema21, cached per (inputs, current candle): widget
+    clicks reuse them (no regeneration or EMA recompute) until the next candle starts.
+    """
+    candles_df = make_mock_ohlc(periods=periods, freq_minutes=freq_minutes, start_price=start_price)
+    if candles_df is None or len(candles_df) == 0:
+        return candles_df
+
+    # Time formatting
+    if "time" in candles_df.columns:
+        candles_df["time"] = pd.to_datetime(candles_df["time"], errors="coerce")
+        candles_df["time_str"] = candles_df["time"].dt.strftime("%H:%M")
+    else:
+        candles_df["time_str"] = ""
+
+    # EMAs
+    if "close" in candles_df.columns:
+        candles_df["ema9"] = ema(candles_df["close"], 9)
+        candles_df["ema21"] = ema(candles_df["close"], 21)
+    return candles_df
 
 # -------------------------
 # Streamlit UI / Main
@@ -69,7 +70,7 @@ def main():
 
     # Controls
     show_candles = st.checkbox("Show candles (mock OHLC)", value=True)
-    periods = st.number_input("Candles (count)", min_value=10, max_value=2000, value=30, step=10)
+    periods = st.number_input("Candles (count)", min_value=10, max_value=150000, value=30, step=10)
     freq_minutes = st.number_input("Candle frequency (min)", min_value=1, max_value=1440, value=15, step=1)
     start_price = st.number_input("Start price", min_value=1.0, value=25000.0, step=1.0)
 
@@ -78,7 +79,8 @@ def main():
     # Candles + Indicators (plotly)
     if show_candles:
         try:
-            candles_df = make_mock_ohlc(periods=periods, freq_minutes=freq_minutes, start_price=start_price)
+            candles_df = load_candles(int(periods), int(freq_minutes), float(start_price),
+                                      dashboard_cache.candle_bucket(int(freq_minutes) * 60))
         except Exception as e:
             st.error(f"make_mock_ohlc failed: {e}")
             return
@@ -87,34 +89,37 @@ def main():
             st.error("No candle data produced.")
             return
 
-        # Time formatting
-        if "time" in candles_df.columns:
-            candles_df["time"] = pd.to_datetime(candles_df["time"], errors="coerce")
-            candles_df["time_str"] = candles_df["time"].dt.strftime("%H:%M")
-        else:
-            candles_df["time_str"] = ""
-
-        # EMAs
-        if "close" in candles_df.columns:
-            candles_df["ema9"] = ema(candles_df["close"], 9)
-            candles_df["ema21"] = ema(candles_df["close"], 21)
+        # Visible range: narrowing it re-queries the reducer at a finer resolution
+        x_range = None
+        t_first, t_last = candles_df["time"].iloc[0].to_pydatetime(), candles_df["time"].iloc[-1].to_pydatetime()
+        if len(candles_df) > 1:
+            x_range = st.slider("Visible range", min_value=t_first, max_value=t_last, value=(t_first, t_last),
+                                step=timedelta(minutes=int(freq_minutes)), format="MM-DD HH:mm")
+
+        # Only ~one candle per few pixels reaches the browser; EMAs were computed at full resolution
+        view, lines = chart_reduce.chart_data(candles_df, x_range=x_range, overlays=("ema9", "ema21"), time_col="time")
+        visible = len(chart_reduce.visible_slice(candles_df, x_range, "time"))
+        if len(view) < visible:
+            per_bar = chart_reduce.group_size(visible, chart_reduce.CHART_WIDTH_PX // chart_reduce.PX_PER_CANDLE)
+            st.caption(f"Showing {len(view)} bars of {per_bar} candles each ({visible} in range); "
+                       "narrow the range for full detail.")
 
         # Plotly figure
         fig = go.Figure(layout=dict(margin=dict(l=10, r=10, t=30, b=10)))
 
-        if all(col in candles_df.columns for col in ["open", "high", "low", "close"]):
+        if all(col in view.columns for col in ["open", "high", "low", "close"]):
             fig.add_trace(go.Candlestick(
-                x=candles_df["time"],
-                open=candles_df["open"],
-                high=candles_df["high"],
-                low=candles_df["low"],
-                close=candles_df["close"],
+                x=view["time"],
+                open=view["open"],
+                high=view["high"],
+                low=view["low"],
+                close=view["close"],
                 name="Price"
             ))
-        if "ema9" in candles_df.columns:
-            fig.add_trace(go.Scatter(x=candles_df["time"], y=candles_df["ema9"], mode="lines", name="EMA9"))
-        if "ema21" in candles_df.columns:
-            fig.add_trace(go.Scatter(x=candles_df["time"], y=candles_df["ema21"], mode="lines", name="EMA21"))
+        if "ema9" in lines:
+            fig.add_trace(go.Scatter(x=lines["ema9"].index, y=lines["ema9"], mode="lines", name="EMA9"))
+        if "ema21" in lines:
+            fig.add_trace(go.Scatter(x=lines["ema21"].index, y=lines["ema21"], mode="lines", name="EMA21"))
 
         fig.update_layout(xaxis_rangeslider_visible=False, height=520)
         st.plotly_chart(fig, use_container_width=True)
@@ -10,71 +10,9 @@ from datetime import datetime
 import pandas as pd
 import numpy as np
 import streamlit as st
-import pytz
 
-KOLKATA = pytz.timezone("Asia/Kolkata")
-
-# ------------------------
-# Helpers
-# ------------------------
-def parse_datetime(val):
-    if pd.isna(val) or (isinstance(val, str) and val.strip() == ""):
-        return pd.NaT
-    try:
-        ts = pd.to_datetime(val, errors="coerce")
-        if pd.isna(ts):
-            return pd.NaT
-        # localize naive -> Kolkata, else convert
-        if getattr(ts, "tzinfo", None) is None and getattr(ts, "tz", None) is None:
-            try:
-                return ts.tz_localize(KOLKATA)
-            except Exception:
-                try:
-                    return KOLKATA.localize(ts.to_pydatetime())
-                except Exception:
-                    return pd.NaT
-        else:
-            try:
-                return ts.tz_convert(KOLKATA)
-            except Exception:
-                return ts
-    except Exception:
-        return pd.NaT
-
-def compute_pnl_units(row, default_lot_size):
-    """Compute PnL using units = quantity (lots) * lot_size (units/lot)."""
-    try:
-        lots = float(row.get("quantity", 0.0))
-        lot_size = float(row.get("lot_size", default_lot_size)) if not pd.isna(row.get("lot_size", np.nan)) else float(default_lot_size)
-        units = lots * lot_size
-        ep = float(row.get("entry_price", np.nan))
-        xp = float(row.get("exit_price", np.nan))
-        fees = float(row.get("fees", 0.0)) if not pd.isna(row.get("fees", np.nan)) else 0.0
-        if np.isnan(ep) or np.isnan(xp) or units == 0:
-            return np.nan
-        return (xp - ep) * units - fees
-    except Exception:
-        return np.nan
-
-def ensure_columns(df):
-    required = [
-        "trade_id", "symbol", "quantity",
-        "lot_size", "entry_price", "exit_price",
-        "entry_time", "exit_time",
-        "fees", "notes"
-    ]
-    for c in required:
-        if c not in df.columns:
-            df[c] = np.nan
-    return df
-
-def fmt_dt_display(ts):
-    if pd.isna(ts):
-        return ""
-    try:
-        return ts.tz_convert(KOLKATA).strftime("%Y-%m-%d %H:%M:%S")
-    except Exception:
-        return str(ts)
+from journal_enrich import KOLKATA, enrich_trades
+import journal_analytics as ja
 
 # ------------------------
 # Streamlit UI
@@ -120,50 +58,8 @@ if df_raw is None or df_raw.empty:
     st.warning("No trades loaded.")
     st.stop()
 
-# Normalize header names to lower-case keys
-df = df_raw.copy()
-df.columns = [str(c).strip().lower() for c in df.columns]
-
-# Ensure important columns exist
-df = ensure_columns(df)
-
-# Coerce numeric columns
-df["quantity"] = pd.to_numeric(df.get("quantity", np.nan), errors="coerce").fillna(0)
-df["lot_size"] = pd.to_numeric(df.get("lot_size", np.nan), errors="coerce").fillna(global_lot_size)
-df["entry_price"] = pd.to_numeric(df.get("entry_price", np.nan), errors="coerce")
-df["exit_price"] = pd.to_numeric(df.get("exit_price", np.nan), errors="coerce")
-df["fees"] = pd.to_numeric(df.get("fees", np.nan), errors="coerce").fillna(default_fees)
-df["notes"] = df.get("notes", "").astype(str)
-
-# Parse datetimes
-df["entry_time_parsed"] = df["entry_time"].apply(parse_datetime)
-df["exit_time_parsed"]  = df["exit_time"].apply(parse_datetime)
-
-# Display-friendly time strings
-df["entry_time_display"] = df["entry_time_parsed"].apply(fmt_dt_display)
-df["exit_time_display"]  = df["exit_time_parsed"].apply(fmt_dt_display)
-
-# PnL using lot_size (units = quantity * lot_size)
-df["pnl"] = df.apply(lambda r: compute_pnl_units(r, global_lot_size), axis=1)
-
-# pct per trade uses entry_value = entry_price * units
-def pct_trade_calc(r, default_lot_size):
-    try:
-        lots = float(r.get("quantity", 0.0))
-        lot_size = float(r.get("lot_size", default_lot_size)) if not pd.isna(r.get("lot_size", np.nan)) else float(default_lot_size)
-        units = lots * lot_size
-        ep = float(r.get("entry_price", np.nan))
-        pnl = float(r.get("pnl", np.nan)) if not pd.isna(r.get("pnl")) else np.nan
-        if np.isnan(ep) or units == 0 or np.isnan(pnl):
-            return np.nan
-        entry_value = ep * units
-        if entry_value == 0:
-            return np.nan
-        return pnl / entry_value * 100.0
-    except Exception:
-        return np.nan
-
-df["pct_trade"] = df.apply(lambda r: pct_trade_calc(r, global_lot_size), axis=1)
+# Normalize headers, coerce numerics, parse times to Kolkata, pnl / pct_trade (bulk column ops)
+df = enrich_trades(df_raw, lot_size=global_lot_size, default_fees=default_fees)
 
 # Sort by exit_time_parsed so realized trades are chronological
 df = df.sort_values(by=["exit_time_parsed"], ascending=True, na_position="last").reset_index(drop=True)
@@ -171,17 +67,8 @@ df = df.sort_values(by=["exit_time_parsed"], ascending=True, na_position="last")
 # Preserve original index mapping for editing mapping back
 df["__idx__"] = df.index
 
-# Cumulative balance (realized only)
-running = float(initial_balance)
-cumulatives = []
-for _, row in df.iterrows():
-    if pd.notna(row.get("exit_price")) and pd.notna(row.get("exit_time_parsed")):
-        pnl = 0.0 if pd.isna(row.get("pnl")) else float(row.get("pnl"))
-        running += pnl
-        cumulatives.append(running)
-    else:
-        cumulatives.append(running)
-df["cumulative_balance"] = cumulatives
+# Cumulative balance (realized only), one cumsum
+df["cumulative_balance"] = ja.cumulative_balance(df, initial_balance)
 
 # Day & Date based on exit_time_parsed (for closed trades)
 df["day"]  = df["exit_time_parsed"].dt.tz_convert(KOLKATA).dt.strftime("%A").fillna("")
@@ -238,24 +125,14 @@ else:
 # ------------------------
 st.subheader("Daily summary (realized)")
 if not closed.empty:
-    daily_rows = []
-    prev_bal = float(initial_balance)
-    for day in sorted(closed["date"].dropna().unique()):
-        day_trades = closed[closed["date"] == day]
-        day_pnl = day_trades["pnl"].sum(min_count=1)
-        start_bal = prev_bal
-        end_bal = float(day_trades["cumulative_balance"].dropna().iloc[-1]) if not day_trades["cumulative_balance"].dropna().empty else start_bal
-        daily_pct = np.nan if start_bal == 0 else (end_bal - start_bal) / start_bal * 100.0
-        daily_rows.append({
-            "date": pd.to_datetime(day).date(),
-            "start_balance": round(start_bal,2),
-            "end_balance": round(end_bal,2),
-            "daily_pnl": round(day_pnl,2),
-            "daily_pct": round(daily_pct,4)
-        })
-        prev_bal = end_bal
-    daily_df = pd.DataFrame(daily_rows)
+    # one groupby over the closed trades (start balance = previous day's end balance)
+    daily_df = ja.daily_summary(df, initial_balance)
     st.dataframe(daily_df, use_container_width=True)
+    weekly_df = ja.period_summary(df, "W", initial_balance)
+    monthly_df = ja.period_summary(df, "M", initial_balance)
+    with st.expander("Weekly / monthly summary"):
+        st.dataframe(weekly_df, use_container_width=True)
+        st.dataframe(monthly_df, use_container_width=True)
 else:
     st.info("No realized trades found; daily summary empty.")
 
@@ -263,10 +140,9 @@ else:
 # Quick stats
 # ------------------------
 st.subheader("Quick stats")
-total_realized = df["pnl"].sum(min_count=1)
-num_realized = closed.shape[0]
-win_rate = (closed["pnl"] > 0).sum() / max(1, closed["pnl"].notna().sum()) * 100.0 if num_realized>0 else np.nan
-avg_pct = df["pct_trade"].dropna().mean() if df["pct_trade"].notna().any() else np.nan
+stats = ja.quick_stats(df)
+total_realized, num_realized = stats["total_realized"], stats["num_realized"]
+win_rate, avg_pct = stats["win_rate"], stats["avg_pct"]
 
 st.write(f"Realized P&L: â‚¹ {total_realized:,.2f}")
 st.write(f"Realized trades: {num_realized}")
@@ -292,5 +168,6 @@ if not closed.empty:
     csv_buffer2 = io.StringIO()
     daily_df.to_csv(csv_buffer2, index=False)
     st.download_button("Download daily summary CSV", data=csv_buffer2.getvalue().encode("utf-8"), file_name="trading_journal_daily_summary.csv", mime="text/csv")
+    st.download_button("Download monthly summary CSV", data=monthly_df.to_csv(index=False).encode("utf-8"), file_name="trading_journal_monthly_summary.csv", mime="text/csv")
 
 st.caption("Notes: Entry/Exit times shown in Asia/Kolkata. Edit Notes in the ledger and click 'Apply edits to ledger' to update (in-memory), then use Download to export.")
\ No newline at end of file